@@ -3,21 +3,53 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from config import Config
+from app.db_routing import RoutingSession, replica_binds
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Replicas are extra binds; RoutingSession decides per statement which engine to use
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), **replica_binds(config_class)}
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
     
+    # Request phase timing (Server-Timing header, /metrics histograms)
+    from app import telemetry
+    telemetry.init_app(app)
+    
+    # SQL query counts, slow query log and N+1 detection
+    from app import query_accounting
+    query_accounting.init_app(app)
+    
+    # On-demand sampling profiler for flagged or sampled requests
+    from app import profiler
+    profiler.init_app(app)
+    
+    # Read-your-writes for the client that wrote, when reads go to replicas
+    from app import db_routing
+    db_routing.init_app(app)
+    
+    # Compression, ETag/304 handling and immutable fingerprinted images
+    from app import http_caching
+    http_caching.init_app(app)
+    
     # Register blueprints
     from app.routes.api import api_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.admin import admin_bp
     app.register_blueprint(api_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admin_bp)
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     return app 
\ No newline at end of file
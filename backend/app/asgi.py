@@ -0,0 +1,224 @@
+"""
+ASGI serving mode.
+
+POST /api/find-gifts is handled natively on asyncio: the OpenAI call is awaited,
+and database, Selenium and image work go to bounded executors (see AsyncGiftService).
+It still runs in a Flask request context with the app's before/after request hooks,
+and the executor threads join that request (app/request_threads.py). Every other
+request goes to the regular Flask app on a thread pool, so the two modes expose
+the same API. Serve with any ASGI server, e.g.
+
+    uvicorn asgi:app --port 5000
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import asyncio
+import io
+import logging
+import sys
+from http import HTTPStatus
+from flask import jsonify, request
+from config import Config
+from app.services.cache_warmer import start_warmup
+from app.services.projection import GiftProjection
+from app.services.query_log import get_query_log
+
+class AsgiApp:
+    def __init__(self, flask_app, nlp_service=None, gift_service=None):
+        from app.routes import api
+        from app.services.async_gift_service import AsyncGiftService
+
+        self.flask_app = flask_app
+        self.nlp_service = nlp_service or api.nlp_service
+        self.gift_service = AsyncGiftService(
+            flask_app,
+            gift_service or api.gift_service,
+            db_workers=Config.ASGI_DB_WORKERS,
+            scrape_workers=Config.ASGI_SCRAPE_WORKERS,
+            io_workers=Config.ASGI_IO_WORKERS
+        )
+        self.cpu_executor = ThreadPoolExecutor(Config.ASGI_CPU_WORKERS, thread_name_prefix='asgi-cpu')
+        self.wsgi_executor = ThreadPoolExecutor(Config.ASGI_WSGI_WORKERS, thread_name_prefix='asgi-wsgi')
+        self.logger = logging.getLogger(__name__)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if scope['path'] == '/api/find-gifts' and scope['method'] == 'POST':
+                await self._find_gifts(scope, receive, send)
+            else:
+                await self._call_wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Servers with lifespan support warm up at startup rather than on the first request
+                start_warmup(self.flask_app, self.gift_service.gift_service, self.nlp_service)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.gift_service.shutdown()
+                self.cpu_executor.shutdown(wait=False)
+                self.wsgi_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _find_gifts(self, scope, receive, send):
+        """
+        Native find-gifts, run inside a Flask request context so the app's request hooks
+        apply as on the sync path: request metrics and Server-Timing, query accounting,
+        profiling, CORS, compression and ETags, and the cache warm-up
+        """
+        body = await self._read_body(receive)
+        ctx = self.flask_app.request_context(self._environ(scope, body))
+        ctx.push()
+        error = None
+        try:
+            response = self.flask_app.preprocess_request()
+            if response is None:
+                response = await self._search()
+            response = self.flask_app.process_response(self.flask_app.make_response(response))
+        except Exception as e:
+            error = e
+            self.logger.error(f"Error in async find_gifts: {str(e)}")
+            response = self.flask_app.make_response((jsonify({
+                'success': False,
+                'error': str(e)
+            }), HTTPStatus.INTERNAL_SERVER_ERROR))
+        finally:
+            status, headers, data = response.status_code, response.headers.to_wsgi_list(), response.get_data()
+            ctx.pop(error)
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        await send({'type': 'http.response.body', 'body': data})
+
+    async def _search(self):
+        """The find-gifts view; same checks and response as api.find_gifts for POST"""
+        if not request.is_json:
+            return jsonify({
+                'success': False,
+                'error': 'Content-Type must be application/json'
+            }), HTTPStatus.BAD_REQUEST
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'description' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Description is required'
+            }), HTTPStatus.BAD_REQUEST
+
+        try:
+            projection = GiftProjection.from_args(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), HTTPStatus.BAD_REQUEST
+
+        criteria = await self.nlp_service.extract_gift_criteria_async(data['description'], self.cpu_executor)
+        gifts = await self.gift_service.find_gifts(criteria, projection)
+        query_log = get_query_log()
+        if query_log:
+            query_log.record(data['description'], criteria)
+        response = {
+            'success': True,
+            'criteria': criteria,
+            'gifts': gifts
+        }
+        if projection and projection.compact:
+            response['fields'] = projection.fields
+        return jsonify(response), HTTPStatus.OK
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def _call_wsgi(self, scope, receive, send):
+        """
+        Run the Flask app for this request on the WSGI pool. The whole response is
+        iterated on one thread, as streamed responses keep their request context in
+        thread-local state, and each chunk is handed back to the loop as it is produced.
+        """
+        body = await self._read_body(receive)
+        environ = self._environ(scope, body)
+        response: Dict = {}
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+
+        def run():
+            try:
+                iterable = self.flask_app(environ, start_response)
+                try:
+                    for chunk in iterable:
+                        loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+                finally:
+                    if hasattr(iterable, 'close'):
+                        iterable.close()
+            except Exception as e:
+                self.logger.error(f"Error in WSGI fallback for {environ['PATH_INFO']}: {str(e)}")
+            finally:
+                loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+        future = loop.run_in_executor(self.wsgi_executor, run)
+        started = False
+        while True:
+            chunk = await chunks.get()
+            if not started:
+                await send({'type': 'http.response.start', 'status': response.get('status', 500),
+                            'headers': response.get('headers', [])})
+                started = True
+            if chunk is None:
+                break
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+        await future
+
+    @staticmethod
+    def _environ(scope, body: bytes) -> Dict:
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client')
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'],
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0] if client else '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+        for name, value in scope['headers']:
+            key = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = f"HTTP_{key}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        environ.setdefault('CONTENT_LENGTH', str(len(body)))
+        return environ
+
+def create_asgi_app(config_class=Config) -> AsgiApp:
+    from app import create_app
+    return AsgiApp(create_app(config_class))
@@ -0,0 +1,98 @@
+import json
+import click
+from flask.cli import with_appcontext
+
+@click.command('crawl')
+@click.option('--once', is_flag=True, help='Run a single crawl and exit instead of looping')
+@click.option('--budget-pages', type=int, default=None, help='Maximum targets to scrape per run')
+@click.option('--budget-seconds', type=int, default=None, help='Maximum wall time per run')
+@click.option('--interval', type=int, default=None, help='Seconds between runs in daemon mode')
+@click.option('--source', 'sources', multiple=True, help='Limit the crawl to these sources')
+@click.option('--fixtures', type=click.Path(exists=True, file_okay=False), default=None,
+              help='Load pages from this fixture folder instead of the live sites')
+@with_appcontext
+def crawl_command(once, budget_pages, budget_seconds, interval, sources, fixtures):
+    """Keep the gift catalog warm by crawling the scrapers' search space"""
+    from app.services.crawler_service import CrawlerService
+
+    crawler = CrawlerService(list(sources) or None, fixtures)
+    if once:
+        stats = crawler.run_once(budget_pages, budget_seconds)
+        click.echo(f"Crawled {stats['targets']} targets, {stats['gifts']} gifts, "
+                   f"{stats['errors']} errors in {stats['seconds']}s")
+    else:
+        crawler.run_forever(interval, budget_pages, budget_seconds)
+
+@click.command('scrape-workers')
+@click.option('--workers', type=int, default=None, help='Scrape worker processes to keep running')
+@click.option('--max-jobs', type=int, default=None, help='Jobs a worker runs before it is replaced')
+@click.option('--fixtures', type=click.Path(exists=True, file_okay=False), default=None,
+              help='Load pages from this fixture folder instead of the live sites')
+def scrape_workers_command(workers, max_jobs, fixtures):
+    """Serve request-path scrapes from a separate process pool (use with SCRAPE_BACKEND=workers)"""
+    from config import Config
+    from app.services.scrape_workers import RemoteScrapeError, serve
+
+    try:
+        serve(workers or Config.SCRAPE_WORKERS, max_jobs or Config.SCRAPE_WORKER_MAX_JOBS, fixtures)
+    except RemoteScrapeError as e:
+        raise click.ClickException(str(e))
+
+@click.command('cluster-gifts')
+@click.option('--batch-size', type=int, default=1000, help='Gifts clustered per transaction')
+@with_appcontext
+def cluster_gifts_command(batch_size):
+    """Rebuild the near-duplicate index and clusters for the whole catalog"""
+    from app.services.near_duplicates import NearDuplicateIndex
+
+    stats = NearDuplicateIndex().rebuild(batch_size)
+    click.echo(f"Clustered {stats['gifts']} gifts into {stats['clusters']} clusters")
+
+@click.command('reclassify-gifts')
+@click.option('--batch-size', type=int, default=1000, help='Gifts classified per transaction')
+@click.option('--dry-run', is_flag=True, help='Count the changes without saving them')
+@with_appcontext
+def reclassify_gifts_command(batch_size, dry_run):
+    """Re-apply the current keyword rules to every scraped gift in the catalog"""
+    from app.services.classifier import reclassify_catalog
+
+    stats = reclassify_catalog(batch_size, dry_run)
+    click.echo(f"{'Would change' if dry_run else 'Changed'} {stats['changed']} of {stats['gifts']} gifts")
+
+@click.command('warm-caches')
+@click.option('--top', type=int, default=None, help='Most frequent logged searches to replay')
+@click.option('--crawl/--no-crawl', default=True, help='Crawl the searches that come back thin')
+@click.option('--budget-seconds', type=int, default=None, help='Maximum wall time for those crawls')
+@click.option('--list', 'list_only', is_flag=True, help='Only print the most frequent searches')
+@with_appcontext
+def warm_caches_command(top, crawl, budget_seconds, list_only):
+    """Replay the most frequent logged searches and crawl the ones the catalog answers thinly.
+    Web workers warm their own caches on their first request or at ASGI startup (CACHE_WARMUP_TOP_N)."""
+    from config import Config
+    from app.routes import api
+    from app.services.cache_warmer import CacheWarmer
+    from app.services.query_log import get_query_log
+
+    query_log = get_query_log()
+    if query_log is None:
+        raise click.ClickException('The query log is disabled (QUERY_LOG_ENABLED)')
+    top = top or Config.CACHE_WARMUP_TOP_N
+
+    if list_only:
+        for entry in query_log.top(top):
+            click.echo(f"{entry['count']:>8}  {json.dumps(entry['criteria'], sort_keys=True)}  {entry['description']!r}")
+        return
+
+    warmer = CacheWarmer(api.gift_service, api.nlp_service, query_log)
+    stats = warmer.warm(top, crawl, budget_seconds)
+    click.echo(f"Replayed {stats['queries']} searches: {stats['cached']} cached, {stats['thin']} thin, "
+               f"{stats['errors']} errors in {stats['seconds']}s")
+    if 'crawl' in stats:
+        click.echo(f"Crawled {stats['crawl']['targets']} targets, {stats['crawl']['gifts']} gifts")
+
+def register_commands(app):
+    app.cli.add_command(crawl_command)
+    app.cli.add_command(scrape_workers_command)
+    app.cli.add_command(cluster_gifts_command)
+    app.cli.add_command(reclassify_gifts_command)
+    app.cli.add_command(warm_caches_command)
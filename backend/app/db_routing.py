@@ -0,0 +1,110 @@
+from typing import Dict, Optional
+from contextlib import contextmanager
+import random
+import threading
+import time
+import sqlalchemy as sa
+from sqlalchemy import event
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from config import Config
+from app.telemetry import registry
+
+REPLICA_BIND_PREFIX = 'replica_'
+
+_local = threading.local()
+
+def replica_binds(config) -> Dict[str, Dict]:
+    """SQLALCHEMY_BINDS entries for the configured replicas, each with its own pool settings"""
+    return {
+        f"{REPLICA_BIND_PREFIX}{i}": {'url': uri, **config.REPLICA_ENGINE_OPTIONS}
+        for i, uri in enumerate(config.SQLALCHEMY_REPLICA_URIS)
+    }
+
+@contextmanager
+def replica_reads():
+    """
+    Let SELECTs inside the block go to a replica. Writes, flushes and any read
+    in a session that has already written still go to the primary.
+    """
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+
+def _last_write_at() -> float:
+    """
+    When the current writer last committed: the request, then the client's earlier
+    requests (cookie), or outside requests this thread, e.g. a crawler run
+    """
+    if has_request_context():
+        if 'last_write_at' in g:
+            return g.last_write_at
+        try:
+            return float(request.cookies.get(Config.READ_YOUR_WRITES_COOKIE, 0))
+        except ValueError:
+            return 0.0
+    return getattr(_local, 'last_write_at', 0.0)
+
+def recently_written() -> bool:
+    """True while replicas may not have caught up with this writer's last commit"""
+    return time.time() - _last_write_at() < Config.READ_YOUR_WRITES_WINDOW
+
+class RoutingSession(Session):
+    """db.session that sends replica-eligible reads to a random replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._can_use_replica(clause):
+            replica = self._pick_replica()
+            if replica is not None:
+                registry.inc('gift_ideas_db_routed_reads_total', 1, 'Reads by engine role', role='replica')
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _can_use_replica(self, clause) -> bool:
+        if not getattr(_local, 'depth', 0):
+            return False
+        if self._flushing or self.info.get('wrote') or isinstance(clause, sa.sql.dml.UpdateBase):
+            return False
+        # Read-your-writes: replicas may lag behind a fresh ingest
+        return not recently_written()
+
+    def _pick_replica(self) -> Optional[sa.engine.Engine]:
+        replicas = [engine for key, engine in self._db.engines.items()
+                    if key and key.startswith(REPLICA_BIND_PREFIX)]
+        return random.choice(replicas) if replicas else None
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_write(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _record_commit(session):
+    if session.info.pop('wrote', False):
+        if has_request_context():
+            g.last_write_at = time.time()
+        else:
+            _local.last_write_at = time.time()
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_write(session):
+    session.info.pop('wrote', None)
+
+def init_app(app):
+    """Carry a request's write over to the same client's next requests, for READ_YOUR_WRITES_WINDOW"""
+    if not Config.SQLALCHEMY_REPLICA_URIS:
+        return
+
+    @app.after_request
+    def remember_write(response):
+        if 'last_write_at' in g:
+            response.set_cookie(Config.READ_YOUR_WRITES_COOKIE, f"{g.last_write_at:.3f}",
+                                max_age=int(Config.READ_YOUR_WRITES_WINDOW) + 1, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,95 @@
+from typing import Dict, Optional, Tuple
+from pathlib import Path
+import gzip
+import hashlib
+import logging
+import threading
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_fingerprints: Dict[str, Tuple[int, int, str]] = {}
+_fingerprints_lock = threading.Lock()
+
+def fingerprint(static_path: str) -> Optional[str]:
+    """Short content hash of a file under /static, cached until its mtime or size changes"""
+    path = STATIC_DIR / static_path
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    with _fingerprints_lock:
+        cached = _fingerprints.get(static_path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, 'rb') as f:
+        digest = hashlib.md5(f.read()).hexdigest()[:12]
+    with _fingerprints_lock:
+        _fingerprints[static_path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+def fingerprint_url(url: Optional[str]) -> Optional[str]:
+    """
+    Add a content version to a /static URL (/static/x.jpg -> /static/x.jpg?v=<hash>)
+    so it can be cached forever; other URLs and missing files are returned unchanged
+    """
+    if not url or not url.startswith('/static/'):
+        return url
+    version = fingerprint(url[len('/static/'):])
+    return f"{url}?v={version}" if version else url
+
+def _choose_encoding() -> Optional[str]:
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.GZIP_LEVEL)
+
+def init_app(app):
+    """Strong ETags with 304 revalidation, negotiated compression and immutable fingerprinted statics"""
+
+    @app.after_request
+    def cache_static(response):
+        version = request.args.get('v')
+        if request.endpoint == 'static' and version and response.status_code == 200:
+            # Only pin the exact content the version was computed from
+            if version == fingerprint(request.view_args.get('filename', '')):
+                response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    @app.after_request
+    def compress_and_tag(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in Config.COMPRESS_MIMETYPES
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        data = response.get_data()
+        encoding = _choose_encoding() if len(data) >= Config.COMPRESS_MIN_SIZE else None
+        response.vary.add('Accept-Encoding')
+
+        # Only GETs are revalidated; strong ETags identify exact bytes, so each encoding gets its own tag
+        if request.method in ('GET', 'HEAD'):
+            etag = hashlib.sha256(data).hexdigest()[:32]
+            response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        if encoding:
+            response.set_data(_compress(data, encoding))
+            response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,60 @@
+from app import db
+from sqlalchemy.exc import IntegrityError
+import hashlib
+import json
+
+class CrawlTarget(db.Model):
+    """A (source, criteria) combination the background crawler keeps warm"""
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of source + search URLs
+    source = db.Column(db.String(100), nullable=False)
+    criteria = db.Column(db.Text)  # JSON encoded criteria passed to scraper.scrape()
+    urls = db.Column(db.Text)  # Newline separated search URLs, for debugging
+    hit_count = db.Column(db.Integer, default=0, nullable=False)  # Request-path demand
+    last_requested_at = db.Column(db.DateTime)
+    last_crawled_at = db.Column(db.DateTime)
+    last_result_count = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    @staticmethod
+    def make_key(source, urls):
+        payload = source + '\n' + '\n'.join(sorted(urls))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_or_create(cls, source, criteria, urls):
+        """Return the target for these search URLs, inserting it if new"""
+        key = cls.make_key(source, urls)
+        target = cls.query.filter_by(key=key).first()
+        if target:
+            return target
+
+        target = cls(
+            key=key,
+            source=source,
+            criteria=json.dumps(criteria, sort_keys=True),
+            urls='\n'.join(urls),
+            hit_count=0
+        )
+        try:
+            # In a savepoint, so losing a race with another worker only undoes this insert
+            with db.session.begin_nested():
+                db.session.add(target)
+        except IntegrityError:
+            target = cls.query.filter_by(key=key).one()
+        return target
+
+    def get_criteria(self):
+        return json.loads(self.criteria) if self.criteria else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'source': self.source,
+            'criteria': self.get_criteria(),
+            'urls': self.urls.split('\n') if self.urls else [],
+            'hit_count': self.hit_count,
+            'last_requested_at': self.last_requested_at.isoformat() if self.last_requested_at else None,
+            'last_crawled_at': self.last_crawled_at.isoformat() if self.last_crawled_at else None,
+            'last_result_count': self.last_result_count
+        }
@@ -1,4 +1,15 @@
+from typing import Dict, Optional
+from dataclasses import dataclass
 from app import db
+from app.http_caching import fingerprint_url
+import hashlib
+import math
+
+def scraped_content_hash(name, price, category, affiliate_link, source, tags) -> str:
+    """Hash of the fields a scrape sets, used to skip writing unchanged rows"""
+    fields = [name, price, category, affiliate_link, source, tags]
+    payload = '\x1f'.join('' if value is None else str(value) for value in fields)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 class Gift(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -12,6 +23,24 @@ class Gift(db.Model):
     image_path = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     
+    # Incremental re-scrape tracking
+    content_hash = db.Column(db.String(64))  # sha256 of the scraped fields, see compute_content_hash()
+    first_seen_at = db.Column(db.DateTime)
+    last_seen_at = db.Column(db.DateTime)
+    last_crawl_target_id = db.Column(db.Integer, db.ForeignKey('crawl_target.id'))
+    missed_crawls = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    expired_at = db.Column(db.DateTime)  # Set once the gift has been missing for too many crawls
+    
+    # Near-duplicate cluster: id of the first gift seen with a similar title, see NearDuplicateIndex
+    cluster_id = db.Column(db.Integer, index=True)
+    
+    price_history = db.relationship('PriceHistory', backref='gift', lazy='dynamic',
+                                    order_by='PriceHistory.recorded_at')
+    
+    def compute_content_hash(self):
+        return scraped_content_hash(self.name, self.price, self.category, self.affiliate_link,
+                                    self.source, self.tags)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -21,5 +50,61 @@ class Gift(db.Model):
             'category': self.category,
             'affiliate_link': self.affiliate_link,
             'tags': self.tags.split(',') if self.tags else [],
-             'image_path': self.image_path  # Add this line
-        } 
\ No newline at end of file
+             'image_path': fingerprint_url(self.image_path)  # Versioned so browsers can cache it forever
+        } 
+
+class PriceHistory(db.Model):
+    """One row per observed price change of a gift"""
+    __tablename__ = 'price_history'
+    id = db.Column(db.Integer, primary_key=True)
+    gift_id = db.Column(db.Integer, db.ForeignKey('gift.id'), nullable=False, index=True)
+    price = db.Column(db.Float, nullable=False)
+    recorded_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+
+class GiftLshBucket(db.Model):
+    """One row per (gift, LSH band) bucket of the gift's title MinHash"""
+    __tablename__ = 'gift_lsh_bucket'
+    key = db.Column(db.String(24), primary_key=True)  # '<band>:<bucket hash>'
+    gift_id = db.Column(db.Integer, db.ForeignKey('gift.id'), primary_key=True, index=True)
+
+@dataclass(slots=True)
+class ScrapedGift:
+    """
+    One product as a scraper saw it. Plain and cheap to build, copy and pickle;
+    IngestService inserts new ones straight from their record values.
+    """
+    name: str
+    price: float
+    affiliate_link: Optional[str] = None
+    source: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    tags: Optional[str] = None
+    image_path: Optional[str] = None
+
+    # Fields shared across threads and processes, see to_record()/from_record()
+    RECORD_FIELDS = ('name', 'description', 'price', 'category', 'affiliate_link',
+                     'source', 'tags', 'image_path')
+
+    def __post_init__(self):
+        self.name = ' '.join((self.name or '').split())
+        if not self.name:
+            raise ValueError("Scraped gift has no name")
+        self.price = float(self.price)
+        if not math.isfinite(self.price) or self.price < 0:
+            raise ValueError(f"Invalid price {self.price} for {self.name}")
+
+    def to_record(self) -> Dict:
+        """Plain dict of the scraped fields, safe to share across threads and processes"""
+        return {field: getattr(self, field) for field in self.RECORD_FIELDS}
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'ScrapedGift':
+        return cls(**{field: record.get(field) for field in cls.RECORD_FIELDS})
+
+    def compute_content_hash(self) -> str:
+        return scraped_content_hash(self.name, self.price, self.category, self.affiliate_link,
+                                    self.source, self.tags)
+
+    def to_model(self) -> Gift:
+        return Gift(**self.to_record())
@@ -0,0 +1,182 @@
+from typing import Dict, List, Optional
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from flask import g, request
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME = re.compile(r'^[\w.-]+\.folded$')
+
+class SamplingProfiler:
+    """
+    Samples the call stacks of a request's threads every interval seconds from a
+    background thread and aggregates the samples in the collapsed format read by
+    flamegraph.pl and speedscope. Worker threads doing part of the request join
+    with sampling_thread(). Without a thread_id only those are sampled.
+    """
+
+    def __init__(self, thread_id: Optional[int], interval: float):
+        self.thread_ids = {thread_id} if thread_id is not None else set()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def sampling_thread(self):
+        """Also sample the current thread inside the block"""
+        thread_id = threading.get_ident()
+        added = thread_id not in self.thread_ids
+        self.thread_ids = self.thread_ids | {thread_id}
+        try:
+            yield
+        finally:
+            if added:
+                self.thread_ids = self.thread_ids - {thread_id}
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[self._collapse(frame)] += 1
+                    self.samples += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class ProfileStore:
+    """Ring buffer of collapsed-stack files on disk; the oldest profiles are evicted first"""
+
+    def __init__(self, profile_dir: Path, max_files: int):
+        self.profile_dir = Path(profile_dir)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, label: str, collapsed: str) -> str:
+        safe_label = re.sub(r'[^\w.-]', '_', label)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{safe_label}-{uuid.uuid4().hex[:8]}.folded"
+        with self._lock:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            (self.profile_dir / name).write_text(collapsed, encoding='utf-8')
+            self._evict()
+        return name
+
+    def _evict(self):
+        profiles = sorted(self.profile_dir.glob('*.folded'), key=lambda path: path.stat().st_mtime)
+        for path in profiles[:max(0, len(profiles) - self.max_files)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def list(self) -> List[Dict]:
+        if not self.profile_dir.exists():
+            return []
+        profiles = []
+        for path in sorted(self.profile_dir.glob('*.folded'), key=lambda path: path.stat().st_mtime, reverse=True):
+            stat = path.stat()
+            profiles.append({'name': path.name, 'bytes': stat.st_size, 'created_at': stat.st_mtime})
+        return profiles
+
+    def path(self, name: str) -> Optional[Path]:
+        """Path of a stored profile, or None for unknown or unsafe names"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = self.profile_dir / name
+        return path if path.is_file() else None
+
+_store = None
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    if _store is None:
+        _store = ProfileStore(Config.PROFILE_DIR, Config.PROFILE_MAX_FILES)
+    return _store
+
+def is_admin(req) -> bool:
+    """True when ADMIN_TOKEN is configured and the request carries it in X-Admin-Token"""
+    token = req.headers.get('X-Admin-Token', '')
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+def _should_profile(req) -> bool:
+    if req.endpoint not in Config.PROFILE_ENDPOINTS:
+        return False
+    requested = req.headers.get('X-Profile') or req.args.get('profile')
+    if requested and requested.lower() not in ('0', 'false') and is_admin(req):
+        return True
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+def init_app(app):
+    """Profile requests flagged by an admin (X-Profile header or ?profile=1) or picked by sampling"""
+
+    @app.before_request
+    def start_profiler():
+        if not _should_profile(request):
+            return
+        # Under ASGI the event loop thread runs other requests' tasks too, so its stacks
+        # aren't this request's; the executor threads it hands work to still join
+        profiler = SamplingProfiler(None if _on_event_loop() else threading.get_ident(), Config.PROFILE_INTERVAL)
+        profiler.start()
+        g.profiler = profiler
+
+    @app.after_request
+    def save_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+
+        profiler.stop()
+        try:
+            name = get_profile_store().save(request.endpoint, profiler.collapsed())
+            response.headers['X-Profile-Id'] = name
+            logger.info(f"Saved profile {name} ({profiler.samples} samples)")
+        except OSError as e:
+            logger.error(f"Error saving profile: {str(e)}")
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc=None):
+        # after_request is skipped when the view raises; never leave a sampler running
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
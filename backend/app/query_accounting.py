@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import logging
+import re
+import time
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import Config
+from app.telemetry import registry
+
+logger = logging.getLogger(__name__)
+
+# Collectors of the current context: a request's thread under WSGI, its task under
+# ASGI (where concurrent requests share the event loop thread), or the copy of a
+# request's context a worker thread runs in
+_collectors: ContextVar[Tuple['QueryStats', ...]] = ContextVar('query_collectors', default=())
+_installed = False
+
+# Expanded IN lists and literal numbers would otherwise make every call its own shape
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement: str) -> str:
+    """Normalise a SQL statement so repeated calls with different parameters compare equal"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _IN_LIST.sub('(?)', shape)
+    return _NUMBER.sub('N', shape)
+
+class QueryStats:
+    """Queries executed while this collector was active"""
+
+    def __init__(self, top_n: int = 5):
+        self.top_n = top_n
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+        self._slowest = []  # min-heap of (elapsed, seq, statement)
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+        entry = (elapsed, self.count, statement)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        elif elapsed > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> List[Dict]:
+        return [{'statement': statement, 'ms': round(elapsed * 1000, 2)}
+                for elapsed, _, statement in sorted(self._slowest, reverse=True)]
+
+    def repeated_shapes(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Statement shapes executed at least threshold times: likely N+1 loops"""
+        threshold = threshold or Config.QUERY_N_PLUS_ONE_THRESHOLD
+        return {shape: count for shape, count in self.shapes.most_common() if count >= threshold}
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_time * 1000, 2),
+            'slowest': self.slowest,
+            'repeated': self.repeated_shapes()
+        }
+
+def start_tracking(top_n: int = 5) -> QueryStats:
+    stats = QueryStats(top_n)
+    _collectors.set(_collectors.get() + (stats,))
+    return stats
+
+def stop_tracking(stats: QueryStats):
+    _collectors.set(tuple(active for active in _collectors.get() if active is not stats))
+
+@contextmanager
+def track_queries(top_n: int = 5):
+    """Collect stats for every query run in this context inside the block; collectors nest"""
+    stats = start_tracking(top_n)
+    try:
+        yield stats
+    finally:
+        stop_tracking(stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context, so a statement that raises leaves nothing behind
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    if elapsed * 1000 >= Config.SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f}ms): {_WHITESPACE.sub(' ', statement)[:500]}")
+
+    for stats in _collectors.get():
+        stats.record(statement, elapsed)
+
+def install():
+    """Hook every Engine, including ones created later, exactly once per process"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _installed = True
+
+def init_app(app):
+    """Count queries per request, flag likely N+1 patterns and report them in Server-Timing"""
+    if not Config.QUERY_ACCOUNTING_ENABLED:
+        return
+    install()
+
+    @app.before_request
+    def start_query_accounting():
+        g.query_stats = start_tracking(Config.QUERY_TOP_SLOWEST)
+
+    @app.teardown_request
+    def stop_query_accounting(exc=None):
+        stats = g.get('query_stats')
+        if stats is not None:
+            stop_tracking(stats)
+
+    @app.after_request
+    def report_query_accounting(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        registry.inc('gift_ideas_db_queries_total', stats.count, 'SQL statements by endpoint', endpoint=endpoint)
+        registry.observe('gift_ideas_db_request_seconds', stats.total_time,
+                         'Total SQL time per request', endpoint=endpoint)
+
+        repeated = stats.repeated_shapes()
+        if repeated:
+            registry.inc('gift_ideas_db_n_plus_one_total', 1, 'Requests with repeated statement shapes',
+                         endpoint=endpoint)
+            for shape, count in repeated.items():
+                logger.warning(f"Possible N+1 on {request.method} {request.path}: "
+                               f"{count} x {shape[:300]}")
+
+        response.headers.add('Server-Timing',
+                             f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries"')
+        return response
+
+def assert_query_budget(client, max_queries: int, method: str, url: str, **kwargs):
+    """
+    Test helper: issue a request with a Flask test client and fail if it ran more
+    than max_queries statements or any repeated statement shape. Returns the response.
+    """
+    install()
+    with track_queries() as stats:
+        response = client.open(url, method=method, **kwargs)
+
+    assert stats.count <= max_queries, (
+        f"{method} {url} ran {stats.count} queries, budget is {max_queries}: "
+        f"{dict(stats.shapes.most_common(5))}"
+    )
+    repeated = stats.repeated_shapes()
+    assert not repeated, f"{method} {url} repeated statement shapes (likely N+1): {repeated}"
+    return response
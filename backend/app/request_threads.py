@@ -0,0 +1,24 @@
+from typing import Callable
+from functools import partial
+import contextvars
+from flask import g, has_request_context
+
+def bind_to_request(fn: Callable, *args) -> Callable:
+    """
+    fn(*args) as a zero-argument callable for a worker thread doing part of the
+    current request: it runs in a copy of the request's context, so it has the
+    Flask context (g, span() timings, the db session) and its SQL counts towards
+    the request's query accounting; the request's profiler samples it too. Call
+    the result once. Outside a request it is plain fn(*args).
+    """
+    if not has_request_context():
+        return partial(fn, *args)
+    # A context can only be entered by one thread at a time, so every call gets its own copy
+    return partial(contextvars.copy_context().run, _run_in_request, fn, *args)
+
+def _run_in_request(fn: Callable, *args):
+    profiler = g.get('profiler')
+    if profiler is None:
+        return fn(*args)
+    with profiler.sampling_thread():
+        return fn(*args)
@@ -0,0 +1,51 @@
+from functools import wraps
+from flask import Blueprint, request, jsonify, send_file
+from http import HTTPStatus
+from config import Config
+from app.profiler import get_profile_store, is_admin
+from app.routes import api
+from app.services.cache_warmer import warmup_status
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_required(view):
+    """Reject requests without a valid X-Admin-Token; hide the endpoints entirely without ADMIN_TOKEN"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({'success': False, 'error': 'Not found'}), HTTPStatus.NOT_FOUND
+        if not is_admin(request):
+            return jsonify({'success': False, 'error': 'Invalid admin token'}), HTTPStatus.UNAUTHORIZED
+        return view(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/api/admin/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """Captured request profiles, newest first"""
+    return jsonify({
+        'success': True,
+        'profiles': get_profile_store().list()
+    }), HTTPStatus.OK
+
+@admin_bp.route('/api/admin/profiles/<name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    """Collapsed-stack profile, ready for flamegraph.pl or speedscope"""
+    path = get_profile_store().path(name)
+    if path is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), HTTPStatus.NOT_FOUND
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=name)
+
+@admin_bp.route('/api/admin/cache-stats', methods=['GET'])
+@admin_required
+def cache_stats():
+    """NLP and result cache hit rates, per CACHE_STATS_INTERVAL since this worker started, and the warm-up outcome"""
+    return jsonify({
+        'success': True,
+        'caches': {
+            'nlp': api.nlp_service.cache.report(),
+            'results': api.gift_service.pipeline.cache.report()
+        },
+        'warmup': warmup_status()
+    }), HTTPStatus.OK
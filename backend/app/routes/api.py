@@ -1,24 +1,40 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from app.services.gift_service import GiftService
 from app.services.nlp_service import NLPService
+from app.services.host_scheduler import get_scheduler
+from app.services.projection import GiftProjection
+from app.services.query_log import get_query_log
+from app.services.cache_warmer import start_warmup
 from http import HTTPStatus
+import json
 from config import Config  # Add this import
 
 api_bp = Blueprint('api', __name__)
 gift_service = GiftService()
 nlp_service = NLPService(use_openai=Config.USE_OPENAI)
 
-@api_bp.route('/api/find-gifts', methods=['POST'])
+@api_bp.before_app_request
+def warm_caches():
+    """Replay popular searches into this worker's caches once, in the background"""
+    start_warmup(current_app._get_current_object(), gift_service, nlp_service)
+
+@api_bp.route('/api/find-gifts', methods=['GET', 'POST'])
 def find_gifts():
     try:
+        # GET ?description=... is read-only, so crawlers and prefetchers can't start scrapes:
+        # it answers from the catalog and the result cache and revalidates with ETags
+        if request.method == 'GET':
+            data = request.args
+        
         # Make sure we're getting JSON data
-        if not request.is_json:
+        elif not request.is_json:
             return jsonify({
                 'success': False,
                 'error': 'Content-Type must be application/json'
             }), HTTPStatus.BAD_REQUEST
 
-        data = request.get_json()
+        else:
+            data = request.get_json()
         
         # Check if data is None or if description is missing
         if not data or 'description' not in data:
@@ -29,20 +45,101 @@ def find_gifts():
             
         description = data['description']  # Using direct dictionary access
         
-        # Extract criteria using NLP
-        criteria = nlp_service.extract_gift_criteria(description)
+        # Optional fields=, description_max= and format=compact
+        try:
+            projection = GiftProjection.from_args(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), HTTPStatus.BAD_REQUEST
         
-        # Find gifts based on criteria
-        gifts = gift_service.find_gifts(criteria)
+        # Extract criteria, search the catalog, scrape if it is thin, rank and serialize
+        search = gift_service.search(description=description, nlp_service=nlp_service, projection=projection,
+                                     read_only=request.method == 'GET')
         
-        return jsonify({
+        query_log = get_query_log()
+        if query_log:
+            query_log.record(description, search.criteria)
+        
+        response = {
             'success': True,
-            'criteria': criteria,
-            'gifts': [gift.to_dict() for gift in gifts]
-        }), HTTPStatus.OK
+            'criteria': search.criteria,
+            'gifts': search.results
+        }
+        if projection and projection.compact:
+            response['fields'] = projection.fields
+        return jsonify(response), HTTPStatus.OK
         
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), HTTPStatus.INTERNAL_SERVER_ERROR
\ No newline at end of file
+        }), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@api_bp.route('/api/find-gifts/stream', methods=['POST'])
+def find_gifts_stream():
+    """
+    Streaming variant of find-gifts as NDJSON, one event per line:
+    criteria, then a gifts batch for the database and for each scraped source, then done
+    """
+    if not request.is_json:
+        return jsonify({
+            'success': False,
+            'error': 'Content-Type must be application/json'
+        }), HTTPStatus.BAD_REQUEST
+
+    data = request.get_json()
+    if not data or 'description' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'Description is required'
+        }), HTTPStatus.BAD_REQUEST
+
+    description = data['description']
+
+    try:
+        projection = GiftProjection.from_args(data)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), HTTPStatus.BAD_REQUEST
+
+    def events():
+        total = 0
+        try:
+            criteria = nlp_service.extract_gift_criteria(description)
+            yield json.dumps({'type': 'criteria', 'criteria': criteria}) + '\n'
+
+            query_log = get_query_log()
+            if query_log:
+                query_log.record(description, criteria)
+
+            for source, results in gift_service.stream_gifts(criteria, projection):
+                total += len(results)
+                event = {
+                    'type': 'gifts',
+                    'source': source,
+                    'gifts': results
+                }
+                if projection and projection.compact:
+                    event['fields'] = projection.fields
+                yield json.dumps(event) + '\n'
+
+            yield json.dumps({'type': 'done', 'total': total}) + '\n'
+
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+
+    # X-Accel-Buffering stops nginx from holding batches back until the end
+    return Response(stream_with_context(events()), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api_bp.route('/api/scraper-stats', methods=['GET'])
+def scraper_stats():
+    """Per-host queue wait and throttling counters from the scraping scheduler"""
+    return jsonify({
+        'success': True,
+        'hosts': get_scheduler().stats()
+    }), HTTPStatus.OK
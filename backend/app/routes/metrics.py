@@ -0,0 +1,36 @@
+from flask import Blueprint, Response
+from app.telemetry import registry
+from app.services.host_scheduler import get_scheduler
+from app.services.page_cache import get_page_cache
+
+metrics_bp = Blueprint('metrics', __name__)
+
+SCHEDULER_COUNTERS = ['requests', 'throttled', 'server_errors', 'retries', 'failures',
+                      'queue_wait_total', 'backoff_total']
+
+def _scraper_metrics():
+    """Per-host scheduler counters and page cache stats, read at exposition time"""
+    lines = []
+    hosts = get_scheduler().stats()
+    for counter in SCHEDULER_COUNTERS:
+        name = f"gift_ideas_scrape_host_{counter}"
+        name = name if counter.endswith('_total') else f"{name}_total"
+        lines.append(f"# TYPE {name} counter")
+        for host, stats in hosts.items():
+            lines.append(f'{name}{{host="{host}"}} {stats[counter]}')
+
+    lines.append("# TYPE gift_ideas_scrape_host_in_flight gauge")
+    for host, stats in hosts.items():
+        lines.append(f'gift_ideas_scrape_host_in_flight{{host="{host}"}} {stats["in_flight"]}')
+
+    cache = get_page_cache()
+    for stat, value in cache.stats.items():
+        lines.append(f"# TYPE gift_ideas_page_cache_{stat}_total counter")
+        lines.append(f"gift_ideas_page_cache_{stat}_total {value}")
+    return lines
+
+registry.register_collector(_scraper_metrics)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
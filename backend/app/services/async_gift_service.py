@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+from flask import has_request_context
+from app.request_threads import bind_to_request
+from .base_scraper import BaseScraper, deferred_image_downloads
+from .gift_service import GiftService
+from .projection import GiftProjection
+from .search_pipeline import SearchContext
+
+class AsyncGiftService:
+    """
+    Runs the search pipeline on asyncio for the ASGI app. Database work runs on a
+    pool sized to the connection pool. Selenium scrapes run on a small bounded pool,
+    all sources at once. Image downloads are fanned out concurrently once a page is parsed.
+    """
+
+    def __init__(self, app, gift_service: GiftService, db_workers: int, scrape_workers: int, io_workers: int):
+        self.app = app
+        self.gift_service = gift_service
+        self.scraper = gift_service.scraper
+        self.pipeline = gift_service.pipeline
+        self.db_executor = ThreadPoolExecutor(db_workers, thread_name_prefix='asgi-db')
+        self.scrape_executor = ThreadPoolExecutor(scrape_workers, thread_name_prefix='asgi-scrape')
+        self.io_executor = ThreadPoolExecutor(io_workers, thread_name_prefix='asgi-io')
+        self.logger = logging.getLogger(__name__)
+
+    def shutdown(self):
+        for executor in (self.db_executor, self.scrape_executor, self.io_executor):
+            executor.shutdown(wait=False)
+
+    async def find_gifts(self, criteria: Dict, projection: Optional[GiftProjection] = None) -> List:
+        """Serialized gifts for the criteria, scraping the sources concurrently when the catalog is thin"""
+        if not isinstance(criteria, dict):
+            criteria = {}
+
+        context = SearchContext(criteria=criteria, projection=projection)
+        if self.pipeline.lookup(context):
+            return context.results
+
+        context = await self._run_db(self._search, context)
+        if context.should_scrape:
+            batches = await asyncio.gather(*(self._scrape(scraper, criteria) for scraper in self.scraper.scrapers))
+            context.scraped = [gift for batch in batches for gift in batch]
+        context = await self._run_db(self._finish, context)
+        return context.results
+
+    async def _run_db(self, fn, *args):
+        """
+        Call fn on the DB pool as part of the current request (its session, timings and
+        query accounting; the stages run one at a time), or in its own app context
+        when there is no request
+        """
+        if has_request_context():
+            call = bind_to_request(fn, *args)
+        else:
+            def call():
+                with self.app.app_context():
+                    return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.db_executor, call)
+
+    def _search(self, context: SearchContext) -> SearchContext:
+        self.pipeline.run_stage('retrieve', context)
+        self.pipeline.run_stage('decide', context)
+        return context
+
+    def _finish(self, context: SearchContext) -> SearchContext:
+        for stage in ('ingest', 'rank', 'serialize'):
+            self.pipeline.run_stage(stage, context)
+        self.pipeline.remember(context)
+        return context
+
+    async def _scrape(self, scraper: BaseScraper, criteria: Dict):
+        loop = asyncio.get_running_loop()
+
+        def call():
+            with deferred_image_downloads() as pending:
+                gifts = self.scraper._scrape(scraper, criteria)
+            return gifts, list(pending)
+
+        try:
+            gifts, pending = await loop.run_in_executor(self.scrape_executor, bind_to_request(call))
+        except Exception as e:
+            self.logger.error(f"Error scraping {scraper.source_key}: {str(e)}")
+            return []
+
+        if pending:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self.io_executor, bind_to_request(owner.fetch_image, image_url, image_path))
+                for owner, image_url, image_path in pending
+            ))
+            failed = {f"/static/gift_images/{image_path.name}"
+                      for (_, _, image_path), ok in zip(pending, results) if not ok}
+            for gift in gifts:
+                if gift.image_path in failed:
+                    gift.image_path = None
+
+        self.logger.info(f"Found {len(gifts)} new gifts from {scraper.__class__.__name__}")
+        return gifts
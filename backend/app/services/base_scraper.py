@@ -1,33 +1,317 @@
 # base_scraper.py
 from abc import ABC, abstractmethod
-from app.models.gift import Gift
+from app.models.gift import ScrapedGift
 from typing import List, Dict, Optional
+from contextlib import contextmanager
 from pathlib import Path
 import logging
-from urllib.parse import urlparse
+from urllib.parse import urldefrag, urljoin, urlparse, urlsplit, urlunsplit
 import os  # Also needed for os.path.splitext
-import requests
+import re
+import json
+import hashlib
+import copy
+import threading
+from selenium.webdriver.chrome.service import Service
+from bs4 import BeautifulSoup
+from webdriver_manager.chrome import ChromeDriverManager
+from .host_scheduler import get_scheduler
+from .page_cache import get_page_cache
+from .classifier import get_classifier
+from .crawl_controller import CrawlController
+from app.telemetry import span
+from config import Config
+
+# URL patterns (Network.setBlockedURLs wildcards) per resource type Chrome may skip on listing pages
+RESOURCE_PATTERNS = {
+    'image': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*'],
+    'stylesheet': ['*.css*']
+}
+
+# Analytics, ads, consent and A/B testing hosts seen on the source sites
+THIRD_PARTY_HOSTS = [
+    'googletagmanager.com', 'google-analytics.com', 'doubleclick.net', 'googleadservices.com',
+    'adobedtm.com', 'onetrust.com', 'cookielaw.org', 'visualwebsiteoptimizer.com', 'vwo.com',
+    'facebook.net', 'facebook.com', 'creativecdn.com', 'freshrelevance.com', 'hotjar.com',
+    'tiktok.com', 'klarna.com', 'youtube.com', 'trustpilot.com', 'bing.com', 'pinterest.com'
+]
+
+# First number in a listing's price text, after thousands separators are removed
+PRICE_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+class PageLoadError(Exception):
+    """A listing page answered with an HTTP error, after any retries"""
+    pass
+
+def parse_price(text: str) -> float:
+    """Price from listing text such as '£1,299.00' or 'From £49'"""
+    match = PRICE_PATTERN.search((text or '').replace(',', ''))
+    if not match:
+        raise ValueError(f"No price in {text!r}")
+    return float(match.group())
+
+def canonical_link(link: str, base_url: str) -> str:
+    """Absolute product link without its fragment"""
+    if not link or not link.strip():
+        raise ValueError("Product has no link")
+    return urldefrag(urljoin(base_url, link.strip())).url
+
+_deferred = threading.local()
+
+@contextmanager
+def deferred_image_downloads():
+    """
+    Collect (scraper, image_url, image_path) for images requested on this thread
+    instead of downloading them inline; the caller fetches them with fetch_image()
+    """
+    pending = []
+    _deferred.pending = pending
+    try:
+        yield pending
+    finally:
+        _deferred.pending = None
 
 class BaseScraper(ABC):
-    def __init__(self, image_folder: Path, debug_folder: Path):
+    # Short identifier used for crawl targets and fixture folders
+    source_key = None
+    # Request headers that change what a page renders, part of the page cache key
+    cache_headers = {}
+    # CSS selector matching one product on a listing page
+    item_selector = None
+    # Resource types (RESOURCE_PATTERNS keys) and third-party hosts this source's listings still need
+    allowed_resource_types = ()
+    allowed_hosts = ()
+    # Keyword rule set (classifier.RULES key) that sets category and tags
+    classifier_rules = 'default'
+    # Most products one scrape collects, and the query parameter selecting a listing page
+    max_items = 25
+    page_param = 'page'
+
+    def __init__(self, image_folder: Path, debug_folder: Path, fixture_dir: Optional[Path] = None):
         self.image_folder = image_folder
         self.debug_folder = debug_folder
+        # When set, pages are loaded from local fixture files instead of the live site
+        self.fixture_dir = Path(fixture_dir) if fixture_dir else None
+        self._service = None
+        # Scrape workers keep one Chrome session across scrapes instead of starting one per scrape
+        self.keep_driver = False
+        self._driver = None
+        # Every page load and image download goes through the shared per-host scheduler
+        self.scheduler = get_scheduler()
+        self.page_cache = get_page_cache()
+        self.download_images = True
+        # Chrome only fetches what the listing needs to render its products, see blocked_url_patterns()
+        self.block_resources = Config.SCRAPE_BLOCK_RESOURCES
+        self.classifier = get_classifier(self.classifier_rules)
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    def scrape(self, criteria: Dict) -> List[ScrapedGift]:
+        """Scrape gifts for the criteria, paging through the listings until the CrawlController stops"""
+        return self.crawl(criteria).items
+
+    def crawl(self, criteria: Dict, full: bool = False) -> CrawlController:
+        """
+        Like scrape(), returning the finished controller: items plus stats on pages covered
+        and why it stopped. full=True walks the whole listing, for the background crawler.
+        """
+        controller = CrawlController(self, criteria, full=full)
+        controller.run()
+        return controller
+
+    def _take_driver(self):
+        """The kept Chrome session, if any; a crawl hands it back with _return_driver()"""
+        driver, self._driver = self._driver, None
+        return driver
+
+    def _return_driver(self, driver, failed: bool = False):
+        """Keep a driver for the next scrape when keep_driver is set and it didn't fail, otherwise quit it"""
+        if driver is None:
+            return
+        if self.keep_driver and not failed:
+            self._driver = driver
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error closing Chrome: {str(e)}")
+
+    def close_driver(self):
+        """Quit the kept Chrome session, if any"""
+        self._return_driver(self._take_driver(), failed=True)
+
+    def page_url(self, url: str, page: int) -> str:
+        """URL of a later page of a search URL's listing; page 1 is the search URL itself"""
+        if page == 1:
+            return url
+        parts = urlsplit(url)
+        query = [pair for pair in parts.query.split('&') if pair and not pair.startswith(f"{self.page_param}=")]
+        query.append(f"{self.page_param}={page}")
+        return urlunsplit(parts._replace(query='&'.join(query)))
+
+    @abstractmethod
+    def _get_driver(self):
+        """Create a configured WebDriver instance"""
+        pass
+
+    def blocked_url_patterns(self) -> List[str]:
+        """URL patterns Chrome is told not to fetch for this source"""
+        patterns = []
+        for resource_type, type_patterns in RESOURCE_PATTERNS.items():
+            if resource_type not in self.allowed_resource_types:
+                patterns.extend(type_patterns)
+        for host in THIRD_PARTY_HOSTS:
+            if host not in self.allowed_hosts:
+                patterns.append(f"*{host}/*")
+        return patterns
+
+    def _chrome_options(self, options):
+        """
+        Copy of options with the performance log on, for page status codes (see
+        _document_status), and image loading disabled by preference when images are blocked
+        """
+        options = copy.deepcopy(options)
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        if self.block_resources and 'image' not in self.allowed_resource_types:
+            # Catches images whose URLs don't end in a known extension (resizing CDNs)
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        return options
+
+    def _block_resources(self, driver):
+        """Install the blocked URL patterns on a new driver through the DevTools protocol"""
+        if not self.block_resources:
+            return
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns()})
+        except Exception as e:
+            self.logger.warning(f"Could not enable resource blocking: {str(e)}")
+
+    def _scroll_and_wait(self, driver):
+        """Give lazily loaded listings time to render before the page is captured"""
+        pass
+
     @abstractmethod
-    def scrape(self, criteria: Dict) -> List[Gift]:
-        """Scrape gifts based on given criteria"""
+    def _parse_gift_element(self, element, max_price) -> Optional[ScrapedGift]:
+        """Build a ScrapedGift from one product element, or None if it should be skipped"""
         pass
 
+    def _parse_page(self, html: str, max_price, limit: Optional[int] = None) -> List[ScrapedGift]:
+        """Parse up to limit products from a rendered listing page and classify them in one pass"""
+        with span('parse'):
+            soup = BeautifulSoup(html, 'html.parser')
+            elements = soup.select(self.item_selector)[:limit]
+        
+        gifts = []
+        for element in elements:
+            gift = self._parse_gift_element(element, max_price)
+            if gift:
+                gifts.append(gift)
+
+        classified = self.classifier.classify_batch([(gift.name, gift.price) for gift in gifts])
+        for gift, (category, tags) in zip(gifts, classified):
+            gift.category = category
+            gift.tags = tags
+        return gifts
+
     @abstractmethod
     def get_search_urls(self, criteria: Dict) -> List[str]:
         """Generate search URLs based on criteria"""
         pass
 
+    def crawl_criteria(self) -> List[Dict]:
+        """Enumerate criteria covering this source's search space for the crawler"""
+        return [{}]
+
+    def _get_service(self) -> Service:
+        """Chrome driver service, created on first use"""
+        if self._service is None:
+            self._service = Service(ChromeDriverManager().install())
+        return self._service
+
+    @property
+    def offline(self) -> bool:
+        """True when pages come from fixtures or a cache replay, so nothing may touch the network"""
+        return bool(self.fixture_dir) or self.page_cache.mode == 'replay'
+
+    def _fetch_page(self, url: str, driver=None):
+        """
+        Rendered HTML for a search URL, from fixtures or the page cache when possible.
+        The driver is only created on a cache miss; returns (html, driver).
+        """
+        if self.fixture_dir:
+            return self._fixture_path(url).read_text(encoding='utf-8'), driver
+
+        with span('page.cache'):
+            html = self.page_cache.get(url, self.cache_headers)
+        if html is not None:
+            self.logger.info(f"Page cache hit for {url}")
+            return html, driver
+
+        if driver is None:
+            with span('chrome.start'):
+                driver = self._get_driver()
+
+        with span('page.load'):
+            self._load_page(driver, url)
+        with span('page.wait'):
+            self._scroll_and_wait(driver)
+            html = driver.page_source
+        self.page_cache.put(url, html, self.cache_headers)
+        return html, driver
+
+    def _load_page(self, driver, url: str):
+        """
+        Navigate the driver to a search URL, respecting the host's rate limit. A 429/5xx
+        document backs the host off and is retried like any scheduled fetch; an error
+        page left after that raises PageLoadError so it is neither parsed nor cached.
+        """
+        for attempt in range(self.scheduler.max_retries + 1):
+            self._document_status(driver)  # Drains the log of entries from earlier pages
+            with self.scheduler.slot(url):
+                driver.get(url)
+            status, retry_after = self._document_status(driver)
+            if not self.scheduler.should_retry(url, status, attempt, retry_after):
+                break
+
+        if status and status >= 400:
+            raise PageLoadError(f"HTTP {status} loading {url}")
+
+    def _document_status(self, driver):
+        """
+        (status, Retry-After seconds) of the page the driver just loaded, from the
+        Network.responseReceived event in its performance log; (None, None) if unknown
+        """
+        try:
+            for entry in driver.get_log('performance'):
+                message = json.loads(entry['message'])['message']
+                if message['method'] != 'Network.responseReceived' or message['params'].get('type') != 'Document':
+                    continue
+                # The first document is the main frame's; iframes follow it
+                response = message['params']['response']
+                headers = {name.lower(): value for name, value in response.get('headers', {}).items()}
+                try:
+                    retry_after = float(headers.get('retry-after'))
+                except (TypeError, ValueError):
+                    retry_after = None
+                return response.get('status'), retry_after
+        except Exception as e:
+            self.logger.debug(f"No performance log for the page status: {str(e)}")
+        return None, None
+
+    def _fixture_path(self, url: str) -> Path:
+        """Fixture file for a search URL, falling back to the source's index page"""
+        folder = self.fixture_dir / self.source_key
+        fixture = folder / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.html"
+        if not fixture.exists():
+            fixture = folder / 'index.html'
+        return fixture
+
     def _download_image(self, image_url: str, gift_id: str) -> Optional[str]:
         """Common image download functionality"""
         try:
-            if not image_url:
+            if not image_url or self.offline or not self.download_images:
                 return None
                 
             parsed_url = urlparse(image_url)
@@ -35,12 +319,13 @@ class BaseScraper(ABC):
             filename = f"gift_{gift_id}{ext}"
             image_path = self.image_folder / filename
             
-            response = requests.get(image_url, stream=True)
-            response.raise_for_status()
+            pending = getattr(_deferred, 'pending', None)
+            if pending is not None:
+                pending.append((self, image_url, image_path))
+                return f"/static/gift_images/{filename}"
             
-            with open(image_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            if not self.fetch_image(image_url, image_path):
+                return None
                     
             self.logger.info(f"Saved image for gift {gift_id} to {image_path}")
             return f"/static/gift_images/{filename}"
@@ -49,45 +334,18 @@ class BaseScraper(ABC):
             self.logger.error(f"Error downloading image from {image_url}: {str(e)}")
             return None
 
-    def _determine_category(self, title: str, price: float) -> str:
-        """Common category determination logic"""
-        title_lower = title.lower()
-        
-        categories = {
-            'driving': ['driving', 'car', 'racing', 'track day', 'supercar'],
-            'food_drink': ['dining', 'restaurant', 'food', 'drink', 'tasting'],
-            'spa': ['spa', 'massage', 'facial', 'beauty', 'treatment'],
-            'adventure': ['adventure', 'outdoor', 'flying', 'skydiving'],
-            'short_breaks': ['hotel', 'stay', 'break', 'getaway', 'night'],
-            'entertainment': ['theatre', 'show', 'concert', 'cinema'],
-            'sports': ['football', 'golf', 'stadium', 'match', 'training'],
-            'experiences': ['experience', 'tour', 'lesson', 'class']
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in title_lower for keyword in keywords):
-                return category
+    def fetch_image(self, image_url: str, image_path: Path) -> bool:
+        """Download one image to image_path through the host scheduler"""
+        try:
+            # The host slot is held until the whole body is written
+            with span('image.download'), self.scheduler.open('GET', image_url, 'image', stream=True) as response:
+                response.raise_for_status()
                 
-        return 'luxury' if price >= 200 else 'experiences'
-
-    def _generate_tags(self, title: str, category: str) -> str:
-        """Common tag generation logic"""
-        tags = {category}
-        title_lower = title.lower()
-        
-        experience_keywords = {
-            'romantic': ['couple', 'romantic', 'date', 'two'],
-            'family': ['family', 'kids', 'children'],
-            'adventure': ['thrill', 'adventure', 'exciting'],
-            'relaxation': ['spa', 'massage', 'relax', 'pamper'],
-            'food_lover': ['dining', 'tasting', 'gourmet'],
-            'outdoor': ['outdoor', 'nature', 'garden'],
-            'cultural': ['theatre', 'museum', 'art'],
-            'learning': ['class', 'lesson', 'workshop']
-        }
-        
-        for tag, keywords in experience_keywords.items():
-            if any(keyword in title_lower for keyword in keywords):
-                tags.add(tag)
-        
-        return ','.join(sorted(tags))
\ No newline at end of file
+                with open(image_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error downloading image from {image_url}: {str(e)}")
+            return False
@@ -1,63 +1,37 @@
 # buyagift_scraper.py
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from .base_scraper import BaseScraper
-from app.models.gift import Gift
+from .base_scraper import BaseScraper, canonical_link, parse_price
+from app.models.gift import ScrapedGift
 from config import Config
 from typing import List, Dict
 import time
 from urllib.parse import urlparse
 
 class BuyAGiftScraper(BaseScraper):
-    def __init__(self, image_folder, debug_folder):
-        super().__init__(image_folder, debug_folder)
+    source_key = 'buyagift'
+    item_selector = '[data-product-id]'
+    # Lazy product images only get their real src once laid out in the viewport, which needs the CSS
+    allowed_resource_types = ('stylesheet',)
+
+    def __init__(self, image_folder, debug_folder, fixture_dir=None):
+        super().__init__(image_folder, debug_folder, fixture_dir)
         self.base_url = "https://www.buyagift.co.uk"
         self.chrome_options = Options()
         self.chrome_options.add_argument('--headless')
         self.chrome_options.add_argument('--no-sandbox')
         self.chrome_options.add_argument('--disable-dev-shm-usage')
-        self.service = Service(ChromeDriverManager().install())
 
-    def scrape(self, criteria: Dict) -> List[Gift]:
-        gifts = []
-        driver = None
-        MAX_GIFTS = 25
-        
-        try:
-            driver = self._get_driver()
-            search_urls = self.get_search_urls(criteria)
-            max_price = criteria.get('max_price', 1000)
-            
-            for url in search_urls:
-                if len(gifts) >= MAX_GIFTS:
-                    break
-                    
-                try:
-                    self.logger.info(f"Scraping URL: {url}")
-                    driver.get(url)
-                    
-                    self._scroll_and_wait(driver)
-                    gift_elements = driver.find_elements(By.CSS_SELECTOR, '[data-product-id]')
-                    
-                    for element in gift_elements[:MAX_GIFTS - len(gifts)]:
-                        gift = self._parse_gift_element(element, max_price)
-                        if gift:
-                            gifts.append(gift)
-                            
-                except Exception as e:
-                    self.logger.error(f"Error scraping URL {url}: {str(e)}")
-                    continue
-                    
-        finally:
-            if driver:
-                driver.quit()
-                
-        return gifts[:MAX_GIFTS]
+        # Gift categories to BuyAGift category filters
+        self.category_mapping = {
+            'fitness': 'Adventure+Experiences',
+            'sports_outdoor': 'Adventure+Experiences',
+            'driving': 'Driving+Experiences',
+            'food': 'Food+and+Drink'
+        }
 
     def get_search_urls(self, criteria: Dict) -> List[str]:
         """Generate BuyAGift search URLs based on criteria"""
@@ -78,16 +52,9 @@ class BuyAGiftScraper(BaseScraper):
         if keyword:
             keyword = keyword.replace(' ', '+')
             
-        category_mapping = {
-            'fitness': 'Adventure+Experiences',
-            'sports_outdoor': 'Adventure+Experiences',
-            'driving': 'Driving+Experiences',
-            'food': 'Food+and+Drink'
-        }
-        
         if criteria.get('categories'):
             for category in criteria['categories']:
-                if buyagift_category := category_mapping.get(category):
+                if buyagift_category := self.category_mapping.get(category):
                     url = f"{base_url}?filter=&Categories={buyagift_category}"
                     if keyword:
                         url += f"&keyword={keyword}"
@@ -98,8 +65,14 @@ class BuyAGiftScraper(BaseScraper):
             
         return urls or [f"{base_url}?filter="]
 
+    def crawl_criteria(self) -> List[Dict]:
+        """One crawl per BuyAGift category plus the unfiltered listing"""
+        return [{}] + [{'categories': [category]} for category in self.category_mapping]
+
     def _get_driver(self):
-        return webdriver.Chrome(service=self.service, options=self.chrome_options)
+        driver = webdriver.Chrome(service=self._get_service(), options=self._chrome_options(self.chrome_options))
+        self._block_resources(driver)
+        return driver
 
     def _scroll_and_wait(self, driver):
         viewport_height = driver.execute_script("return window.innerHeight")
@@ -111,35 +84,33 @@ class BuyAGiftScraper(BaseScraper):
             
         driver.execute_script("window.scrollTo(0, 0);")
         time.sleep(2)
-
-    def _parse_gift_element(self, element, max_price):
+        
+        # Product images are lazy loaded; make sure they have real URLs before the page is captured
         try:
-            wait = WebDriverWait(element.parent, 10)
-            wait.until(lambda d: element.find_element(
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((
                 By.CSS_SELECTOR,
                 'div[data-media-carousel="true"] img[src*="buyagift.co.uk/common/client/Images/Product"]'
-            ).get_attribute('src'))
-            
-            title = element.find_element(By.CSS_SELECTOR, 'h3[data-testid="product-name"]').get_attribute('title')
-            price_text = element.find_element(By.CSS_SELECTOR, 'span[data-testid="price"]').text
-            price = float(price_text.replace('£', '').replace(',', ''))
-            link = element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href').split('#')[0]
-            full_link = self.base_url + link if not link.startswith('http') else link
-            image_url = element.find_element(By.CSS_SELECTOR, 'div[data-media-carousel="true"] img').get_attribute('src')
+            )))
+        except Exception as e:
+            self.logger.warning(f"Product images did not load: {str(e)}")
+
+    def _parse_gift_element(self, element, max_price):
+        try:
+            title = element.select_one('h3[data-testid="product-name"]')['title']
+            price_text = element.select_one('span[data-testid="price"]').get_text(strip=True)
+            price = parse_price(price_text)
+            link = canonical_link(element.select_one('a')['href'], self.base_url)
+            image_url = element.select_one('div[data-media-carousel="true"] img').get('src')
             
             if price <= max_price:
-                category = self._determine_category(title, price)
-                tags = self._generate_tags(title, category)
                 image_path = self._download_image(image_url, title) if image_url else None
                 
-                return Gift(
+                return ScrapedGift(
                     name=title,
                     price=price,
-                    affiliate_link=full_link,
+                    affiliate_link=link,
                     source="BuyAGift",
-                    image_path=image_path,
-                    category=category,
-                    tags=tags
+                    image_path=image_path
                 )
                 
         except Exception as e:
@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional
+import logging
+import threading
+import time
+from app import db
+from config import Config
+from .query_log import QueryLog, get_query_log
+from .search_pipeline import SearchContext
+
+class CacheWarmer:
+    """
+    Replays the most frequent logged searches through the NLP service and the search
+    pipeline, filling the NLP and result caches before real traffic asks for them.
+    Without logged descriptions (QUERY_LOG_DESCRIPTIONS) the criteria are replayed
+    directly, which fills the result cache only.
+    Replays are read-only: nothing is scraped and no crawl demand is recorded, so
+    restarts don't inflate hit counts. Searches the catalog answers thinly are
+    crawled straight away with crawl=True.
+    Warm-up lookups don't count towards the caches' hit rates.
+    """
+
+    def __init__(self, gift_service, nlp_service, query_log: Optional[QueryLog] = None):
+        self.gift_service = gift_service
+        self.nlp_service = nlp_service
+        self.query_log = query_log or get_query_log()
+        self.thin: List[Dict] = []  # Criteria of the replayed searches that came back thin
+        self.logger = logging.getLogger(__name__)
+
+    def warm(self, top_n: int, crawl: bool = False, budget_seconds: Optional[int] = None) -> Dict:
+        started = time.monotonic()
+        stats = {'queries': 0, 'cached': 0, 'thin': 0, 'errors': 0}
+        entries = self.query_log.top(top_n) if self.query_log and top_n > 0 else []
+
+        pipeline = self.gift_service.pipeline
+        self.thin = []
+        with self.nlp_service.cache.uncounted(), pipeline.cache.uncounted():
+            for entry in entries:
+                context = SearchContext(entry['description'] or None, None if entry['description'] else entry['criteria'])
+                context.read_only = True
+                try:
+                    pipeline.run(context, self.nlp_service)
+                    stats['queries'] += 1
+                    if context.thin:
+                        self.thin.append(context.criteria)
+                    else:
+                        stats['cached'] += 1
+                except Exception as e:
+                    self.logger.error(f"Error warming search {entry['criteria']}: {str(e)}")
+                    stats['errors'] += 1
+                finally:
+                    db.session.remove()
+
+        stats['thin'] = len(self.thin)
+        if crawl and self.thin:
+            from .crawler_service import CrawlerService
+            stats['crawl'] = CrawlerService().run_for(self.thin, budget_seconds)
+
+        stats['seconds'] = round(time.monotonic() - started, 2)
+        self.logger.info(f"Cache warm-up finished: {stats}")
+        return stats
+
+_warmup = {'state': 'idle', 'stats': None}
+_warmup_lock = threading.Lock()
+
+def start_warmup(app, gift_service, nlp_service):
+    """
+    Warm this process's caches in a background thread, once; called on the first
+    request (or ASGI lifespan startup) so CLI commands that build the app don't replay searches
+    """
+    with _warmup_lock:
+        if _warmup['state'] != 'idle':
+            return
+        if Config.CACHE_WARMUP_TOP_N <= 0 or get_query_log() is None:
+            _warmup['state'] = 'disabled'
+            return
+        _warmup['state'] = 'running'
+
+    def run():
+        with app.app_context():
+            try:
+                _warmup['stats'] = CacheWarmer(gift_service, nlp_service).warm(
+                    Config.CACHE_WARMUP_TOP_N, crawl=Config.CACHE_WARMUP_CRAWL)
+            finally:
+                _warmup['state'] = 'done'
+
+    threading.Thread(target=run, name='cache-warmup', daemon=True).start()
+
+def warmup_status() -> Dict:
+    return dict(_warmup)
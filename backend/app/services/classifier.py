@@ -0,0 +1,198 @@
+from bisect import bisect_right
+from typing import Callable, Dict, List, Sequence, Tuple
+import logging
+import re
+from app import db
+from app.models.gift import Gift
+
+# Keyword rules per source family. Matching is by substring of the lowercased title,
+# the first matching category wins, and every matching tag is added.
+DEFAULT_CATEGORIES = {
+    'driving': ['driving', 'car', 'racing', 'track day', 'supercar'],
+    'food_drink': ['dining', 'restaurant', 'food', 'drink', 'tasting'],
+    'spa': ['spa', 'massage', 'facial', 'beauty', 'treatment'],
+    'adventure': ['adventure', 'outdoor', 'flying', 'skydiving'],
+    'short_breaks': ['hotel', 'stay', 'break', 'getaway', 'night'],
+    'entertainment': ['theatre', 'show', 'concert', 'cinema'],
+    'sports': ['football', 'golf', 'stadium', 'match', 'training'],
+    'experiences': ['experience', 'tour', 'lesson', 'class']
+}
+
+DEFAULT_TAGS = {
+    'romantic': ['couple', 'romantic', 'date', 'two'],
+    'family': ['family', 'kids', 'children'],
+    'adventure': ['thrill', 'adventure', 'exciting'],
+    'relaxation': ['spa', 'massage', 'relax', 'pamper'],
+    'food_lover': ['dining', 'tasting', 'gourmet'],
+    'outdoor': ['outdoor', 'nature', 'garden'],
+    'cultural': ['theatre', 'museum', 'art'],
+    'learning': ['class', 'lesson', 'workshop']
+}
+
+FIREBOX_CATEGORIES = {
+    'gadgets': ['tech', 'gadget', 'electronic', 'smart', 'digital'],
+    'food_drink': ['beer', 'wine', 'whisky', 'food', 'drink', 'snack', 'chocolate', 'coffee'],
+    'gaming': ['game', 'gaming', 'playstation', 'xbox', 'nintendo', 'console'],
+    'experiences': ['experience', 'adventure', 'activity', 'lesson', 'class'],
+    'novelty': ['funny', 'joke', 'novelty', 'humor', 'weird'],
+    'home': ['home', 'kitchen', 'garden', 'decor', 'living'],
+    'entertainment': ['entertainment', 'movie', 'music', 'party', 'fun'],
+    'sports_outdoor': ['sport', 'fitness', 'outdoor', 'exercise', 'camping']
+}
+
+FIREBOX_TAGS = {
+    'beer': ['beer', 'ale', 'lager', 'craft beer'],
+    'wine': ['wine', 'champagne', 'prosecco'],
+    'whisky': ['whisky', 'whiskey', 'bourbon'],
+    'geeky': ['geek', 'nerd', 'sci-fi', 'science', 'tech'],
+    'gaming': ['game', 'gaming', 'playstation', 'xbox', 'nintendo'],
+    'animals': ['animal', 'pet', 'dog', 'cat'],
+    'gadgets': ['gadget', 'tech', 'electronic', 'digital'],
+    'cooking': ['cook', 'kitchen', 'chef', 'food'],
+    'outdoor': ['outdoor', 'garden', 'camping', 'nature'],
+    'party': ['party', 'celebration', 'fun', 'entertainment'],
+    'novelty': ['funny', 'joke', 'humor', 'weird', 'unusual']
+}
+
+# Gift.source -> rule set, for reclassifying stored gifts
+SOURCE_RULES = {
+    'BuyAGift': 'default',
+    'Prezzybox': 'default',
+    'Firebox': 'firebox'
+}
+
+class KeywordClassifier:
+    """
+    Category and tags for product titles from one rule set. All keywords are compiled
+    into a single regex that reports every keyword occurrence in one scan; each keyword
+    carries a bitmask of the categories and tags it (or any keyword inside it) selects,
+    so a title's result is the OR of its matches' masks.
+    """
+
+    CACHE_SIZE = 4096
+
+    def __init__(self, categories: Dict[str, List[str]], tags: Dict[str, List[str]],
+                 fallback: Callable[[float], str], separator: str = ','):
+        self.categories = list(categories)
+        self.tags = list(tags)
+        self.fallback = fallback
+        self.separator = separator
+        self._tags: Dict[Tuple[int, str], str] = {}
+
+        # Category bits come first, in rule order, so the lowest set bit is the first match
+        own_masks: Dict[str, int] = {}
+        for bit, keywords in enumerate(list(categories.values()) + list(tags.values())):
+            for keyword in keywords:
+                own_masks[keyword] = own_masks.get(keyword, 0) | (1 << bit)
+
+        # Only the longest keyword at a position is reported, so a match also
+        # counts for every keyword it contains ('funny' is also 'fun')
+        self._masks = {
+            keyword: self._closure(keyword, own_masks)
+            for keyword in own_masks
+        }
+        self._category_mask = (1 << len(self.categories)) - 1
+        alternatives = '|'.join(re.escape(keyword) for keyword in sorted(own_masks, key=len, reverse=True))
+        # Zero-width lookahead so overlapping keywords ('sparty': 'spa', 'party') are all found
+        self._pattern = re.compile(f'(?=({alternatives}))')
+
+    @staticmethod
+    def _closure(keyword: str, own_masks: Dict[str, int]) -> int:
+        mask = 0
+        for other, other_mask in own_masks.items():
+            if other in keyword:
+                mask |= other_mask
+        return mask
+
+    def classify(self, title: str, price: float) -> Tuple[str, str]:
+        """(category, tags) for one title"""
+        mask = 0
+        for keyword in self._pattern.findall((title or '').lower()):
+            mask |= self._masks[keyword]
+        return self._result(mask, price)
+
+    def classify_batch(self, items: Sequence[Tuple[str, float]]) -> List[Tuple[str, str]]:
+        """(category, tags) for each (title, price), scanning all titles in one regex pass"""
+        titles = [(title or '').lower() for title, _ in items]
+        starts = []
+        offset = 0
+        for title in titles:
+            starts.append(offset)
+            offset += len(title) + 1
+
+        # Keywords never contain a newline, so no match spans two titles
+        masks = [0] * len(titles)
+        for match in self._pattern.finditer('\n'.join(titles)):
+            index = bisect_right(starts, match.start()) - 1
+            masks[index] |= self._masks[match.group(1)]
+
+        return [self._result(mask, price) for mask, (_, price) in zip(masks, items)]
+
+    def _result(self, mask: int, price: float) -> Tuple[str, str]:
+        category_bits = mask & self._category_mask
+        if category_bits:
+            category = self.categories[(category_bits & -category_bits).bit_length() - 1]
+        else:
+            category = self.fallback(price)
+
+        # Titles share few keyword combinations, so the joined tags are cached
+        tags = self._tags.get((mask, category))
+        if tags is None:
+            names = {category}
+            tag_bits = mask >> len(self.categories)
+            for tag in self.tags:
+                if tag_bits & 1:
+                    names.add(tag)
+                tag_bits >>= 1
+            tags = self.separator.join(sorted(names))
+            if len(self._tags) >= self.CACHE_SIZE:
+                self._tags.clear()
+            self._tags[(mask, category)] = tags
+        return category, tags
+
+RULES = {
+    'default': KeywordClassifier(
+        DEFAULT_CATEGORIES, DEFAULT_TAGS,
+        fallback=lambda price: 'luxury' if price >= 200 else 'experiences'
+    ),
+    'firebox': KeywordClassifier(
+        FIREBOX_CATEGORIES, FIREBOX_TAGS,
+        fallback=lambda price: 'novelty',
+        separator=', '
+    )
+}
+
+def get_classifier(rules: str) -> KeywordClassifier:
+    return RULES[rules]
+
+def reclassify_catalog(batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Re-run the current rules over every stored gift from a scraped source, in id
+    order, updating category, tags and content hash where they changed
+    """
+    logger = logging.getLogger(__name__)
+    stats = {'gifts': 0, 'changed': 0}
+    for source, rules in SOURCE_RULES.items():
+        classifier = get_classifier(rules)
+        last_id = 0
+        while True:
+            gifts = Gift.query.filter(Gift.source == source, Gift.id > last_id) \
+                .order_by(Gift.id).limit(batch_size).all()
+            if not gifts:
+                break
+            classified = classifier.classify_batch([(gift.name, gift.price) for gift in gifts])
+            for gift, (category, tags) in zip(gifts, classified):
+                if (gift.category, gift.tags) != (category, tags):
+                    gift.category = category
+                    gift.tags = tags
+                    gift.content_hash = gift.compute_content_hash()
+                    stats['changed'] += 1
+            stats['gifts'] += len(gifts)
+            last_id = gifts[-1].id
+            if dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+
+    logger.info(f"Reclassified catalog{' (dry run)' if dry_run else ''}: {stats}")
+    return stats
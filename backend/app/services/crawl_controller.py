@@ -0,0 +1,143 @@
+from typing import Dict, Iterator, List, Optional
+import heapq
+import logging
+import time
+from app.models.gift import ScrapedGift
+from .search_pipeline import tag_terms
+from config import Config
+
+class CrawlController:
+    """
+    Pages through one source's listings for a search, following each search URL's
+    pagination and feeding every new product into a running top-k by relevance
+    (criteria terms found in the title and tags). It stops at the first of:
+
+        no_terms     the top k are filled and the criteria have no terms to rank by
+        saturated    the top k are all full matches, so no later page can improve them
+        filled       the top k are filled; later pages might hold better matches, but a
+                     request-path scrape doesn't wait for another page load to find them
+        max_items    the scraper's max_items products are collected
+        page_budget  SCRAPE_MAX_PAGES pages fetched
+        time_budget  SCRAPE_TIME_BUDGET seconds spent
+        exhausted    every search URL ran out of pages
+        incomplete   as exhausted, but some page failed to load, so its listing was cut short
+
+    The top k stops are checked before every page, so a scrape loads one page
+    unless it holds fewer than k products. A page that adds no products not
+    already seen ends that search URL's pagination. Only an exhausted crawl has
+    seen everything the listings hold.
+
+    With full=True (the background crawler) there are no top k or max_items stops:
+    the listings are walked until they are exhausted or CRAWL_MAX_PAGES /
+    CRAWL_TARGET_TIME_BUDGET run out, so gifts that dropped off them can be expired.
+    """
+
+    def __init__(self, scraper, criteria: Dict, top_k: Optional[int] = None, max_pages: Optional[int] = None,
+                 time_budget: Optional[float] = None, full: bool = False):
+        self.scraper = scraper
+        self.criteria = criteria
+        self.full = full
+        self.top_k = top_k if top_k is not None else Config.SCRAPE_TOP_K
+        if max_pages is None:
+            max_pages = Config.CRAWL_MAX_PAGES if full else Config.SCRAPE_MAX_PAGES
+        if time_budget is None:
+            time_budget = Config.CRAWL_TARGET_TIME_BUDGET if full else Config.SCRAPE_TIME_BUDGET
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.max_items = None if full else scraper.max_items
+        self.terms = [str(term).lower() for term in tag_terms(criteria)]
+
+        self.items: List[ScrapedGift] = []
+        self.stats = {'pages': 0, 'items': 0, 'failed_pages': 0, 'stop': None}
+        self._top = []  # Min-heap of (score, -arrival, key)
+        self._seen = set()
+        self.logger = logging.getLogger(__name__)
+
+    def score(self, gift: ScrapedGift) -> int:
+        text = f"{gift.name} {gift.tags or ''}".lower()
+        return sum(1 for term in self.terms if term in text)
+
+    def top(self) -> List[str]:
+        """Keys of the current top k, best first"""
+        return [key for _, _, key in sorted(self._top, reverse=True)]
+
+    def run(self) -> List[ScrapedGift]:
+        for _ in self.pages():
+            pass
+        return self.items
+
+    def pages(self) -> Iterator[List[ScrapedGift]]:
+        """Yield the new products of each fetched page until a stop condition is met"""
+        started = time.monotonic()
+        max_price = self.criteria.get('max_price', 1000)
+        driver = self.scraper._take_driver()
+        failed = True
+        try:
+            for url in self.scraper.get_search_urls(self.criteria):
+                page = 1
+                while not self._stop_reason(started):
+                    page_url = self.scraper.page_url(url, page)
+                    try:
+                        self.logger.info(f"Scraping URL: {page_url}")
+                        html, driver = self.scraper._fetch_page(page_url, driver)
+                    except Exception as e:
+                        self.logger.error(f"Error scraping URL {page_url}: {str(e)}")
+                        self.stats['failed_pages'] += 1
+                        break
+                    self.stats['pages'] += 1
+
+                    limit = self.max_items - len(self.items) if self.max_items is not None else None
+                    fresh = self._add(self.scraper._parse_page(html, max_price, limit))
+                    if not fresh:
+                        break
+                    yield fresh
+                    page += 1
+
+                if self.stats['stop']:
+                    break
+            else:
+                self.stats['stop'] = 'incomplete' if self.stats['failed_pages'] else 'exhausted'
+            failed = bool(self.stats['failed_pages'])
+        finally:
+            # A driver that failed a page load may be wedged, so it is never kept
+            self.scraper._return_driver(driver, failed)
+
+        self.stats['items'] = len(self.items)
+        self.logger.info(f"{self.scraper.source_key} crawl stopped ({self.stats['stop']}) after "
+                         f"{self.stats['pages']} pages, {len(self.items)} gifts")
+
+    def _add(self, gifts: List[ScrapedGift]) -> List[ScrapedGift]:
+        """Keep the unseen gifts and offer them to the top k"""
+        fresh = []
+        for gift in gifts:
+            key = gift.affiliate_link or gift.name
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            fresh.append(gift)
+
+            entry = (self.score(gift), -len(self.items), key)
+            self.items.append(gift)
+            if len(self._top) < self.top_k:
+                heapq.heappush(self._top, entry)
+            elif entry > self._top[0]:
+                heapq.heapreplace(self._top, entry)
+        return fresh
+
+    def _stop_reason(self, started: float) -> Optional[str]:
+        reason = None
+        filled = not self.full and len(self._top) >= self.top_k
+        if self.max_items is not None and len(self.items) >= self.max_items:
+            reason = 'max_items'
+        elif filled and not self.terms:
+            reason = 'no_terms'
+        elif filled and all(score == len(self.terms) for score, _, _ in self._top):
+            reason = 'saturated'
+        elif filled:
+            reason = 'filled'
+        elif self.stats['pages'] >= self.max_pages:
+            reason = 'page_budget'
+        elif time.monotonic() - started >= self.time_budget:
+            reason = 'time_budget'
+        self.stats['stop'] = reason
+        return reason
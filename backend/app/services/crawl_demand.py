@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import logging
+import threading
+import time
+from app import db
+from app.models.crawl_target import CrawlTarget
+
+class CrawlDemand:
+    """
+    Request-path demand for crawl targets, counted in memory and written every
+    flush_seconds in one transaction instead of a commit per thin search.
+
+    Only searches whose URLs match a combination in a scraper's crawl space
+    (crawl_criteria()) count, so arbitrary criteria can't grow the target table;
+    the crawler keeps those targets in sync and ranks them by this demand.
+    """
+
+    def __init__(self, scrapers, flush_seconds: float):
+        self.scrapers = scrapers
+        self.flush_seconds = flush_seconds
+        self._crawl_space: Optional[Dict[str, Tuple[str, Dict, List[str]]]] = None
+        self._pending: Dict[str, List] = {}  # Target key -> [hits, last_requested_at]
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def crawl_space(self) -> Dict[str, Tuple[str, Dict, List[str]]]:
+        """Target key -> (source, criteria, urls) for every combination the crawler covers"""
+        if self._crawl_space is None:
+            space = {}
+            for scraper in self.scrapers:
+                for criteria in scraper.crawl_criteria():
+                    urls = scraper.get_search_urls(criteria)
+                    space.setdefault(CrawlTarget.make_key(scraper.source_key, urls),
+                                     (scraper.source_key, criteria, urls))
+            self._crawl_space = space
+        return self._crawl_space
+
+    def record(self, criteria: Dict) -> int:
+        """Count one thin search; returns how many crawl targets it maps to"""
+        now = datetime.utcnow()
+        space = self.crawl_space()
+        keys = [key for key in (CrawlTarget.make_key(scraper.source_key, scraper.get_search_urls(criteria))
+                                for scraper in self.scrapers) if key in space]
+
+        with self._lock:
+            for key in keys:
+                entry = self._pending.setdefault(key, [0, now])
+                entry[0] += 1
+                entry[1] = now
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+        return len(keys)
+
+    def flush(self):
+        """Add the buffered hits to their targets, creating any the crawler hasn't synced yet"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        try:
+            for key, (hits, last_requested_at) in pending.items():
+                updated = CrawlTarget.query.filter_by(key=key).update({
+                    CrawlTarget.hit_count: CrawlTarget.hit_count + hits,
+                    CrawlTarget.last_requested_at: last_requested_at
+                }, synchronize_session=False)
+                if not updated:
+                    target = CrawlTarget.get_or_create(*self.crawl_space()[key])
+                    target.hit_count = (target.hit_count or 0) + hits
+                    target.last_requested_at = last_requested_at
+            db.session.commit()
+
+        except Exception as e:
+            self.logger.error(f"Error recording crawl demand: {str(e)}")
+            db.session.rollback()
@@ -0,0 +1,162 @@
+from typing import List, Dict, Optional
+from datetime import datetime
+from pathlib import Path
+import logging
+import math
+import time
+from app import db
+from app.models.crawl_target import CrawlTarget
+from config import Config
+from .scraper_service import ScraperService
+from .ingest_service import IngestService
+
+class CrawlerService:
+    """
+    Keeps the gift catalog warm by scraping the search space in the background,
+    so the request path only has to read from the database.
+    """
+
+    def __init__(self, sources: Optional[List[str]] = None, fixture_dir: Optional[Path] = None):
+        self.scraper_service = ScraperService(sources or Config.CRAWL_SOURCES, fixture_dir)
+        self.scrapers = {scraper.source_key: scraper for scraper in self.scraper_service.scrapers}
+        self.ingest = IngestService()
+        self.logger = logging.getLogger(__name__)
+
+    def sync_targets(self) -> int:
+        """Make sure every combination in each scraper's search space has a crawl target"""
+        created = 0
+        try:
+            known = {key for (key,) in db.session.query(CrawlTarget.key).all()}
+
+            for source, scraper in self.scrapers.items():
+                for criteria in scraper.crawl_criteria():
+                    urls = scraper.get_search_urls(criteria)
+                    key = CrawlTarget.make_key(source, urls)
+                    if key in known:
+                        continue
+
+                    CrawlTarget.get_or_create(source, criteria, urls)
+                    known.add(key)
+                    created += 1
+
+            db.session.commit()
+            self.logger.info(f"Synced crawl targets, {created} new")
+
+        except Exception as e:
+            self.logger.error(f"Error syncing crawl targets: {str(e)}")
+            db.session.rollback()
+
+        return created
+
+    def select_targets(self, budget_pages: int, now: Optional[datetime] = None) -> List[CrawlTarget]:
+        """
+        Pick the targets to crawl this run. Fresh targets are skipped; the rest
+        are ranked by staleness weighted by request-path demand.
+        """
+        now = now or datetime.utcnow()
+        candidates = []
+
+        targets = CrawlTarget.query.filter(CrawlTarget.source.in_(list(self.scrapers))).all()
+        for target in targets:
+            if target.last_crawled_at:
+                age = (now - target.last_crawled_at).total_seconds()
+                if age < Config.CRAWL_STALE_AFTER:
+                    continue
+                staleness = age / Config.CRAWL_STALE_AFTER
+            else:
+                # Never crawled, treat as very stale
+                staleness = 10.0
+
+            score = staleness * (1 + math.log1p(target.hit_count or 0))
+            candidates.append((score, target))
+
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        return [target for _, target in candidates[:budget_pages]]
+
+    def run_once(self, budget_pages: Optional[int] = None, budget_seconds: Optional[int] = None) -> Dict:
+        """Crawl the highest priority targets until either budget runs out"""
+        budget_pages = budget_pages if budget_pages is not None else Config.CRAWL_BUDGET_PAGES
+
+        self.sync_targets()
+
+        return self._crawl(self.select_targets(budget_pages), budget_seconds)
+
+    def run_for(self, criteria_list: List[Dict], budget_seconds: Optional[int] = None) -> Dict:
+        """
+        Crawl the targets of these searches now, e.g. popular searches the catalog
+        answers thinly. Targets crawled within CRAWL_STALE_AFTER are skipped.
+        """
+        now = datetime.utcnow()
+        targets = {}
+        try:
+            for criteria in criteria_list:
+                for source, scraper in self.scrapers.items():
+                    target = CrawlTarget.get_or_create(source, criteria, scraper.get_search_urls(criteria))
+                    targets.setdefault(target.key, target)
+            db.session.commit()
+
+        except Exception as e:
+            self.logger.error(f"Error creating crawl targets: {str(e)}")
+            db.session.rollback()
+            return {'targets': 0, 'gifts': 0, 'errors': 1, 'seconds': 0.0}
+
+        due = [target for target in targets.values()
+               if not target.last_crawled_at
+               or (now - target.last_crawled_at).total_seconds() >= Config.CRAWL_STALE_AFTER]
+        return self._crawl(due, budget_seconds)
+
+    def _crawl(self, targets: List[CrawlTarget], budget_seconds: Optional[int] = None) -> Dict:
+        budget_seconds = budget_seconds if budget_seconds is not None else Config.CRAWL_BUDGET_SECONDS
+        started = time.monotonic()
+        stats = {'targets': 0, 'gifts': 0, 'errors': 0}
+
+        for target in targets:
+            if time.monotonic() - started >= budget_seconds:
+                self.logger.info("Crawl time budget exhausted")
+                break
+
+            scraper = self.scrapers[target.source]
+            try:
+                self.logger.info(f"Crawling {target.source} target {target.id}: {target.urls}")
+                crawl_started_at = datetime.utcnow()
+                # The whole listing, not just a request-path top k, so misses can be counted
+                crawl = scraper.crawl(target.get_criteria(), full=True)
+                gifts = crawl.items
+                if gifts:
+                    # Raises IngestError on failure, so nothing below counts misses
+                    # for gifts that were scraped but not written
+                    gifts = self.ingest.ingest(gifts, crawl_target=target)
+                    # An empty page is more likely a failed scrape than a delisted catalog, and
+                    # a crawl stopped early (page or time budget, failed page) never reached
+                    # the gifts further down, so only an exhausted crawl counts misses
+                    if crawl.stats['stop'] == 'exhausted':
+                        self.ingest.expire_unseen(target, crawl_started_at)
+
+                target.last_crawled_at = datetime.utcnow()
+                target.last_result_count = len(gifts)
+                db.session.commit()
+
+                stats['targets'] += 1
+                stats['gifts'] += len(gifts)
+
+            except Exception as e:
+                self.logger.error(f"Error crawling target {target.id}: {str(e)}")
+                db.session.rollback()
+                stats['errors'] += 1
+
+        stats['seconds'] = round(time.monotonic() - started, 2)
+        self.logger.info(f"Crawl run finished: {stats}")
+        return stats
+
+    def run_forever(self, interval: Optional[int] = None, budget_pages: Optional[int] = None,
+                    budget_seconds: Optional[int] = None):
+        """Daemon loop: crawl, then sleep until the next scheduled run"""
+        interval = interval if interval is not None else Config.CRAWL_INTERVAL
+        while True:
+            started = time.monotonic()
+            try:
+                self.run_once(budget_pages, budget_seconds)
+            finally:
+                # A fresh session per run, so nothing loaded by an earlier run is reused
+                db.session.remove()
+            time.sleep(max(0, interval - (time.monotonic() - started)))
@@ -1,25 +1,27 @@
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from .base_scraper import BaseScraper
-from app.models.gift import Gift
+from .base_scraper import BaseScraper, canonical_link, parse_price
+from app.models.gift import ScrapedGift
 from typing import List, Dict
 import time
+import itertools
 from urllib.parse import urlparse
 
 class FireboxScraper(BaseScraper):
-    def __init__(self, image_folder, debug_folder):
-        super().__init__(image_folder, debug_folder)
+    source_key = 'firebox'
+    item_selector = '.product-item'
+    classifier_rules = 'firebox'
+    max_items = 100
+
+    def __init__(self, image_folder, debug_folder, fixture_dir=None):
+        super().__init__(image_folder, debug_folder, fixture_dir)
         self.base_url = "https://firebox.com/gift-finder"
         self.chrome_options = Options()
         self.chrome_options.add_argument('--headless')
         self.chrome_options.add_argument('--no-sandbox')
         self.chrome_options.add_argument('--disable-dev-shm-usage')
-        self.service = Service(ChromeDriverManager().install())
 
         # URL parameter mappings
         self.gender_mapping = {
@@ -126,148 +128,74 @@ class FireboxScraper(BaseScraper):
         
         # Add product tags as a single parameter with comma-separated values
         if tag_ids:
-            params.append(f"product_tags={','.join(tag_ids)}")
+            params.append(f"product_tags={','.join(sorted(tag_ids))}")
         
         # Construct URL
         url = f"{self.base_url}?{'&'.join(params)}"
         self.logger.info(f"Generated URL with tags: {tag_ids}")  # Debug log
         return [url]
 
-    def _parse_gift_element(self, element, max_price) -> Gift:
+    def crawl_criteria(self) -> List[Dict]:
+        """Every gender x price band x product tag combination, including 'any'"""
+        combinations = []
+        genders = [None] + list(self.gender_mapping)
+        prices = [None] + sorted(self.price_mapping)
+        tags = [None] + list(self.product_tags_mapping)
+        
+        for gender, max_price, tag in itertools.product(genders, prices, tags):
+            criteria = {}
+            if gender:
+                criteria['gender'] = gender
+            if max_price:
+                criteria['max_price'] = max_price
+            if tag:
+                criteria['interests'] = [tag]
+            combinations.append(criteria)
+        
+        return combinations
+
+    def _parse_gift_element(self, element, max_price) -> ScrapedGift:
         try:
             # Get title from the product name div
-            title = element.find_element(By.CSS_SELECTOR, '.item-name.product-name-list').text
+            title = element.select_one('.item-name.product-name-list').get_text(strip=True)
             
             # Get price - find the price div and clean the text
-            price_text = element.find_element(By.CSS_SELECTOR, '.price').text
-            price = float(price_text.replace('£', '').replace(',', ''))
+            price_text = element.select_one('.price').get_text(strip=True)
+            price = parse_price(price_text)
             
             # Only check max_price if it's not None
             if max_price is not None and price > max_price:
                 return None
             
             # Get the product link from the main anchor tag
-            link = element.find_element(By.CSS_SELECTOR, 'a[href^="https://firebox.com/"]').get_attribute('href')
+            link = canonical_link(element.select_one('a[href^="https://firebox.com/"]')['href'], self.base_url)
             
             # Get image URL - try webp first, fall back to png
-            try:
-                image_url = element.find_element(By.CSS_SELECTOR, 'picture source[type="image/webp"]').get_attribute('srcset')
-            except:
-                image_url = element.find_element(By.CSS_SELECTOR, 'picture img').get_attribute('src')
+            webp_source = element.select_one('picture source[type="image/webp"]')
+            if webp_source and webp_source.get('srcset'):
+                image_url = webp_source['srcset']
+            else:
+                image_url = element.select_one('picture img').get('src')
             
-            # Determine category and tags based on Firebox's product tags
-            category = self._determine_firebox_category(title, link)
-            tags = self._generate_firebox_tags(title, category, link)
             image_path = self._download_image(image_url, title) if image_url else None
             
-            return Gift(
+            return ScrapedGift(
                 name=title,
                 price=price,
                 affiliate_link=link,
                 source="Firebox",
-                image_path=image_path,
-                category=category,
-                tags=tags
+                image_path=image_path
             )
         
         except Exception as e:
             self.logger.error(f"Error parsing gift element: {str(e)}")
             return None
 
-    def _determine_firebox_category(self, title: str, link: str) -> str:
-        """Determine the primary category based on Firebox's categorization"""
-        # Mapping of keywords to categories
-        category_keywords = {
-            'gadgets': ['tech', 'gadget', 'electronic', 'smart', 'digital'],
-            'food_drink': ['beer', 'wine', 'whisky', 'food', 'drink', 'snack', 'chocolate', 'coffee'],
-            'gaming': ['game', 'gaming', 'playstation', 'xbox', 'nintendo', 'console'],
-            'experiences': ['experience', 'adventure', 'activity', 'lesson', 'class'],
-            'novelty': ['funny', 'joke', 'novelty', 'humor', 'weird'],
-            'home': ['home', 'kitchen', 'garden', 'decor', 'living'],
-            'entertainment': ['entertainment', 'movie', 'music', 'party', 'fun'],
-            'sports_outdoor': ['sport', 'fitness', 'outdoor', 'exercise', 'camping']
-        }
-        
-        title_lower = title.lower()
-        
-        # Check title against keywords
-        for category, keywords in category_keywords.items():
-            if any(keyword in title_lower for keyword in keywords):
-                return category
-                
-        # Default to 'novelty' if no specific category is found
-        return 'novelty'
-
-    def _generate_firebox_tags(self, title: str, category: str, link: str) -> str:
-        """Generate tags based on Firebox's product information"""
-        tags = set()
-        title_lower = title.lower()
-        
-        # Add category as a tag
-        tags.add(category)
-        
-        # Add specific tags based on title keywords
-        tag_keywords = {
-            'beer': ['beer', 'ale', 'lager', 'craft beer'],
-            'wine': ['wine', 'champagne', 'prosecco'],
-            'whisky': ['whisky', 'whiskey', 'bourbon'],
-            'geeky': ['geek', 'nerd', 'sci-fi', 'science', 'tech'],
-            'gaming': ['game', 'gaming', 'playstation', 'xbox', 'nintendo'],
-            'animals': ['animal', 'pet', 'dog', 'cat'],
-            'gadgets': ['gadget', 'tech', 'electronic', 'digital'],
-            'cooking': ['cook', 'kitchen', 'chef', 'food'],
-            'outdoor': ['outdoor', 'garden', 'camping', 'nature'],
-            'party': ['party', 'celebration', 'fun', 'entertainment'],
-            'novelty': ['funny', 'joke', 'humor', 'weird', 'unusual']
-        }
-        
-        # Add tags based on title keywords
-        for tag, keywords in tag_keywords.items():
-            if any(keyword in title_lower for keyword in keywords):
-                tags.add(tag)
-        
-        # Convert set to comma-separated string
-        return ', '.join(sorted(tags))
-
-    def scrape(self, criteria: Dict) -> List[Gift]:
-        gifts = []
-        driver = None
-        MAX_GIFTS = 100
-        
-        try:
-            driver = self._get_driver()
-            search_urls = self.get_search_urls(criteria)
-            max_price = criteria.get('max_price', 1000)
-            
-            for url in search_urls:
-                if len(gifts) >= MAX_GIFTS:
-                    break
-                    
-                try:
-                    self.logger.info(f"Scraping URL: {url}")
-                    driver.get(url)
-                    
-                    self._scroll_and_wait(driver)
-                    gift_elements = driver.find_elements(By.CSS_SELECTOR, '.product-item')
-                    
-                    for element in gift_elements[:MAX_GIFTS - len(gifts)]:
-                        gift = self._parse_gift_element(element, max_price)
-                        if gift:
-                            gifts.append(gift)
-                            
-                except Exception as e:
-                    self.logger.error(f"Error scraping URL {url}: {str(e)}")
-                    continue
-                    
-        finally:
-            if driver:
-                driver.quit()
-                
-        return gifts[:MAX_GIFTS] 
-
     def _get_driver(self):
         """Create and return a configured Chrome WebDriver instance"""
-        return webdriver.Chrome(service=self.service, options=self.chrome_options)
+        driver = webdriver.Chrome(service=self._get_service(), options=self._chrome_options(self.chrome_options))
+        self._block_resources(driver)
+        return driver
 
     def _scroll_and_wait(self, driver):
         """Scroll the page to load more content"""
@@ -1,11 +1,23 @@
-from app.models.gift import Gift
+import logging
 from app.services.scraper_service import ScraperService
-from app import db
+from app.services.search_pipeline import SearchContext, SearchPipeline
 
 class GiftService:
     def __init__(self):
         self.scraper = ScraperService()
-    
+        self.pipeline = SearchPipeline(self.scraper)
+        self.logger = logging.getLogger(__name__)
+
+    def search(self, description=None, criteria=None, nlp_service=None, until='serialize', projection=None,
+               read_only=False):
+        """
+        Run the search pipeline and return its SearchContext
+        (criteria, ranked gifts and serialized results)
+        """
+        context = SearchContext(description, criteria, projection)
+        context.read_only = read_only
+        return self.pipeline.run(context, nlp_service, until)
+
     def find_gifts(self, criteria):
         """
         Find gifts based on the given criteria
@@ -14,68 +26,21 @@ class GiftService:
             # Ensure criteria is a dictionary
             if not isinstance(criteria, dict):
                 criteria = {}
-            
-            # First search in database
-            gifts = self._search_database(criteria)
-            
-            # If not enough results, scrape more
-            if len(gifts) < 10:
-                scraped_gifts = self.scraper.find_gifts(criteria)
-                self._save_new_gifts(scraped_gifts)
-                gifts.extend(scraped_gifts)
-            
-            return gifts
-            
-        except Exception as e:
-            print(f"Error in find_gifts: {str(e)}")
-            return []
-    
-    def _search_database(self, criteria):
-        """
-        Search the database using the provided criteria
-        """
-        try:
-            query = Gift.query
-            
-            # Safely access criteria values with .get()
-            if criteria.get('max_price'):
-                query = query.filter(Gift.price <= float(criteria['max_price']))
-            
-            if criteria.get('categories'):
-                if isinstance(criteria['categories'], list):
-                    query = query.filter(Gift.category.in_(criteria['categories']))
-            
-            # Add more filters based on criteria
-            if criteria.get('gender'):
-                query = query.filter(Gift.tags.like(f"%{criteria['gender']}%"))
-                
-            if criteria.get('age'):
-                # You might want to implement age-appropriate filtering logic here
-                pass
-                
-            return query.all()
-            
+
+            return self.search(criteria=criteria, until='rank').gifts
+
         except Exception as e:
-            print(f"Error in _search_database: {str(e)}")
+            self.logger.error(f"Error in find_gifts: {str(e)}")
             return []
-    
-    def _save_new_gifts(self, gifts):
+
+    def stream_gifts(self, criteria, projection=None):
         """
-        Save new gifts to the database, avoiding duplicates
+        Yield (source, results) batches of serialized gifts for a streaming
+        response: the database results immediately (from the result cache when
+        possible), then each scraped source as it completes.
+        Gifts already sent in an earlier batch are skipped.
         """
-        try:
-            for gift in gifts:
-                # Check for duplicates
-                existing = Gift.query.filter_by(
-                    name=gift.name,
-                    source=gift.source
-                ).first()
-                
-                if not existing:
-                    db.session.add(gift)
-            
-            db.session.commit()
-            
-        except Exception as e:
-            print(f"Error in _save_new_gifts: {str(e)}")
-            db.session.rollback() 
\ No newline at end of file
+        if not isinstance(criteria, dict):
+            criteria = {}
+
+        yield from self.pipeline.stream(SearchContext(criteria=criteria, projection=projection))
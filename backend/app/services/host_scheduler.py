@@ -0,0 +1,234 @@
+from typing import Dict, Iterator, Optional
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import logging
+import random
+import threading
+import time
+import requests
+from config import Config
+
+# Status codes that mean "slow down" rather than "this request is wrong"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Classic token bucket; callers reserve a token and sleep off any deficit"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it"""
+        if not self.rate:
+            return 0.0
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            # Tokens may go negative so queued callers are served in reservation order
+            return -self.tokens / self.rate
+
+class _HostState:
+    def __init__(self, rate: float, burst: float, concurrency: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'in_flight': 0,
+            'throttled': 0,  # 429 responses
+            'server_errors': 0,  # 5xx responses
+            'retries': 0,
+            'failures': 0,  # Gave up after max_retries
+            'queue_wait_total': 0.0,
+            'queue_wait_max': 0.0,
+            'backoff_total': 0.0
+        }
+
+    def record(self, **changes):
+        with self.lock:
+            for name, value in changes.items():
+                self.stats[name] += value
+
+class HostScheduler:
+    """
+    Shared politeness scheduler for everything the scrapers fetch. Each host gets
+    its own token bucket and concurrency cap; 429/5xx responses trigger exponential
+    backoff with full jitter that pauses the whole host, not just the one caller.
+
+    Image downloads (kind='image') are scheduled apart from page loads with the
+    image limits, a short delay and more concurrency: CDNs serve static files
+    and shouldn't wait out the page politeness delay per image.
+    """
+
+    def __init__(self, delay: Optional[float] = None, burst: Optional[float] = None,
+                 concurrency: Optional[int] = None, host_limits: Optional[Dict] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, image_limits: Optional[Dict] = None):
+        self.delay = Config.SCRAPING_DELAY if delay is None else delay
+        self.burst = Config.SCRAPING_BURST if burst is None else burst
+        self.concurrency = Config.SCRAPING_CONCURRENCY if concurrency is None else concurrency
+        self.host_limits = Config.SCRAPING_HOST_LIMITS if host_limits is None else host_limits
+        self.image_limits = Config.SCRAPING_IMAGE_LIMITS if image_limits is None else image_limits
+        self.max_retries = Config.SCRAPING_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = Config.SCRAPING_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = Config.SCRAPING_BACKOFF_MAX if backoff_max is None else backoff_max
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _host(self, host: str, kind: str = 'page') -> _HostState:
+        key = host if kind == 'page' else f"{host} ({kind}s)"
+        with self._lock:
+            state = self._hosts.get(key)
+            if state is None:
+                # Per-host overrides win over the image defaults
+                limits = self.host_limits.get(host, {})
+                if kind == 'image':
+                    limits = {**self.image_limits, **limits}
+                delay = limits.get('delay', self.delay)
+                state = _HostState(
+                    rate=1.0 / delay if delay else 0,
+                    burst=limits.get('burst', self.burst),
+                    concurrency=limits.get('concurrency', self.concurrency)
+                )
+                self._hosts[key] = state
+            return state
+
+    @contextmanager
+    def slot(self, url: str, kind: str = 'page'):
+        """Wait for the host's rate limit and concurrency cap, then hold a slot while fetching"""
+        host = urlparse(url).hostname
+        if not host:
+            # Local files (fixtures) are not rate limited
+            yield
+            return
+
+        state = self._host(host, kind)
+        queued_at = time.monotonic()
+        state.semaphore.acquire()
+        try:
+            wait = max(state.bucket.reserve(), state.paused_until - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+
+            queue_wait = time.monotonic() - queued_at
+            with state.lock:
+                state.stats['requests'] += 1
+                state.stats['in_flight'] += 1
+                state.stats['queue_wait_total'] += queue_wait
+                state.stats['queue_wait_max'] = max(state.stats['queue_wait_max'], queue_wait)
+
+            try:
+                yield
+            finally:
+                state.record(in_flight=-1)
+        finally:
+            state.semaphore.release()
+
+    def backoff(self, url: str, attempt: int, retry_after: Optional[float] = None, kind: str = 'page') -> float:
+        """Pause the host for an exponentially growing, jittered delay and return it"""
+        state = self._host(urlparse(url).hostname or '', kind)
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.backoff_max))
+
+        with state.lock:
+            state.paused_until = max(state.paused_until, time.monotonic() + delay)
+            state.stats['backoff_total'] += delay
+        return delay
+
+    def should_retry(self, url: str, status: Optional[int], attempt: int,
+                     retry_after: Optional[float] = None, kind: str = 'page') -> bool:
+        """
+        Account for a fetch's HTTP status and back the host off on 429/5xx. True when
+        the caller should try again; also used for Chrome page loads, see BaseScraper._load_page
+        """
+        if status not in RETRY_STATUSES:
+            return False
+
+        state = self._host(urlparse(url).hostname or '', kind)
+        if status == 429:
+            state.record(throttled=1)
+        else:
+            state.record(server_errors=1)
+
+        if attempt >= self.max_retries:
+            state.record(failures=1)
+            return False
+
+        delay = self.backoff(url, attempt, retry_after, kind)
+        state.record(retries=1)
+        self.logger.warning(f"{status} from {url}, backing off host for {delay:.1f}s")
+        return True
+
+    @contextmanager
+    def open(self, method: str, url: str, kind: str = 'page', **kwargs) -> Iterator[requests.Response]:
+        """
+        Like request(), but the host slot is held until the block exits, so a streamed
+        body counts against the host's concurrency cap while it is read. The response
+        is closed on exit.
+        """
+        kwargs.setdefault('timeout', Config.SCRAPING_TIMEOUT)
+
+        for attempt in range(self.max_retries + 1):
+            with self.slot(url, kind):
+                response = requests.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    self.should_retry(url, response.status_code, attempt, kind=kind)  # Counts a final 429/5xx as a failure
+                    try:
+                        yield response
+                    finally:
+                        response.close()
+                    return
+                response.close()
+
+            self.should_retry(url, response.status_code, attempt, self._retry_after(response), kind)
+
+    def request(self, method: str, url: str, kind: str = 'page', **kwargs) -> requests.Response:
+        """requests.request() with per-host scheduling and retry on 429/5xx; the body is read in the slot"""
+        with self.open(method, url, kind, **kwargs) as response:
+            response.content
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-host counters, including average queue wait; image downloads are listed as 'host (images)'"""
+        result = {}
+        with self._lock:
+            hosts = dict(self._hosts)
+        for host, state in hosts.items():
+            with state.lock:
+                stats = dict(state.stats)
+            stats['queue_wait_avg'] = stats['queue_wait_total'] / stats['requests'] if stats['requests'] else 0.0
+            result[host] = stats
+        return result
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> HostScheduler:
+    """Process-wide scheduler shared by every scraper"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = HostScheduler()
+        return _scheduler
@@ -0,0 +1,201 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+import logging
+from sqlalchemy import update
+from app import db
+from app.models.gift import Gift, PriceHistory, ScrapedGift
+from app.models.crawl_target import CrawlTarget
+from config import Config
+from .near_duplicates import NearDuplicateIndex
+
+class IngestError(Exception):
+    """A batch could not be written; the session has been rolled back"""
+    pass
+
+class IngestService:
+    """
+    Writes scraped gifts to the database incrementally: new gifts are inserted,
+    changed gifts are updated (recording price changes), and unchanged gifts only
+    have their last-seen bookkeeping bumped in a single bulk update. Scrapers hand
+    over ScrapedGift records; new ones are written as one bulk insert of plain
+    values, and only the existing rows that change go through the ORM.
+    """
+
+    def __init__(self):
+        self.near_duplicates = NearDuplicateIndex() if Config.NEAR_DUPLICATES_ENABLED else None
+        self.logger = logging.getLogger(__name__)
+
+    def ingest(self, gifts: List[ScrapedGift], crawl_target: Optional[CrawlTarget] = None) -> List[Gift]:
+        """
+        Ingest scraped gifts and return the persisted gift for each input,
+        in order and without duplicates. Raises IngestError when the batch
+        could not be written, so callers can tell that apart from an empty scrape.
+        """
+        if not gifts:
+            return []
+
+        now = datetime.utcnow()
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        results = []
+
+        try:
+            by_link, by_name = self._load_existing(gifts)
+            handled = set()  # id() of rows already in results
+            unchanged_ids = []
+            new_rows = []  # Insert values of new gifts, in results until they have ids
+            price_changes = []  # PriceHistory insert values
+            to_cluster = []  # New and renamed rows
+
+            for gift in gifts:
+                existing = by_link.get(gift.affiliate_link) or by_name.get(gift.name)
+                if existing is not None and id(existing) in handled:
+                    # Duplicate within this batch
+                    continue
+
+                content_hash = gift.compute_content_hash()
+
+                if existing is None:
+                    row = gift.to_record()
+                    row.update(content_hash=content_hash, first_seen_at=now, last_seen_at=now, missed_crawls=0,
+                               last_crawl_target_id=crawl_target.id if crawl_target else None)
+                    new_rows.append(row)
+
+                    if gift.affiliate_link:
+                        by_link[gift.affiliate_link] = row
+                    by_name[gift.name] = row
+                    handled.add(id(row))
+                    results.append(row)
+                    to_cluster.append(row)
+                    stats['inserted'] += 1
+                    continue
+
+                handled.add(id(existing))
+                results.append(existing)
+
+                if existing.content_hash == content_hash and existing.expired_at is None:
+                    unchanged_ids.append(existing.id)
+                    stats['unchanged'] += 1
+                    continue
+
+                if existing.name != gift.name:
+                    to_cluster.append(existing)
+                if existing.price != gift.price:
+                    price_changes.append({'gift_id': existing.id, 'price': gift.price, 'recorded_at': now})
+                self._apply_changes(existing, gift, content_hash, now)
+                if crawl_target:
+                    existing.last_crawl_target_id = crawl_target.id
+                stats['updated'] += 1
+
+            if unchanged_ids:
+                # One statement for every unchanged row instead of a write per gift
+                seen = {Gift.last_seen_at: now, Gift.missed_crawls: 0}
+                if crawl_target:
+                    seen[Gift.last_crawl_target_id] = crawl_target.id
+                Gift.query.filter(Gift.id.in_(unchanged_ids)).update(seen, synchronize_session=False)
+
+            if new_rows:
+                inserted = self._insert_new(new_rows)
+                results = [inserted.get(id(row), row) for row in results]
+                to_cluster = [inserted.get(id(row), row) for row in to_cluster]
+                price_changes.extend({'gift_id': gift.id, 'price': gift.price, 'recorded_at': now}
+                                     for gift in inserted.values())
+
+            if price_changes:
+                # One executemany instead of an ORM insert per price
+                db.session.execute(PriceHistory.__table__.insert(), price_changes)
+
+            if self.near_duplicates and to_cluster:
+                self.near_duplicates.remove([gift.id for gift in to_cluster if gift.cluster_id is not None])
+                stats['near_duplicates'] = self.near_duplicates.assign(to_cluster)
+                if new_rows:
+                    # New gifts aren't in the session, so their clusters are written by primary key
+                    db.session.execute(update(Gift), [{'id': gift.id, 'cluster_id': gift.cluster_id}
+                                                      for gift in inserted.values()])
+
+            db.session.commit()
+            self.logger.info(f"Ingested {len(gifts)} gifts: {stats}")
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error ingesting gifts: {str(e)}")
+            db.session.rollback()
+            raise IngestError(str(e)) from e
+
+    def expire_unseen(self, crawl_target: CrawlTarget, crawl_started_at: datetime) -> int:
+        """
+        After crawling a target, count a miss for every gift last seen on that target
+        but absent from this crawl, and soft-expire those missing for too many crawls.
+        Only call this after a crawl that covered every page of the target.
+        """
+        try:
+            missing = Gift.query.filter(
+                Gift.last_crawl_target_id == crawl_target.id,
+                Gift.expired_at.is_(None),
+                db.or_(Gift.last_seen_at.is_(None), Gift.last_seen_at < crawl_started_at)
+            )
+            missing.update({Gift.missed_crawls: Gift.missed_crawls + 1}, synchronize_session=False)
+
+            expired = Gift.query.filter(
+                Gift.last_crawl_target_id == crawl_target.id,
+                Gift.expired_at.is_(None),
+                Gift.missed_crawls >= Config.EXPIRE_AFTER_MISSED_CRAWLS
+            ).update({Gift.expired_at: datetime.utcnow()}, synchronize_session=False)
+
+            db.session.commit()
+            if expired:
+                self.logger.info(f"Expired {expired} gifts no longer listed on crawl target {crawl_target.id}")
+            return expired
+
+        except Exception as e:
+            self.logger.error(f"Error expiring unseen gifts: {str(e)}")
+            db.session.rollback()
+            return 0
+
+    def _load_existing(self, gifts: List[ScrapedGift]):
+        """Fetch matching rows by affiliate link and name in two queries"""
+        links = {gift.affiliate_link for gift in gifts if gift.affiliate_link}
+        names = {gift.name for gift in gifts if gift.name}
+
+        by_link = {}
+        if links:
+            for existing in Gift.query.filter(Gift.affiliate_link.in_(links)).all():
+                by_link[existing.affiliate_link] = existing
+
+        by_name = {}
+        if names:
+            for existing in Gift.query.filter(Gift.name.in_(names)).all():
+                by_name.setdefault(existing.name, existing)
+
+        return by_link, by_name
+
+    def _insert_new(self, rows: List[Dict]) -> Dict[int, Gift]:
+        """
+        Insert new gifts in one executemany and read their ids back by name in one
+        query (MySQL can't return ids from an executemany). Returns a Gift per row,
+        by id() of its values; they are not added to the session.
+        """
+        db.session.execute(Gift.__table__.insert(), rows)
+
+        # Names of new gifts matched no existing row; if a concurrent insert added
+        # the same name, the later id wins
+        ids = dict(db.session.query(Gift.name, Gift.id)
+                   .filter(Gift.name.in_([row['name'] for row in rows]))
+                   .order_by(Gift.id).all())
+        return {id(row): Gift(id=ids[row['name']], **row) for row in rows}
+
+    def _apply_changes(self, existing: Gift, scraped: ScrapedGift, content_hash: str, now: datetime):
+        """Copy scraped fields onto an existing row; the caller records any price change"""
+        for field in ['name', 'price', 'category', 'affiliate_link', 'source', 'tags']:
+            setattr(existing, field, getattr(scraped, field))
+
+        # Keep curated values when a scrape doesn't provide them
+        if scraped.description:
+            existing.description = scraped.description
+        if scraped.image_path:
+            existing.image_path = scraped.image_path
+
+        existing.content_hash = content_hash
+        existing.last_seen_at = now
+        existing.first_seen_at = existing.first_seen_at or now
+        existing.missed_crawls = 0
+        existing.expired_at = None
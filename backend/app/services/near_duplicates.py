@@ -0,0 +1,175 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from functools import lru_cache
+import hashlib
+import logging
+import random
+import re
+import zlib
+from app import db
+from app.models.gift import Gift, GiftLshBucket
+from config import Config
+
+# Marketing words the shops add to the same product in different ways
+TITLE_STOPWORDS = {'the', 'a', 'an', 'and', 'gift', 'gifts', 'voucher', 'experience', 'experiences', 'uk'}
+
+# Mersenne prime for the (a * x + b) mod p permutation family
+_PRIME = (1 << 61) - 1
+
+def normalize_title(title: str) -> str:
+    """Lowercase, '&' as 'and', punctuation and marketing words removed"""
+    title = (title or '').lower().replace('&', ' and ')
+    words = re.findall(r'[a-z0-9]+', title)
+    return ' '.join(word for word in words if word not in TITLE_STOPWORDS)
+
+@lru_cache(maxsize=100000)
+def title_shingles(title: str, size: int = 4) -> FrozenSet[str]:
+    """Character n-grams of the normalized title, so word order and small edits only change a few"""
+    text = normalize_title(title)
+    if len(text) <= size:
+        return frozenset([text] if text else [])
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    """MinHash signatures and LSH band keys; identical parameters give identical keys across processes"""
+
+    # Permuted hash vectors kept per shingle; titles share most of their 4-grams
+    CACHE_SIZE = 200000
+
+    def __init__(self, num_perm: int = 80, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"{num_perm} permutations don't split into {bands} bands")
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._vectors: Dict[str, Tuple[int, ...]] = {}
+
+    def _vector(self, shingle: str) -> Tuple[int, ...]:
+        vector = self._vectors.get(shingle)
+        if vector is None:
+            h = zlib.crc32(shingle.encode('utf-8'))
+            vector = tuple((a * h + b) % _PRIME for a, b in self.permutations)
+            if len(self._vectors) >= self.CACHE_SIZE:
+                self._vectors.clear()
+            self._vectors[shingle] = vector
+        return vector
+
+    def signature(self, shingles: Iterable[str]) -> Optional[List[int]]:
+        vectors = [self._vector(shingle) for shingle in shingles]
+        if not vectors:
+            return None
+        # Element-wise minimum across the shingles' permuted hashes
+        return list(map(min, *vectors)) if len(vectors) > 1 else list(vectors[0])
+
+    def band_keys(self, signature: List[int]) -> List[str]:
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(','.join(map(str, rows)).encode('ascii'), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+class NearDuplicateIndex:
+    """
+    Clusters gifts with near-identical titles (usually the same product from different
+    shops). Each gift's title MinHash is stored as LSH band buckets in gift_lsh_bucket;
+    gifts sharing a bucket are candidates, and a candidate whose title shingles have a
+    Jaccard similarity of at least `threshold` puts the new gift in its cluster.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, hasher: Optional[MinHasher] = None):
+        self.threshold = threshold if threshold is not None else Config.NEAR_DUPLICATE_THRESHOLD
+        self.hasher = hasher or MinHasher(Config.MINHASH_PERMUTATIONS, Config.LSH_BANDS)
+        self.logger = logging.getLogger(__name__)
+
+    def assign(self, gifts: List[Gift]) -> int:
+        """
+        Set cluster_id on flushed gifts and add their buckets to the session.
+        Returns how many joined an existing cluster.
+        """
+        entries = []
+        for gift in gifts:
+            shingles = title_shingles(gift.name)
+            signature = self.hasher.signature(shingles)
+            entries.append((gift, shingles, self.hasher.band_keys(signature) if signature else []))
+
+        candidates = self._load_candidates({key for _, _, keys in entries for key in keys})
+        merged = 0
+        buckets = []
+
+        for gift, shingles, keys in entries:
+            gift_id = gift.id
+            best, best_score = None, self.threshold
+            seen = {gift_id}
+            for key in keys:
+                for candidate_id, candidate_shingles, cluster_id in candidates.get(key, ()):
+                    if candidate_id in seen:
+                        continue
+                    seen.add(candidate_id)
+                    score = jaccard(shingles, candidate_shingles)
+                    if score >= best_score:
+                        best, best_score = (candidate_id, cluster_id), score
+
+            cluster_id = (best[1] or best[0]) if best else gift_id
+            gift.cluster_id = cluster_id
+            merged += best is not None
+
+            # Later gifts in this batch can match this one
+            for key in keys:
+                candidates.setdefault(key, []).append((gift_id, shingles, cluster_id))
+                buckets.append({'key': key, 'gift_id': gift_id})
+
+        if buckets:
+            db.session.execute(GiftLshBucket.__table__.insert(), buckets)
+        return merged
+
+    def remove(self, gift_ids: List[int]):
+        """Drop the buckets of gifts whose titles changed, before they are assigned again"""
+        if gift_ids:
+            GiftLshBucket.query.filter(GiftLshBucket.gift_id.in_(gift_ids)).delete(synchronize_session=False)
+
+    def rebuild(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Re-cluster the whole catalog in id order"""
+        GiftLshBucket.query.delete(synchronize_session=False)
+        Gift.query.update({Gift.cluster_id: None}, synchronize_session=False)
+        db.session.commit()
+
+        stats = {'gifts': 0, 'merged': 0}
+        last_id = 0
+        while True:
+            gifts = Gift.query.filter(Gift.id > last_id).order_by(Gift.id).limit(batch_size).all()
+            if not gifts:
+                break
+            stats['merged'] += self.assign(gifts)
+            stats['gifts'] += len(gifts)
+            last_id = gifts[-1].id
+            db.session.commit()
+
+        stats['clusters'] = stats['gifts'] - stats['merged']
+        self.logger.info(f"Rebuilt near-duplicate index: {stats}")
+        return stats
+
+    def _load_candidates(self, keys: Set[str]) -> Dict[str, List[Tuple[int, FrozenSet[str], Optional[int]]]]:
+        """Indexed gifts sharing any of the bucket keys, with their title shingles"""
+        candidates: Dict[str, List[Tuple[int, FrozenSet[str], Optional[int]]]] = {}
+        if not keys:
+            return candidates
+
+        rows = db.session.query(GiftLshBucket.key, Gift.id, Gift.name, Gift.cluster_id) \
+            .join(Gift, Gift.id == GiftLshBucket.gift_id) \
+            .filter(GiftLshBucket.key.in_(list(keys)), Gift.expired_at.is_(None))
+        for key, gift_id, name, cluster_id in rows:
+            candidates.setdefault(key, []).append((gift_id, title_shingles(name), cluster_id))
+        return candidates
+
+def cluster_key(gift: Gift) -> int:
+    """
+    Gifts without a cluster (index disabled or not yet built) are their own cluster,
+    and so are unsaved gifts (a failed ingest), which have no id either
+    """
+    return gift.cluster_id or gift.id or -id(gift)
@@ -1,10 +1,22 @@
 import spacy
+import asyncio
+import copy
+import json
 import re
-from typing import Dict, List
+import time
+from typing import Dict, List, Tuple
 import logging
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from config import Config
-from openai import OpenAI
+from openai import APITimeoutError, AsyncOpenAI, OpenAI
+from app.telemetry import registry, span
+from .circuit_breaker import CircuitBreaker
+from .query_cache import QueryCache
+from .query_log import normalize_description
+
+# Fields a remote answer must contain before it can win the hedge
+OPENAI_FIELDS = ['age', 'gender', 'max_price', 'interests', 'occasion', 'relationship']
 
 class NLPService:
     def __init__(self, use_openai=False):
@@ -17,18 +29,35 @@ class NLPService:
             subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
             self.nlp = spacy.load("en_core_web_sm")
         
+        # Configure logging
+        self.logger = logging.getLogger(__name__)
+        
+        # Hedge outcomes: remote, local_timeout, local_error, local_invalid, circuit_open
+        self.stats = Counter()
+        self.breaker = CircuitBreaker('openai', Config.OPENAI_BREAKER_FAILURES, Config.OPENAI_BREAKER_RESET)
+        # Extracted criteria by normalized description
+        self.cache = QueryCache('nlp', Config.NLP_CACHE_SIZE, Config.NLP_CACHE_TTL, Config.CACHE_STATS_INTERVAL)
+        
         # Initialize OpenAI only if flag is True and API key exists
         self.use_openai = use_openai and bool(Config.OPENAI_API_KEY)
         if self.use_openai:
             try:
-                self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+                # OPENAI_BASE_URL lets benchmarks point the client at a local stub.
+                # No retries: a late answer is useless once the deadline has passed.
+                client_options = {
+                    'api_key': Config.OPENAI_API_KEY,
+                    'base_url': Config.OPENAI_BASE_URL,
+                    'timeout': Config.OPENAI_DEADLINE,
+                    'max_retries': 0
+                }
+                self.client = OpenAI(**client_options)
+                # Used by the ASGI app (app/asgi.py) so the completion doesn't hold a thread
+                self.async_client = AsyncOpenAI(**client_options)
+                self.openai_executor = ThreadPoolExecutor(Config.OPENAI_MAX_CONCURRENCY, thread_name_prefix='openai')
             except Exception as e:
                 self.logger.error(f"Failed to initialize OpenAI: {str(e)}")
                 self.use_openai = False
         
-        # Configure logging
-        self.logger = logging.getLogger(__name__)
-        
         # Initialize keyword dictionaries
         self._initialize_keywords()
 
@@ -177,14 +206,121 @@ class NLPService:
         if not description:
             return {}
 
+        key = normalize_description(description)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
         if self.use_openai:
-            try:
-                return self._extract_with_openai(description)
-            except Exception as e:
-                self.logger.error(f"OpenAI extraction failed: {str(e)}")
-                return self._extract_with_spacy(description)
+            criteria, cacheable = self._extract_hedged(description)
         else:
-            return self._extract_with_spacy(description)
+            with span('nlp.spacy'):
+                criteria, cacheable = self._extract_with_spacy(description), True
+        return self._remember(key, criteria, cacheable)
+
+    def _remember(self, key: str, criteria: Dict, cacheable: bool = True) -> Dict:
+        """
+        Cache the criteria unless they are a fallback for an OpenAI call that timed out,
+        failed or was skipped by the open circuit: once OpenAI recovers the description
+        should get its answer rather than the spaCy one for the rest of NLP_CACHE_TTL
+        """
+        if cacheable and isinstance(criteria, dict):
+            self.cache.put(key, copy.deepcopy(criteria))
+        return criteria
+
+    def _extract_hedged(self, description: str) -> Tuple[Dict, bool]:
+        """
+        Start the OpenAI call, run spaCy meanwhile, and use the remote answer only if
+        it is valid and arrives within OPENAI_DEADLINE; otherwise the local one.
+        Returns (criteria, cacheable), cacheable when OpenAI answered.
+        """
+        if not self.breaker.allow():
+            self._record_outcome('circuit_open')
+            with span('nlp.spacy'):
+                return self._extract_with_spacy(description), False
+
+        started = time.monotonic()
+        future = self.openai_executor.submit(self._call_openai, description)
+        with span('nlp.spacy'):
+            local = self._extract_with_spacy(description)
+
+        try:
+            with span('nlp.openai'):
+                remote = future.result(timeout=max(0.0, Config.OPENAI_DEADLINE - (time.monotonic() - started)))
+        except (FuturesTimeout, APITimeoutError):
+            return self._fall_back(local, 'local_timeout'), False
+        except Exception as e:
+            self.logger.error(f"OpenAI extraction failed: {str(e)}")
+            return self._fall_back(local, 'local_error'), False
+
+        return self._choose(remote, local, time.monotonic() - started), True
+
+    async def extract_gift_criteria_async(self, description: str, executor=None) -> Dict:
+        """
+        Async variant of extract_gift_criteria: the OpenAI call is awaited on the event
+        loop, hedged against spaCy running on the given executor
+        """
+        if not description:
+            return {}
+
+        key = normalize_description(description)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        return self._remember(key, *await self._extract_async(description, executor))
+
+    async def _extract_async(self, description: str, executor=None) -> Tuple[Dict, bool]:
+        """(criteria, cacheable) like _extract_hedged"""
+        loop = asyncio.get_running_loop()
+        local = loop.run_in_executor(executor, self._extract_with_spacy, description)
+        if not self.use_openai:
+            with span('nlp.spacy'):
+                return await local, True
+
+        if not self.breaker.allow():
+            self._record_outcome('circuit_open')
+            return await local, False
+
+        started = time.monotonic()
+        try:
+            with span('nlp.openai'):
+                remote = await asyncio.wait_for(self._call_openai_async(description), Config.OPENAI_DEADLINE)
+        except (asyncio.TimeoutError, APITimeoutError):
+            return self._fall_back(await local, 'local_timeout'), False
+        except Exception as e:
+            self.logger.error(f"OpenAI extraction failed: {str(e)}")
+            return self._fall_back(await local, 'local_error'), False
+
+        return self._choose(remote, await local, time.monotonic() - started), True
+
+    def _choose(self, remote: Dict, local: Dict, elapsed: float) -> Dict:
+        registry.observe('gift_ideas_openai_seconds', elapsed, 'OpenAI extraction latency')
+        # The API answered, so a malformed answer doesn't count against the circuit
+        self.breaker.record_success()
+        if not self._valid_criteria(remote):
+            self._record_outcome('local_invalid')
+            return local
+        self._record_outcome('remote')
+        return remote
+
+    def _fall_back(self, local: Dict, outcome: str) -> Dict:
+        self.breaker.record_failure()
+        self._record_outcome(outcome)
+        return local
+
+    def _record_outcome(self, outcome: str):
+        self.stats[outcome] += 1
+        registry.inc('gift_ideas_nlp_hedge_total', 1, 'Hedged extraction outcomes', outcome=outcome)
+
+    @staticmethod
+    def _valid_criteria(criteria) -> bool:
+        if not isinstance(criteria, dict) or any(field not in criteria for field in OPENAI_FIELDS):
+            return False
+        if not isinstance(criteria['interests'], list):
+            return False
+        if criteria['max_price'] is not None and not isinstance(criteria['max_price'], (int, float)):
+            return False
+        return criteria['age'] is None or isinstance(criteria['age'], int)
 
     def _extract_with_spacy(self, description: str) -> Dict:
         """
@@ -207,44 +343,46 @@ class NLPService:
         
         return criteria
 
-    def _extract_with_openai(self, description: str) -> Dict:
-        """
-        Extract gift criteria using OpenAI's API
-        """
-        try:
-            prompt = f"""
+    def _openai_messages(self, description: str) -> List[Dict]:
+        prompt = f"""
             Extract gift-finding criteria from the following description. 
             Return a JSON object with these fields: age, gender, max_price, interests (list), 
             occasion, relationship.
             
             Description: {description}
             """
+        return [
+            {"role": "system", "content": "You are a helpful assistant that extracts gift criteria from text."},
+            {"role": "user", "content": prompt}
+        ]
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that extracts gift criteria from text."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-            )
-            
-            # Parse the response - updated to match new API format
-            content = response.choices[0].message.content
-            
-            # Parse the response
-            import json
-            criteria = json.loads(content)
-            
-            # Add categories based on interests
-            criteria['categories'] = self._map_interests_to_categories(criteria.get('interests', []))
-            
-            return criteria
+    def _parse_openai_response(self, response) -> Dict:
+        # Parse the response - updated to match new API format
+        content = response.choices[0].message.content
+        criteria = json.loads(content)
+        
+        # Add categories based on interests
+        criteria['categories'] = self._map_interests_to_categories(criteria.get('interests', []))
+        
+        return criteria
 
-        except Exception as e:
-            self.logger.error(f"OpenAI API error: {str(e)}")
-            # Fallback to spaCy if OpenAI fails
-            return self._extract_with_spacy(description)
+    def _call_openai(self, description: str) -> Dict:
+        """One completion request; errors propagate so the caller can fall back"""
+        response = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=self._openai_messages(description),
+            temperature=0.3,
+        )
+        return self._parse_openai_response(response)
+
+    async def _call_openai_async(self, description: str) -> Dict:
+        """Async twin of _call_openai"""
+        response = await self.async_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=self._openai_messages(description),
+            temperature=0.3,
+        )
+        return self._parse_openai_response(response)
 
     def _extract_age(self, doc) -> int:
         """Extract age from text"""
@@ -0,0 +1,107 @@
+from typing import Dict, Optional
+from pathlib import Path
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from config import Config
+
+class PageCacheMiss(Exception):
+    """Raised in replay mode when a page was never recorded"""
+    pass
+
+class PageCache:
+    """
+    On-disk cache of rendered search pages, stored as gzipped JSON envelopes.
+
+    Modes:
+        off        never read or write
+        readwrite  serve fresh entries (younger than ttl), otherwise fetch and store
+        record     always fetch live and store, e.g. to refresh a replay set
+        replay     serve only from the cache, ignoring ttl; misses raise PageCacheMiss
+    """
+
+    MODES = ('off', 'readwrite', 'record', 'replay')
+
+    def __init__(self, cache_dir: Path, ttl: float, mode: str = 'readwrite'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown page cache mode: {mode}")
+
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.mode = mode
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        if self.mode != 'off':
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """Cache key for a URL plus the request headers that change what the page renders"""
+        parts = [url] + [f"{name.lower()}:{value}" for name, value in sorted((headers or {}).items())]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Cached HTML for the URL, or None when it should be fetched live"""
+        if self.mode in ('off', 'record'):
+            return None
+
+        path = self._path(self.make_key(url, headers))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry and (self.mode == 'replay' or time.time() - entry['stored_at'] <= self.ttl):
+            self._count('hits')
+            return entry['html']
+
+        self._count('misses')
+        if self.mode == 'replay':
+            raise PageCacheMiss(f"No recorded page for {url}")
+        return None
+
+    def put(self, url: str, html: str, headers: Optional[Dict[str, str]] = None):
+        if self.mode in ('off', 'replay'):
+            return
+
+        path = self._path(self.make_key(url, headers))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump({
+                    'url': url,
+                    'headers': headers or {},
+                    'stored_at': time.time(),
+                    'html': html
+                }, f)
+            os.replace(tmp_path, path)
+            self._count('writes')
+
+        except OSError as e:
+            self.logger.error(f"Error writing page cache entry for {url}: {str(e)}")
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+def get_page_cache() -> PageCache:
+    """Process-wide page cache configured from Config"""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(Config.PAGE_CACHE_DIR, Config.PAGE_CACHE_TTL, Config.PAGE_CACHE_MODE)
+        return _page_cache
@@ -0,0 +1,97 @@
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Tuple
+from app import db
+from app.http_caching import fingerprint_url
+from app.models.gift import Gift
+
+# Keys of Gift.to_dict(), in response order
+RESPONSE_FIELDS = ['id', 'name', 'description', 'price', 'category', 'affiliate_link', 'tags', 'image_path']
+
+# Read by de-duplication and ranking whatever the client asked for
+PIPELINE_COLUMNS = ['id', 'cluster_id', 'price', 'tags']
+
+FORMATS = ['objects', 'compact']
+
+class GiftProjection:
+    """
+    The subset of gift fields a search response carries. The catalog query only selects
+    the columns the response and the pipeline need, with long descriptions cut short in
+    SQL, and gifts serialize to dicts ('objects') or to value lists in `fields` order
+    ('compact', for bulk consumers).
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None, description_max: Optional[int] = None,
+                 response_format: str = 'objects'):
+        fields = fields or RESPONSE_FIELDS
+        unknown = [field for field in fields if field not in RESPONSE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if description_max is not None and description_max < 0:
+            raise ValueError("description_max must not be negative")
+        if response_format not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+
+        self.fields = list(dict.fromkeys(fields))
+        self.description_max = description_max
+        self.compact = response_format == 'compact'
+
+    @classmethod
+    def from_args(cls, data: Dict) -> Optional['GiftProjection']:
+        """
+        Projection from request parameters: fields (comma-separated or a list),
+        description_max and format. None when none are given.
+        """
+        if not any(data.get(name) is not None for name in ('fields', 'description_max', 'format')):
+            return None
+
+        fields = data.get('fields')
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        elif fields is not None and not isinstance(fields, list):
+            raise ValueError("fields must be a comma-separated string or a list")
+
+        description_max = data.get('description_max')
+        if description_max is not None:
+            try:
+                description_max = int(description_max)
+            except (TypeError, ValueError):
+                raise ValueError("description_max must be an integer")
+
+        return cls(fields, description_max, data.get('format') or 'objects')
+
+    def cache_key(self) -> Tuple:
+        return tuple(self.fields), self.description_max, self.compact
+
+    def columns(self) -> List:
+        """Column expressions for the catalog query"""
+        columns = []
+        for name in dict.fromkeys(PIPELINE_COLUMNS + self.fields):
+            if name == 'description' and self.description_max is not None:
+                # One extra character tells serialize() the text was cut
+                columns.append(db.func.substr(Gift.description, 1, self.description_max + 1).label('description'))
+            else:
+                columns.append(getattr(Gift, name))
+        return columns
+
+    def getter(self, field: str) -> Callable:
+        """Reads one response field off a Gift or a projected catalog row, as Gift.to_dict() gives it"""
+        read = attrgetter(field)
+        if field == 'tags':
+            return lambda gift: read(gift).split(',') if read(gift) else []
+        if field == 'image_path':
+            return lambda gift: fingerprint_url(read(gift))
+        if field == 'description' and self.description_max is not None:
+            limit = self.description_max
+
+            def description(gift):
+                value = read(gift)
+                return value[:limit] + '...' if value and len(value) > limit else value
+            return description
+        return read
+
+    def serialize(self, gifts) -> List:
+        getters = [self.getter(field) for field in self.fields]
+        if self.compact:
+            return [[get(gift) for get in getters] for gift in gifts]
+        fields = self.fields
+        return [dict(zip(fields, [get(gift) for get in getters])) for gift in gifts]
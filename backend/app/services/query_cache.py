@@ -0,0 +1,105 @@
+from typing import Any, Dict, Hashable, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import time
+from app.telemetry import registry
+
+_MISSING = object()
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with an optional TTL, used for NLP extractions and search
+    results. Hits and misses are counted per interval (seconds since the process
+    started) so the hit-rate curve after a restart or a warm-up can be reported.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: Optional[float] = None, interval: float = 60):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.interval = interval
+        self.started = time.monotonic()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._timeline: Dict[int, List[int]] = {}  # Interval index -> [hits, misses]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def uncounted(self):
+        """Lookups in this thread don't count towards the stats, e.g. while warming up"""
+        self._local.quiet = True
+        try:
+            yield
+        finally:
+            self._local.quiet = False
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = _MISSING
+
+            hit = entry is not _MISSING
+            if hit:
+                self._entries.move_to_end(key)
+            quiet = getattr(self._local, 'quiet', False)
+            if not quiet:
+                self._count(now, hit)
+
+        if not quiet:
+            registry.inc('gift_ideas_cache_requests_total', 1, 'Cache lookups by cache and outcome',
+                         cache=self.name, outcome='hit' if hit else 'miss')
+        return entry[1] if hit else default
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self.stats['stores'] += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """Drop the entries and the counters, as after a restart"""
+        with self._lock:
+            self._entries.clear()
+            self._timeline.clear()
+            self.stats = dict.fromkeys(self.stats, 0)
+            self.started = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, now: float, hit: bool):
+        self.stats['hits' if hit else 'misses'] += 1
+        bucket = self._timeline.setdefault(int((now - self.started) // self.interval), [0, 0])
+        bucket[0 if hit else 1] += 1
+
+    def timeline(self) -> List[Dict]:
+        """Hits, misses and hit rate per interval since the process started (or clear())"""
+        with self._lock:
+            buckets = sorted(self._timeline.items())
+        return [{
+            'since_start': index * self.interval,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4)
+        } for index, (hits, misses) in buckets]
+
+    def report(self) -> Dict:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'entries': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            **self.stats,
+            'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else None,
+            'timeline': self.timeline()
+        }
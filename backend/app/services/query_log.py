@@ -0,0 +1,177 @@
+from typing import Dict, List, Optional
+from collections import Counter, defaultdict
+from pathlib import Path
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotation is not coordinated between processes
+    fcntl = None
+
+# Criteria fields that change what a search returns
+CRITERIA_FIELDS = ['age', 'gender', 'max_price', 'interests', 'categories', 'occasion', 'relationship']
+
+def canonical_criteria(criteria: Dict) -> Dict:
+    """
+    Criteria with empty values dropped, strings lowercased and lists sorted and
+    deduplicated, so equivalent searches compare (and log) equal
+    """
+    canonical = {}
+    for field in CRITERIA_FIELDS:
+        value = (criteria or {}).get(field)
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, list):
+            value = sorted({str(item).strip().lower() for item in value if item})
+        if value not in (None, '', []):
+            canonical[field] = value
+    return canonical
+
+def criteria_key(criteria: Dict) -> str:
+    return json.dumps(canonical_criteria(criteria), sort_keys=True, separators=(',', ':'))
+
+def normalize_description(description: str) -> str:
+    return re.sub(r'\s+', ' ', description or '').strip().lower()
+
+class QueryLog:
+    """
+    Append-only log of canonical search criteria and how often they were asked for.
+    Counts are buffered in memory and flushed every flush_seconds as one JSON line
+    per distinct criteria, or per (criteria, description) with descriptions=True:
+
+        {"t":1700000000,"n":3,"c":{"interests":["cooking"]},"d":"my mum loves cooking"}
+
+    Descriptions are free text from users, so they are only kept when asked for.
+    The file is rotated to queries.log.1 .. .N once it passes max_bytes and the
+    oldest backup is dropped, so at most max_bytes * (backups + 1) is retained.
+    Lines are short single writes in append mode, so several workers can share one file.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, backups: int, flush_seconds: float,
+                 descriptions: bool = False):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_seconds = flush_seconds
+        self.descriptions = descriptions
+        self._pending = Counter()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atexit.register(self.flush)
+
+    def record(self, description: str, criteria: Dict):
+        """Count one search; flushes when the buffer is older than flush_seconds"""
+        if not criteria and not description:
+            return
+        with self._lock:
+            description = normalize_description(description) if self.descriptions else ''
+            self._pending[(criteria_key(criteria), description)] += 1
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        now = int(time.time())
+        lines = ''.join(
+            f'{{"t":{now},"n":{count},"c":{key}' + (f',"d":{json.dumps(description)}' if description else '') + '}\n'
+            for (key, description), count in pending.items()
+        )
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                # Rotate under the lock, then reopen so the lines land in the new file
+                if self._rotate_if_full():
+                    with open(self.path, 'a', encoding='utf-8') as fresh:
+                        fresh.write(lines)
+                else:
+                    f.write(lines)
+        except OSError as e:
+            self.logger.error(f"Error writing query log {self.path}: {str(e)}")
+
+    def _rotate_if_full(self) -> bool:
+        try:
+            if self.path.stat().st_size < self.max_bytes:
+                return False
+        except OSError:
+            return False
+
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self.logger.info(f"Rotated query log {self.path}")
+        return True
+
+    def files(self) -> List[Path]:
+        """The current log and its rotated backups, newest first"""
+        candidates = [self.path] + [self.path.with_name(f"{self.path.name}.{index}")
+                                    for index in range(1, self.backups + 1)]
+        return [path for path in candidates if path.exists()]
+
+    def top(self, n: int, since: Optional[float] = None) -> List[Dict]:
+        """
+        The n most frequent criteria (optionally only lines written after the `since`
+        timestamp), each with its count and most frequent description ('' when not logged)
+        """
+        self.flush()
+        counts = Counter()
+        descriptions = defaultdict(Counter)
+        criteria = {}
+        for path in self.files():
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            if since is not None and entry['t'] < since:
+                                continue
+                            key = json.dumps(entry['c'], sort_keys=True, separators=(',', ':'))
+                            counts[key] += entry['n']
+                            descriptions[key][entry.get('d', '')] += entry['n']
+                            criteria[key] = entry['c']
+                        except (ValueError, KeyError, TypeError):
+                            continue  # A torn line from a crash
+            except OSError as e:
+                self.logger.error(f"Error reading query log {path}: {str(e)}")
+
+        return [{
+            'criteria': criteria[key],
+            'count': count,
+            'description': descriptions[key].most_common(1)[0][0]
+        } for key, count in counts.most_common(n)]
+
+_query_log = None
+_query_log_lock = threading.Lock()
+
+def get_query_log() -> Optional[QueryLog]:
+    """Process-wide query log configured from Config; None when QUERY_LOG_ENABLED is off"""
+    global _query_log
+    if not Config.QUERY_LOG_ENABLED:
+        return None
+    with _query_log_lock:
+        if _query_log is None:
+            _query_log = QueryLog(Config.QUERY_LOG_PATH, Config.QUERY_LOG_MAX_BYTES,
+                                  Config.QUERY_LOG_BACKUPS, Config.QUERY_LOG_FLUSH_SECONDS,
+                                  descriptions=Config.QUERY_LOG_DESCRIPTIONS)
+        return _query_log
@@ -0,0 +1,236 @@
+from typing import Dict, List, Optional, Tuple
+from multiprocessing.managers import BaseManager
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from config import Config
+
+class RemoteScrapeError(Exception):
+    """The scrape worker pool is unreachable, timed out or reported a failure"""
+    pass
+
+class ResultBoard:
+    """
+    Job results held by the queue server until the requesting web worker collects them.
+    Workers claim the job they are running, so when one dies its job fails at once
+    instead of leaving the client to wait out its timeout.
+    """
+
+    # Results nobody collected (the client timed out) are dropped after this many seconds
+    RESULT_TTL = 600
+
+    def __init__(self):
+        self._results: Dict[str, Tuple[float, Dict]] = {}
+        self._running: Dict[int, str] = {}  # Worker pid -> job id
+        self._condition = threading.Condition()
+
+    def claim(self, pid: int, job_id: Optional[str]):
+        """Record the job a worker is running; None once it has nothing to report"""
+        with self._condition:
+            if job_id is None:
+                self._running.pop(pid, None)
+            else:
+                self._running[pid] = job_id
+
+    def put(self, job_id: str, payload: Dict):
+        with self._condition:
+            now = time.monotonic()
+            for stale in [key for key, (stored_at, _) in self._results.items() if now - stored_at > self.RESULT_TTL]:
+                del self._results[stale]
+            self._results[job_id] = (now, payload)
+            for pid in [pid for pid, running in self._running.items() if running == job_id]:
+                del self._running[pid]
+            self._condition.notify_all()
+
+    def worker_died(self, pid: int, exitcode: Optional[int]):
+        """Fail the job a dead worker was running, if any"""
+        with self._condition:
+            job_id = self._running.pop(pid, None)
+        if job_id is not None:
+            self.put(job_id, {'error': f"Scrape worker {pid} died with exit code {exitcode}"})
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while job_id not in self._results:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self._results.pop(job_id)[1]
+
+class PoolStatus:
+    """Scrape workers alive, as last reported by the serve loop"""
+
+    # A report older than this means the serve loop itself is stuck
+    STALE_AFTER = 5
+
+    def __init__(self):
+        self._alive = 0
+        self._reported_at = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, alive: int):
+        with self._lock:
+            self._alive = alive
+            self._reported_at = time.monotonic()
+
+    def alive(self) -> int:
+        with self._lock:
+            return self._alive if time.monotonic() - self._reported_at < self.STALE_AFTER else 0
+
+_jobs = queue.Queue()
+_board = ResultBoard()
+_pool = PoolStatus()
+
+class ScrapeQueueManager(BaseManager):
+    """Local queue server shared by web workers (producers) and scrape workers (consumers)"""
+    pass
+
+ScrapeQueueManager.register('jobs', callable=lambda: _jobs)
+ScrapeQueueManager.register('board', callable=lambda: _board)
+ScrapeQueueManager.register('pool', callable=lambda: _pool)
+
+def _authkey() -> bytes:
+    """The queue unpickles whatever authenticated peers send, so there is no default key"""
+    if not Config.SCRAPE_QUEUE_AUTHKEY:
+        raise RemoteScrapeError('SCRAPE_QUEUE_AUTHKEY must be set to use the scrape worker pool')
+    return Config.SCRAPE_QUEUE_AUTHKEY.encode()
+
+def _connect() -> ScrapeQueueManager:
+    manager = ScrapeQueueManager(address=Config.SCRAPE_QUEUE_ADDRESS, authkey=_authkey())
+    manager.connect()
+    return manager
+
+class RemoteScrapeClient:
+    """Used by ScraperService when SCRAPE_BACKEND is 'workers': Chrome never runs in the web process"""
+
+    def __init__(self):
+        _authkey()  # Refuse to start without a key rather than fail on the first scrape
+        self._local = threading.local()
+        self.logger = logging.getLogger(__name__)
+
+    def _manager(self) -> ScrapeQueueManager:
+        # Proxies aren't thread safe, so each thread keeps its own connection
+        if getattr(self._local, 'manager', None) is None:
+            self._local.manager = _connect()
+        return self._local.manager
+
+    def scrape(self, source_key: str, criteria: Dict, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Records scraped by a worker for one source, raising RemoteScrapeError on failure.
+        Fails straight away when no worker is alive; a job still queued once the timeout
+        has passed is dropped by the worker that picks it up.
+        """
+        timeout = timeout or Config.SCRAPE_JOB_TIMEOUT
+        job_id = uuid.uuid4().hex
+        try:
+            manager = self._manager()
+            if not manager.pool().alive():
+                raise RemoteScrapeError(f"No scrape workers alive at {Config.SCRAPE_QUEUE_ADDRESS}")
+            # Wall clock, as the deadline is checked in another process
+            manager.jobs().put({'id': job_id, 'source': source_key, 'criteria': criteria,
+                                'deadline': time.time() + timeout})
+            payload = manager.board().wait(job_id, timeout)
+        except (OSError, EOFError) as e:
+            self._local.manager = None
+            raise RemoteScrapeError(f"Scrape queue unavailable at {Config.SCRAPE_QUEUE_ADDRESS}: {str(e)}")
+
+        if payload is None:
+            raise RemoteScrapeError(f"Scrape of {source_key} timed out after {timeout}s")
+        if payload.get('error'):
+            raise RemoteScrapeError(f"Scrape of {source_key} failed: {payload['error']}")
+        return payload['records']
+
+def run_worker(max_jobs: int, fixture_dir=None):
+    """
+    Scrape worker process: owns its scrapers and keeps one Chrome session for them,
+    which is replaced after a failed scrape; exits after max_jobs to shed leaks
+    """
+    from app.services.scraper_service import SCRAPER_CLASSES
+    from pathlib import Path
+
+    logger = logging.getLogger(f"{__name__}.worker")
+    app_dir = Path(__file__).parent.parent
+    image_folder = app_dir / 'static' / 'gift_images'
+    debug_folder = app_dir / 'static' / 'debug_html'
+    scrapers = {}
+
+    manager = _connect()
+    jobs = manager.jobs()
+    board = manager.board()
+
+    pid = os.getpid()
+    done = 0
+    try:
+        while done < max_jobs:
+            job = jobs.get()
+            if time.time() > job.get('deadline', float('inf')):
+                # The web worker stopped waiting; scraping now would only hold up newer jobs
+                logger.warning(f"Job {job['id'][:8]}: dropped, its {job['source']} scrape timed out in the queue")
+                continue
+            done += 1
+            board.claim(pid, job['id'])
+            scraper = None
+            try:
+                scraper = scrapers.get(job['source'])
+                if scraper is None:
+                    scraper = SCRAPER_CLASSES[job['source']](image_folder, debug_folder, fixture_dir)
+                    scraper.keep_driver = True
+                    scrapers[job['source']] = scraper
+                # One Chrome session per worker: another source's is closed before this one starts
+                for other in scrapers.values():
+                    if other is not scraper:
+                        other.close_driver()
+
+                started = time.monotonic()
+                records = [gift.to_record() for gift in scraper.scrape(job['criteria'])]
+                logger.info(f"Job {job['id'][:8]}: {len(records)} {job['source']} gifts "
+                            f"in {time.monotonic() - started:.1f}s")
+                if time.time() > job.get('deadline', float('inf')):
+                    board.claim(pid, None)  # Nobody is waiting for it any more
+                    continue
+                board.put(job['id'], {'records': records})
+            except Exception as e:
+                logger.error(f"Job {job['id'][:8]} failed: {str(e)}")
+                if scraper is not None:
+                    scraper.close_driver()
+                board.put(job['id'], {'error': str(e)})
+    finally:
+        for scraper in scrapers.values():
+            scraper.close_driver()
+
+    logger.info(f"Worker {pid} recycling after {max_jobs} jobs")
+
+def serve(workers: int, max_jobs: int, fixture_dir=None):
+    """Run the queue server and keep `workers` scrape processes alive, replacing any that exit or crash"""
+    logger = logging.getLogger(__name__)
+    manager = ScrapeQueueManager(address=Config.SCRAPE_QUEUE_ADDRESS, authkey=_authkey())
+    server = manager.get_server()
+    threading.Thread(target=server.serve_forever, name='scrape-queue', daemon=True).start()
+    logger.info(f"Scrape queue listening on {Config.SCRAPE_QUEUE_ADDRESS} with {workers} workers")
+
+    processes: List[multiprocessing.Process] = []
+    try:
+        while True:
+            for process in [process for process in processes if not process.is_alive()]:
+                if process.exitcode:
+                    logger.warning(f"Scrape worker {process.pid} died with exit code {process.exitcode}")
+                # Its client gets an error now rather than after SCRAPE_JOB_TIMEOUT
+                _board.worker_died(process.pid, process.exitcode)
+                processes.remove(process)
+
+            while len(processes) < workers:
+                process = multiprocessing.Process(target=run_worker, args=(max_jobs, fixture_dir), daemon=True)
+                process.start()
+                processes.append(process)
+
+            _pool.update(sum(1 for process in processes if process.is_alive()))
+            time.sleep(1)
+    finally:
+        for process in processes:
+            process.terminate()
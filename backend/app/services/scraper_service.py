@@ -1,6 +1,6 @@
-from typing import List, Dict
-from app.models.gift import Gift
-from app import db
+from typing import Dict, List, Optional
+from app.models.gift import Gift, ScrapedGift
+from config import Config
 import logging
 from pathlib import Path
 from .base_scraper import BaseScraper
@@ -8,8 +8,21 @@ from .buyagift_scraper import BuyAGiftScraper
 from urllib.parse import urlparse
 from .prezzybox_scraper import PrezzyboxScraper 
 from .firebox_scraper import FireboxScraper
+from .ingest_service import IngestError, IngestService
+from .single_flight import SingleFlight
+from .crawl_demand import CrawlDemand
+from .scrape_workers import RemoteScrapeClient, RemoteScrapeError
+from app.telemetry import span
+
+# Scraper classes keyed by their source_key
+SCRAPER_CLASSES = {
+    'buyagift': BuyAGiftScraper,
+    'prezzybox': PrezzyboxScraper,
+    'firebox': FireboxScraper
+}
+
 class ScraperService:
-    def __init__(self):
+    def __init__(self, sources: Optional[List[str]] = None, fixture_dir: Optional[Path] = None):
         # Define static folder paths
         app_dir = Path(__file__).parent.parent
         self.image_folder = app_dir / 'static' / 'gift_images'
@@ -21,98 +34,51 @@ class ScraperService:
         
         # Initialize scrapers
         self.scrapers: List[BaseScraper] = [
-            #BuyAGiftScraper(self.image_folder, self.debug_folder),
-            #PrezzyboxScraper(self.image_folder, self.debug_folder),
-            FireboxScraper(self.image_folder, self.debug_folder)
+            SCRAPER_CLASSES[source](self.image_folder, self.debug_folder, fixture_dir)
+            for source in (sources or Config.SCRAPER_SOURCES)
         ]
         
+        self.ingest = IngestService()
+        self.single_flight = SingleFlight(Config.SINGLE_FLIGHT_DIR, Config.SINGLE_FLIGHT_RESULT_TTL)
+        self.demand = CrawlDemand(self.scrapers, Config.CRAWL_DEMAND_FLUSH_SECONDS)
+        # With the workers backend Chrome runs in the scrape worker pool, not in this process
+        self.remote = RemoteScrapeClient() if Config.SCRAPE_BACKEND == 'workers' else None
+        
         # Configure logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    def find_gifts(self, criteria: Dict) -> List[Gift]:
-        """Main method to find gifts based on criteria"""
-        gifts = []
-        
-        try:
-            self.logger.info(f"Starting gift search with criteria: {criteria}")
-            
-            # First check database
-            existing_gifts = self._check_database(criteria)
-            if len(existing_gifts) >= 20: # Minimum number of gifts in the database
-                self.logger.info(f"Found sufficient gifts in database ({len(existing_gifts)})")
-                return existing_gifts
-            
-            # If not enough gifts found, use scrapers
-            self.logger.info("Not enough gifts in database, starting web scrape...")
-            new_gifts = []
-            
-            for scraper in self.scrapers:
-                scraper_gifts = scraper.scrape(criteria)
-                self.logger.info(f"Found {len(scraper_gifts)} new gifts from {scraper.__class__.__name__}")
-                new_gifts.extend(scraper_gifts)
-            
-            # Combine and save results
-            gifts.extend(existing_gifts)
-            gifts.extend(new_gifts)
-            
-            if new_gifts:
-                self._save_new_gifts(new_gifts)
-            
-        except Exception as e:
-            self.logger.error(f"Error during gift search: {str(e)}")
-        
-        self.logger.info(f"Returning total of {len(gifts)} gifts")
-        return gifts
+    def _scrape(self, scraper: BaseScraper, criteria: Dict) -> List[ScrapedGift]:
+        """Scrape one source, sharing the work with any identical scrape already in flight"""
+        # The price cap is part of the key because scrapers filter on it after loading the page
+        key = SingleFlight.make_key(
+            scraper.source_key,
+            str(criteria.get('max_price')),
+            *sorted(scraper.get_search_urls(criteria))
+        )
+        with span(f"scrape.{scraper.source_key}"):
+            records = self.single_flight.do(key, lambda: self._scrape_records(scraper, criteria))
+        return [ScrapedGift.from_record(record) for record in records]
 
-    def _check_database(self, criteria: Dict) -> List[Gift]:
-        """Check database for existing gifts"""
+    def _scrape_records(self, scraper: BaseScraper, criteria: Dict) -> List[Dict]:
+        if self.remote is None:
+            return [gift.to_record() for gift in scraper.scrape(criteria)]
+        
         try:
-            filters = []
-            
-            if max_price := criteria.get('max_price'):
-                filters.append(Gift.price <= max_price)
-            
-            if categories := criteria.get('categories'):
-                if categories:
-                    filters.append(Gift.category.in_(categories))
-            
-            tag_filters = []
-            for field in ['occasion', 'relationship', 'gender']:
-                if value := criteria.get(field):
-                    tag_filters.append(value)
-            
-            if interests := criteria.get('interests'):
-                tag_filters.extend(interests)
-            
-            if tag_filters:
-                tag_conditions = [Gift.tags.like(f'%{tag}%') for tag in tag_filters]
-                filters.append(db.or_(*tag_conditions))
-            
-            query = Gift.query.filter(db.and_(*filters))
-            return query.all()
-            
-        except Exception as e:
-            self.logger.error(f"Error checking database: {str(e)}")
+            return self.remote.scrape(scraper.source_key, criteria)
+        except RemoteScrapeError as e:
+            self.logger.error(str(e))
             return []
 
-    def _save_new_gifts(self, gifts: List[Gift]):
-        """Save new gifts to database"""
-        try:
-            new_count = 0
-            for gift in gifts:
-                if not Gift.query.filter(
-                    db.or_(
-                        Gift.affiliate_link == gift.affiliate_link,
-                        Gift.name == gift.name
-                    )
-                ).first():
-                    db.session.add(gift)
-                    new_count += 1
-            
-            db.session.commit()
-            self.logger.info(f"Saved {new_count} new gifts to database")
-            
-        except Exception as e:
-            self.logger.error(f"Error saving gifts to database: {str(e)}")
-            db.session.rollback()
\ No newline at end of file
+    def _record_demand(self, criteria: Dict):
+        """Bump the crawl targets for each scraper's search URLs so popular searches are crawled first"""
+        self.demand.record(criteria)
+
+    def _save_new_gifts(self, gifts: List[ScrapedGift]) -> List[Gift]:
+        """Save new gifts to database, returning the persisted gifts"""
+        with span('db.ingest'):
+            try:
+                return self.ingest.ingest(gifts)
+            except IngestError:
+                # Still answer with what was scraped; the crawler will persist it later
+                return [gift.to_model() for gift in gifts]
@@ -0,0 +1,270 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import logging
+import time
+from app import db
+from app.models.gift import Gift, ScrapedGift
+from app.telemetry import span
+from app.db_routing import replica_reads
+from .near_duplicates import cluster_key
+from .projection import GiftProjection
+from .query_cache import QueryCache
+from .query_log import criteria_key
+from config import Config
+
+# Criteria fields matched against Gift.tags
+TAG_FIELDS = ['occasion', 'relationship', 'gender']
+
+def tag_terms(criteria: Dict) -> List[str]:
+    """Criteria values a matching gift's tags should contain"""
+    terms = [criteria[field] for field in TAG_FIELDS if criteria.get(field)]
+    terms.extend(criteria.get('interests') or [])
+    return terms
+
+@contextmanager
+def keep_loaded():
+    """
+    Don't expire the session's rows on commits inside the block. A search commits
+    (crawl demand, ingest) before it ranks and serializes what it retrieved, and
+    expiring would reload every gift with its own SELECT.
+    """
+    session = db.session()
+    previous, session.expire_on_commit = session.expire_on_commit, False
+    try:
+        yield
+    finally:
+        session.expire_on_commit = previous
+
+class SearchContext:
+    """State handed from stage to stage; hooks may read or change any of it"""
+
+    def __init__(self, description: Optional[str] = None, criteria: Optional[Dict] = None,
+                 projection: Optional[GiftProjection] = None):
+        self.description = description
+        self.criteria = criteria
+        # Response fields; with one, retrieved holds projected rows instead of Gift objects
+        self.projection = projection
+        self.retrieved: List[Gift] = []  # Catalog rows matching the criteria
+        self.thin = False  # Fewer distinct catalog matches than SEARCH_MIN_RESULTS
+        self.read_only = False  # GET requests and cache warm-up: no scraping and no crawl demand
+        self.should_scrape = False
+        self.cached = False  # Results came from the result cache
+        self.scraped: List[ScrapedGift] = []  # Records from the scrapers, not yet in the session
+        self.ingested: List[Gift] = []  # Persisted rows for the scraped gifts
+        self.gifts: List[Gift] = []  # Deduplicated and ranked
+        self.results: List = []  # Serialized gifts
+        self.timings: Dict[str, float] = {}  # Seconds per stage
+
+    def tag_terms(self) -> List[str]:
+        return tag_terms(self.criteria)
+
+class SearchPipeline:
+    """
+    One pass per search: extract -> retrieve -> decide -> scrape -> ingest -> rank -> serialize.
+    The catalog is queried once and scraped gifts are ingested once. Hooks registered
+    with add_hook(stage, fn) run after that stage with the SearchContext.
+
+    Serialized results of searches the catalog answers well are kept in a result
+    cache by canonical criteria and response fields, so a repeated search (or one
+    phrased differently with the same criteria) skips everything after extract.
+    """
+
+    STAGES = ['extract', 'retrieve', 'decide', 'scrape', 'ingest', 'rank', 'serialize']
+
+    def __init__(self, scraper_service):
+        self.scraper = scraper_service
+        self.hooks: Dict[str, List[Callable[[SearchContext], None]]] = {stage: [] for stage in self.STAGES}
+        self.cache = QueryCache('results', Config.RESULT_CACHE_SIZE, Config.RESULT_CACHE_TTL,
+                                Config.CACHE_STATS_INTERVAL)
+        self.logger = logging.getLogger(__name__)
+
+    def add_hook(self, stage: str, hook: Callable[[SearchContext], None]):
+        if stage not in self.hooks:
+            raise ValueError(f"Unknown search stage: {stage}")
+        self.hooks[stage].append(hook)
+
+    def run(self, context: SearchContext, nlp_service=None, until: str = 'serialize') -> SearchContext:
+        """
+        Run the stages up to and including until; extract is skipped
+        when the context already has criteria
+        """
+        if context.criteria is None:
+            self.run_stage('extract', context, nlp_service)
+        if until == 'serialize' and self.lookup(context):
+            return context
+        for stage in self.STAGES[1:self.STAGES.index(until) + 1]:
+            self.run_stage(stage, context)
+        if until == 'serialize':
+            self.remember(context)
+        return context
+
+    def _cache_key(self, context: SearchContext) -> Tuple:
+        return criteria_key(context.criteria), context.projection.cache_key() if context.projection else None
+
+    def lookup(self, context: SearchContext) -> bool:
+        """Fill in context.results from the result cache; True on a hit"""
+        if not isinstance(context.criteria, dict):
+            return False
+        results = self.cache.get(self._cache_key(context))
+        if results is None:
+            return False
+        context.results = results
+        context.cached = True
+        return True
+
+    def remember(self, context: SearchContext):
+        """
+        Cache the serialized results unless the catalog was thin: those searches should
+        see what the next scrape or crawl adds rather than wait out the TTL
+        """
+        if not context.thin:
+            self.cache.put(self._cache_key(context), context.results)
+
+    def stream(self, context: SearchContext) -> Iterator[Tuple[str, List]]:
+        """
+        Yield (source, results) batches of serialized gifts: the catalog matches first,
+        straight from the result cache when the search is in it, then each scraped
+        source once it is ingested. Gifts already yielded are not repeated.
+        """
+        if self.lookup(context):
+            yield 'database', context.results
+            return
+
+        self.run_stage('retrieve', context)
+        self.run_stage('decide', context)
+        self.run_stage('rank', context)
+        self.run_stage('serialize', context)
+        # Only searches the catalog answers well are cached, and those don't scrape,
+        # so the database batch is the whole response
+        self.remember(context)
+        yield 'database', context.results
+
+        if not context.should_scrape:
+            return
+
+        seen = {cluster_key(gift) for gift in context.gifts}
+        for scraper in self.scraper.scrapers:
+            batch = SearchContext(context.description, context.criteria, context.projection)
+            batch.should_scrape = True
+            self.run_stage('scrape', batch, [scraper])
+            if not batch.scraped:
+                continue
+            self.run_stage('ingest', batch)
+            self.run_stage('rank', batch)
+            batch.gifts = [gift for gift in batch.gifts if cluster_key(gift) not in seen]
+            seen.update(cluster_key(gift) for gift in batch.gifts)
+            context.scraped.extend(batch.scraped)
+            context.ingested.extend(batch.ingested)
+            if batch.gifts:
+                self.run_stage('serialize', batch)
+                yield scraper.source_key, batch.results
+
+    def run_stage(self, stage: str, context: SearchContext, *args):
+        started = time.perf_counter()
+        getattr(self, stage)(context, *args)
+        context.timings[stage] = context.timings.get(stage, 0.0) + time.perf_counter() - started
+        for hook in self.hooks[stage]:
+            hook(context)
+
+    def extract(self, context: SearchContext, nlp_service):
+        criteria = nlp_service.extract_gift_criteria(context.description)
+        context.criteria = criteria if isinstance(criteria, dict) else {}
+
+    def retrieve(self, context: SearchContext):
+        """The one catalog query for this search"""
+        if not isinstance(context.criteria, dict):
+            context.criteria = {}
+        criteria = context.criteria
+
+        try:
+            if context.projection:
+                query = db.session.query(*context.projection.columns())
+            else:
+                query = Gift.query
+            query = query.filter(Gift.expired_at.is_(None))
+
+            if criteria.get('max_price'):
+                query = query.filter(Gift.price <= float(criteria['max_price']))
+
+            if isinstance(criteria.get('categories'), list) and criteria['categories']:
+                query = query.filter(Gift.category.in_(criteria['categories']))
+
+            if tag_terms := context.tag_terms():
+                query = query.filter(db.or_(*[Gift.tags.like(f'%{term}%') for term in tag_terms]))
+
+            with span('db.search'), replica_reads():
+                context.retrieved = query.all()
+
+        except Exception as e:
+            self.logger.error(f"Error searching the catalog: {str(e)}")
+            context.retrieved = []
+
+    def decide(self, context: SearchContext):
+        """Scrape only when the catalog is thin, and always tell the crawler about thin searches"""
+        # Near-duplicates from several shops count once
+        if len({cluster_key(gift) for gift in context.retrieved}) >= Config.SEARCH_MIN_RESULTS:
+            context.should_scrape = False
+            return
+
+        context.thin = True
+        if context.read_only:
+            context.should_scrape = False
+            return
+        with keep_loaded():
+            self.scraper._record_demand(context.criteria)
+        context.should_scrape = Config.SCRAPE_ON_REQUEST
+        if not context.should_scrape:
+            self.logger.info("Request-path scraping disabled, leaving this search to the crawler")
+
+    def scrape(self, context: SearchContext, scrapers=None):
+        if not context.should_scrape:
+            return
+        for scraper in scrapers or self.scraper.scrapers:
+            context.scraped.extend(self._scrape_source(scraper, context.criteria))
+
+    def ingest(self, context: SearchContext):
+        if context.scraped:
+            with keep_loaded():
+                context.ingested = self.scraper._save_new_gifts(context.scraped)
+
+    def rank(self, context: SearchContext):
+        """
+        Best tag matches first, one gift per near-duplicate cluster: the best ranked,
+        or the cheapest when NEAR_DUPLICATE_REPRESENTATIVE is 'cheapest'
+        """
+        gifts = context.retrieved + context.ingested
+
+        terms = [term.lower() for term in context.tag_terms()]
+        if terms:
+            def matches(gift):
+                tags = (gift.tags or '').lower()
+                return sum(1 for term in terms if term in tags)
+            # Stable, so equally good matches keep catalog order
+            gifts = sorted(gifts, key=matches, reverse=True)
+
+        cheapest = Config.NEAR_DUPLICATE_REPRESENTATIVE == 'cheapest'
+        representatives: Dict[int, Gift] = {}
+        for gift in gifts:
+            key = cluster_key(gift)
+            current = representatives.get(key)
+            if current is None or (cheapest and gift.price < current.price):
+                # Replacing a value keeps the cluster at its best ranked position
+                representatives[key] = gift
+
+        context.gifts = list(representatives.values())
+
+    def serialize(self, context: SearchContext):
+        with span('serialize'):
+            if context.projection:
+                context.results = context.projection.serialize(context.gifts)
+            else:
+                context.results = [gift.to_dict() for gift in context.gifts]
+
+    def _scrape_source(self, scraper, criteria: Dict) -> List[ScrapedGift]:
+        try:
+            gifts = self.scraper._scrape(scraper, criteria)
+            self.logger.info(f"Found {len(gifts)} new gifts from {scraper.__class__.__name__}")
+            return gifts
+        except Exception as e:
+            self.logger.error(f"Error scraping {scraper.source_key}: {str(e)}")
+            return []
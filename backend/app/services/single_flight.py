@@ -0,0 +1,161 @@
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within the process only
+    fcntl = None
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.records = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls so only one of them does the work.
+
+    Within a process, followers wait on the leader's in-memory result. Across
+    processes on the same host (e.g. gunicorn workers), an exclusive file lock
+    per key elects the leader, which publishes its result to a small JSON file
+    that followers read once the lock is released. Lock and result files older
+    than result_ttl are swept by leaders, at most once per result_ttl.
+
+    Results are passed around as JSON-serializable records so each caller
+    gets its own objects, never ones attached to another thread's session.
+    """
+
+    def __init__(self, lock_dir: Path, result_ttl: float = 30):
+        self.lock_dir = Path(lock_dir)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        self.result_ttl = result_ttl
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def do(self, key: str, fn: Callable[[], List[Dict]]) -> List[Dict]:
+        """Run fn() unless an identical call is already in flight, and return its records"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            self.logger.info(f"Waiting on in-flight scrape {key[:12]}")
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.records
+
+        try:
+            call.records = self._do_across_processes(key, fn)
+            return call.records
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _do_across_processes(self, key: str, fn: Callable[[], List[Dict]]) -> List[Dict]:
+        if fcntl is None:
+            return fn()
+
+        result_path = self.lock_dir / f"{key}.json"
+        lock_file, waited = self._acquire(self.lock_dir / f"{key}.lock")
+        try:
+            # Only a worker that waited on a leader reads its result; an uncontended
+            # lock means nobody was scraping, so an older result file is not reused
+            if waited:
+                records = self._read_result(result_path)
+                if records is not None:
+                    self.logger.info(f"Reusing scrape {key[:12]} from another worker")
+                    return records
+
+            records = fn()
+            self._write_result(result_path, records)
+            return records
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+            self._sweep()
+
+    @staticmethod
+    def _acquire(lock_path: Path):
+        """Open and exclusively lock lock_path; returns (file, whether another worker held it)"""
+        while True:
+            lock_file = open(lock_path, 'a')
+            waited = False
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is scraping the same URLs
+                waited = True
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            # A sweep may have unlinked the file between open() and flock()
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino:
+                    return lock_file, waited
+            except FileNotFoundError:
+                pass
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _sweep(self):
+        """Remove result, lock and temp files older than result_ttl"""
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < self.result_ttl:
+                return
+            self._last_sweep = now
+
+        for path in self.lock_dir.iterdir():
+            try:
+                if now - path.stat().st_mtime <= self.result_ttl:
+                    continue
+                if path.suffix != '.lock':
+                    path.unlink()
+                    continue
+                with open(path, 'a') as lock_file:
+                    # Skip locks in use; holding the lock while unlinking makes waiters retry (see _acquire)
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    path.unlink()
+            except OSError:
+                continue  # Swept by another worker
+
+    def _read_result(self, path: Path) -> Optional[List[Dict]]:
+        try:
+            if time.time() - path.stat().st_mtime > self.result_ttl:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_result(self, path: Path, records: List[Dict]):
+        try:
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(records, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"Error publishing scrape result: {str(e)}")
@@ -0,0 +1,140 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import time
+from flask import g, has_request_context, request
+from config import Config
+
+# Upper bounds in seconds; covers a fast DB lookup up to a slow Chrome scrape
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class Registry:
+    """Minimal in-process metrics registry rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = OrderedDict()
+        self._counters: Dict[str, Dict[Tuple, float]] = OrderedDict()
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def observe(self, name: str, value: float, help_text: str = '', **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+                self._help.setdefault(name, help_text)
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, help_text: str = '', **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+            self._help.setdefault(name, help_text)
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """Add a callback returning extra exposition lines, evaluated on every scrape"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+@contextmanager
+def span(name: str):
+    """
+    Time a phase of the current request. Durations go to the Server-Timing header
+    and the gift_ideas_phase_seconds histogram; does nothing when timing is disabled.
+    """
+    if not Config.TIMING_ENABLED:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.observe('gift_ideas_phase_seconds', elapsed, 'Time spent per request phase', phase=name)
+        if has_request_context():
+            timings = g.setdefault('phase_timings', OrderedDict())
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+def init_app(app):
+    """Add request timing and the Server-Timing header to every response"""
+
+    @app.before_request
+    def start_request_timer():
+        if Config.TIMING_ENABLED:
+            g.request_started = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+
+        total = time.perf_counter() - started
+        endpoint = request.endpoint or 'unknown'
+        registry.observe('gift_ideas_request_seconds', total, 'Request latency by endpoint', endpoint=endpoint)
+        registry.inc('gift_ideas_requests_total', 1, 'Requests by endpoint and status',
+                     endpoint=endpoint, status=str(response.status_code))
+
+        timings = g.get('phase_timings') or {}
+        entries = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in timings.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        response.headers.add('Server-Timing', ', '.join(entries))
+        # Let the frontend (a different origin in development) read the timings
+        response.headers['Timing-Allow-Origin'] = '*'
+        return response
@@ -0,0 +1,6 @@
+"""
+Offline benchmarks. Run from the backend folder, e.g.
+
+    python -m benchmarks.scraper_parse --output results/parse.json
+    python -m benchmarks.compare results/before.json results/after.json
+"""
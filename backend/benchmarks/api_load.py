@@ -0,0 +1,271 @@
+"""
+End-to-end load benchmark for POST /api/find-gifts.
+
+Boots create_app() against a throwaway SQLite database seeded with a synthetic
+catalog, replaces the live scrapers with fakes that render generated listing
+pages after a configurable delay, and drives the endpoint concurrently with a
+mix of realistic descriptions. Latency is reported overall and per path:
+
+    db         answered from the catalog alone
+    cache      scraped, but every page came from the page cache
+    coalesced  waited on an identical in-flight scrape
+    scrape     loaded at least one page "live"
+
+--stream drives /api/find-gifts/stream instead and also reports
+time-to-first-gift: the delay until the first non-empty gifts batch arrives.
+"""
+import argparse
+import html
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from config import Config
+from .common import latency_summary, write_results
+
+RECIPIENTS = ['my wife', 'my husband', 'my dad', 'my mum', 'my brother', 'my sister',
+              'a colleague', 'my best friend', 'my boyfriend', 'my girlfriend', 'my grandad']
+INTERESTS = ['football', 'golf', 'gaming', 'cooking', 'craft beer', 'whisky', 'wine', 'gardening',
+             'hiking', 'music', 'reading', 'yoga', 'photography', 'dogs', 'cats', 'board games',
+             'coffee', 'travel', 'fashion', 'painting']
+OCCASIONS = ['birthday', 'christmas', 'anniversary', 'retirement', 'fathers day', 'mothers day',
+             'graduation', 'housewarming', 'valentines', 'thank you']
+TEMPLATES = [
+    "Looking for a {occasion} gift for {recipient} who loves {interest}. Budget is £{budget}.",
+    "{recipient_cap} is {age} years old and into {interest} and {interest2}, spend up to £{budget}",
+    "Gift ideas for {recipient} for {occasion}",
+    "Something fun for {recipient} who likes {interest}",
+    "My budget is £{budget} for a {occasion} present, {recipient} enjoys {interest}",
+]
+CATEGORIES = ['sports_outdoor', 'fitness', 'experiences', 'adventure', 'electronics', 'gadgets',
+              'gaming', 'kitchen', 'food_drink', 'gourmet', 'crafts', 'creative', 'entertainment',
+              'books', 'garden', 'travel', 'fashion', 'beauty', 'spa', 'luxury', 'novelty', 'home']
+TAGS = ['romantic', 'family', 'adventure', 'relaxation', 'food_lover', 'outdoor', 'cultural',
+        'learning', 'male', 'female', 'birthday', 'christmas', 'anniversary', 'beer', 'wine',
+        'geeky', 'animals', 'party']
+
+def make_description(rng: random.Random) -> str:
+    recipient = rng.choice(RECIPIENTS)
+    return rng.choice(TEMPLATES).format(
+        occasion=rng.choice(OCCASIONS),
+        recipient=recipient,
+        recipient_cap=recipient[0].upper() + recipient[1:],
+        interest=rng.choice(INTERESTS),
+        interest2=rng.choice(INTERESTS),
+        budget=rng.choice([15, 20, 25, 30, 40, 50, 60, 75, 100, 150, 250]),
+        age=rng.randint(8, 80)
+    )
+
+def seed_catalog(db, Gift, size: int, rng: random.Random):
+    """Bulk insert a synthetic catalog"""
+    rows = []
+    for i in range(size):
+        category = rng.choice(CATEGORIES)
+        rows.append({
+            'name': f"Synthetic Gift {i} {category.replace('_', ' ').title()}",
+            'description': ' '.join(rng.choice(INTERESTS) for _ in range(rng.randint(10, 60))),
+            'price': round(rng.uniform(5, 400), 2),
+            'category': category,
+            'affiliate_link': f"https://example.com/gifts/{i}",
+            'source': 'Synthetic',
+            'tags': ','.join(sorted(set([category] + rng.sample(TAGS, rng.randint(1, 4))))),
+            'image_path': f"/static/gift_images/gift_{i}.jpg",
+            'missed_crawls': 0
+        })
+    db.session.execute(Gift.__table__.insert(), rows)
+    db.session.commit()
+
+class FakeDriver:
+    """Stands in for Chrome: get() sleeps, page_source is a generated Firebox listing"""
+
+    def __init__(self, latency: float, items: int, rng: random.Random, on_load):
+        self.latency = latency
+        self.items = items
+        self.rng = rng
+        self.on_load = on_load
+        self.page_source = ''
+
+    def get(self, url: str):
+        self.on_load()
+        time.sleep(self.rng.uniform(0.5, 1.5) * self.latency)
+        page_rng = random.Random(url)
+        products = []
+        for i in range(self.items):
+            name = f"{page_rng.choice(INTERESTS).title()} Gift {page_rng.randint(1, 10 ** 6)}"
+            slug = name.lower().replace(' ', '-')
+            products.append(
+                f'<div class="product-item"><a href="https://firebox.com/{slug}/p{i}">'
+                f'<picture><img src="https://firebox.com/images/{slug}.png"></picture></a>'
+                f'<div class="item-name product-name-list">{html.escape(name)}</div>'
+                f'<div class="price">£{page_rng.uniform(5, 120):.2f}</div></div>'
+            )
+        self.page_source = f"<html><body>{''.join(products)}</body></html>"
+
+    def quit(self):
+        pass
+
+def build_app(work_dir: Path, args):
+    # Services read Config directly, so the overrides go on the class itself
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{work_dir / 'load.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}},
+        'SCRAPE_ON_REQUEST': True,
+        'SCRAPER_SOURCES': ['firebox'],
+        'PAGE_CACHE_MODE': 'readwrite',
+        'PAGE_CACHE_DIR': str(work_dir / 'page_cache'),
+        'SINGLE_FLIGHT_DIR': str(work_dir / 'single_flight'),
+        'USE_OPENAI': False,
+        # Measure uncached searches; benchmarks.cache_warmup covers the caches
+        'NLP_CACHE_SIZE': 0,
+        'RESULT_CACHE_SIZE': 0,
+        'QUERY_LOG_ENABLED': False,
+        'CACHE_WARMUP_TOP_N': 0
+    }
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    from app import create_app, db
+    from app.models.gift import Gift
+    from app.routes import api
+    from app.services.firebox_scraper import FireboxScraper
+    from app.services.host_scheduler import HostScheduler
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, Gift, args.catalog_size, random.Random(args.seed))
+
+    class Counters(threading.local):
+        # Class defaults so threads that never called reset() (e.g. executor threads) still count
+        live_loads = 0
+        cache_hits = 0
+        scrape_calls = 0
+
+    local = Counters()
+
+    def on_load():
+        local.live_loads += 1
+
+    scraper_service = api.gift_service.scraper
+    fake = FireboxScraper(scraper_service.image_folder, scraper_service.debug_folder)
+    fake.scheduler = HostScheduler(delay=0, concurrency=args.concurrency, host_limits={})
+    fake.download_images = False
+    fake._scroll_and_wait = lambda driver: None
+    fake._get_driver = lambda: FakeDriver(args.scrape_latency, args.scrape_items,
+                                          random.Random(), on_load)
+    scraper_service.scrapers = [fake]
+
+    # Classify each request by what the scrape path did on this thread
+    scrape = scraper_service._scrape
+    fetch_page = fake._fetch_page
+
+    def tracking_scrape(scraper, criteria):
+        local.scrape_calls += 1
+        return scrape(scraper, criteria)
+
+    def tracking_fetch_page(url, driver=None):
+        live_loads = local.live_loads
+        result = fetch_page(url, driver)
+        if local.live_loads == live_loads:
+            local.cache_hits += 1
+        return result
+
+    scraper_service._scrape = tracking_scrape
+    fake._fetch_page = tracking_fetch_page
+
+    def classify():
+        if local.live_loads:
+            return 'scrape'
+        if local.cache_hits:
+            return 'cache'
+        if local.scrape_calls:
+            return 'coalesced'
+        return 'db'
+
+    def reset():
+        local.live_loads = 0
+        local.cache_hits = 0
+        local.scrape_calls = 0
+
+    return app, reset, classify
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--catalog-size', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scrape-latency', type=float, default=1.0, help='Mean fake page load time, seconds')
+    parser.add_argument('--scrape-items', type=int, default=40, help='Products per fake listing page')
+    parser.add_argument('--seed', type=int, default=32)
+    parser.add_argument('--stream', action='store_true', help='Use the NDJSON streaming endpoint')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, reset, classify = build_app(Path(tmp), args)
+        rng = random.Random(args.seed)
+        descriptions = [make_description(rng) for _ in range(args.requests)]
+        samples = []
+        samples_lock = threading.Lock()
+        clients = threading.local()
+
+        def post(description):
+            """Returns (status, body bytes, seconds until the first gift or None)"""
+            if not args.stream:
+                response = clients.client.post('/api/find-gifts', json={'description': description})
+                return response.status_code, len(response.data), None
+
+            started = time.perf_counter()
+            response = clients.client.post('/api/find-gifts/stream', json={'description': description},
+                                           buffered=False)
+            first_gift = None
+            size = 0
+            for chunk in response.response:
+                size += len(chunk)
+                for line in chunk.decode('utf-8').splitlines():
+                    event = json.loads(line)
+                    if first_gift is None and event['type'] == 'gifts' and event['gifts']:
+                        first_gift = time.perf_counter() - started
+            response.close()
+            return response.status_code, size, first_gift
+
+        def run(description):
+            if not hasattr(clients, 'client'):
+                clients.client = app.test_client()
+            reset()
+            started = time.perf_counter()
+            status, size, first_gift = post(description)
+            elapsed = time.perf_counter() - started
+            with samples_lock:
+                samples.append((classify(), elapsed, status, size, first_gift))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(run, descriptions))
+        wall = time.perf_counter() - started
+
+    results = [{
+        'name': 'all',
+        'requests_per_sec': round(len(samples) / wall, 2),
+        'errors': sum(1 for _, _, status, _, _ in samples if status != 200),
+        'avg_response_bytes': round(sum(size for _, _, _, size, _ in samples) / len(samples), 1),
+        **latency_summary([elapsed for _, elapsed, _, _, _ in samples])
+    }]
+    first_gifts = [first_gift for *_, first_gift in samples if first_gift is not None]
+    if first_gifts:
+        results.append({'name': 'time_to_first_gift', 'share': round(len(first_gifts) / len(samples), 3),
+                        **latency_summary(first_gifts)})
+    for path in ['db', 'cache', 'coalesced', 'scrape']:
+        latencies = [elapsed for kind, elapsed, _, _, _ in samples if kind == path]
+        if latencies:
+            results.append({'name': f"path:{path}", 'share': round(len(latencies) / len(samples), 3),
+                            **latency_summary(latencies)})
+
+    write_results('api_load', results, args.output, wall_seconds=round(wall, 3),
+                  **{key: value for key, value in vars(args).items() if key != 'output'})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Concurrent-request throughput of the sync Flask app versus the ASGI app.
+
+Each mode runs in its own subprocess with a fresh catalog, page cache and the
+fake scrapers from benchmarks.api_load, and OpenAI extraction pointed at the
+local stub with --nlp-latency, so requests are dominated by I/O waits.
+
+    sync  --sync-workers threads, like a threaded WSGI server
+    asgi  --clients concurrent requests driven straight into app.asgi.AsgiApp
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from config import Config
+from .api_load import build_app, make_description
+from .common import latency_summary, write_results
+from .openai_stub import StubState, serve_openai_stub
+
+MODES = ['sync', 'asgi']
+
+async def asgi_post(app, path: str, payload: dict):
+    """Minimal in-process ASGI client returning (status, body)"""
+    body = json.dumps(payload).encode('utf-8')
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+        'path': path, 'root_path': '', 'query_string': b'',
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        'server': ('127.0.0.1', 5000), 'client': ('127.0.0.1', 0)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response = {'status': None, 'body': []}
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'].append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return response['status'], b''.join(response['body'])
+
+def run_sync(app, descriptions, workers: int):
+    samples = []
+    lock = threading.Lock()
+    clients = threading.local()
+
+    def run(description):
+        if not hasattr(clients, 'client'):
+            clients.client = app.test_client()
+        started = time.perf_counter()
+        response = clients.client.post('/api/find-gifts', json={'description': description})
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples.append((elapsed, response.status_code))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run, descriptions))
+    return samples
+
+def run_asgi(app, descriptions, clients: int):
+    from app.asgi import AsgiApp
+
+    asgi_app = AsgiApp(app)
+    samples = []
+
+    async def main():
+        semaphore = asyncio.Semaphore(clients)
+
+        async def run(description):
+            async with semaphore:
+                started = time.perf_counter()
+                status, _ = await asgi_post(asgi_app, '/api/find-gifts', {'description': description})
+                samples.append((time.perf_counter() - started, status))
+
+        await asyncio.gather(*(run(description) for description in descriptions))
+
+    asyncio.run(main())
+    asgi_app.gift_service.shutdown()
+    return samples
+
+def run_mode(args) -> dict:
+    from app.routes import api
+    from app.services.nlp_service import NLPService
+
+    rng = random.Random(args.seed)
+    descriptions = [make_description(rng) for _ in range(args.requests)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, _, _ = build_app(Path(tmp), args)
+
+        # The stub answers with the local extractor's criteria, so both modes search the same way
+        local = NLPService(use_openai=False)
+        answers = {}
+        for description in descriptions:
+            criteria = local.extract_gift_criteria(description)
+            criteria.pop('categories', None)
+            answers[description] = criteria
+
+        state = StubState(answers, args.nlp_latency, args.nlp_latency / 5, seed=args.seed)
+        with serve_openai_stub(state) as base_url:
+            Config.OPENAI_API_KEY = 'stub-key'
+            Config.OPENAI_BASE_URL = base_url
+            api.nlp_service = NLPService(use_openai=True)
+
+            started = time.perf_counter()
+            if args.mode == 'sync':
+                samples = run_sync(app, descriptions, args.sync_workers)
+            else:
+                samples = run_asgi(app, descriptions, args.clients)
+            wall = time.perf_counter() - started
+
+    return {
+        'name': args.mode,
+        'requests_per_sec': round(len(samples) / wall, 2),
+        'errors': sum(1 for _, status in samples if status != 200),
+        'wall_seconds': round(wall, 3),
+        **latency_summary([elapsed for elapsed, _ in samples])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=MODES, help='Run a single mode in this process')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--clients', type=int, default=64, help='Concurrent requests in asgi mode')
+    parser.add_argument('--sync-workers', type=int, default=8, help='Request threads in sync mode')
+    parser.add_argument('--nlp-latency', type=float, default=0.5, help='Stub OpenAI latency, seconds')
+    parser.add_argument('--catalog-size', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=2, help='Fake scraper slots per host')
+    parser.add_argument('--scrape-latency', type=float, default=1.0, help='Mean fake page load time, seconds')
+    parser.add_argument('--scrape-items', type=int, default=40, help='Products per fake listing page')
+    parser.add_argument('--seed', type=int, default=40)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args)))
+        return
+
+    # Fresh process per mode so caches, pools and the catalog don't carry over
+    results = []
+    passthrough = [arg for arg in sys.argv[1:] if not arg.startswith('--output')]
+    if args.output and args.output in passthrough:
+        passthrough.remove(args.output)
+    for mode in MODES:
+        output = subprocess.check_output([sys.executable, '-m', 'benchmarks.asgi_compare', '--mode', mode,
+                                          *passthrough], text=True)
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    write_results('asgi_compare', results, args.output,
+                  **{key: value for key, value in vars(args).items() if key not in ('mode', 'output')})
+
+if __name__ == '__main__':
+    main()
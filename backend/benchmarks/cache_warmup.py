@@ -0,0 +1,136 @@
+"""
+Cache hit rates after a restart, cold against warmed from the query log.
+
+Seeds a throwaway SQLite catalog and draws searches from a pool of --distinct
+descriptions with Zipf-like popularity (weight 1/rank^--zipf). A first stream of
+--requests searches fills the query log, as a day of traffic would. The caches
+are then cleared (a restart) and a second stream from the same distribution is
+replayed twice:
+
+    cold     straight after the restart
+    warmed   after CacheWarmer replays the --top most frequent logged searches
+
+Reported per mode: NLP and result cache hit rates over the whole stream and per
+--windows slice of it (the curve after the restart), latency, and for warmed the
+warm-up time and how many replayed searches came back thin (crawl candidates).
+Scraping is disabled so every response comes from the catalog. The log keeps only
+criteria unless --log-descriptions is given, as in the default config, in which
+case the warm-up fills the result cache but not the NLP cache.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from config import Config
+from .api_load import make_description, seed_catalog
+from .common import latency_summary, write_results
+
+def build_app(work_dir: Path, args):
+    # Services read Config directly, so the overrides go on the class itself
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{work_dir / 'warmup.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'SCRAPE_ON_REQUEST': False,
+        'USE_OPENAI': False,
+        'QUERY_LOG_ENABLED': True,
+        'QUERY_LOG_DESCRIPTIONS': args.log_descriptions,
+        'QUERY_LOG_PATH': str(work_dir / 'query_log' / 'queries.log'),
+        'QUERY_LOG_FLUSH_SECONDS': 3600,  # Flushed once the first stream is done
+        'CACHE_WARMUP_TOP_N': 0  # Warmed explicitly below, not on the first request
+    }
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    from app import create_app, db
+    from app.models.gift import Gift
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, Gift, args.catalog_size, random.Random(args.seed))
+    return app
+
+def search_stream(pool, weights, count: int, rng: random.Random):
+    return rng.choices(pool, weights=weights, k=count)
+
+def serve(client, descriptions, caches, windows: int) -> dict:
+    latencies = []
+    outcomes = {name: [] for name in caches}
+    for description in descriptions:
+        before = {name: cache.stats['hits'] for name, cache in caches.items()}
+        started = time.perf_counter()
+        client.get('/api/find-gifts', query_string={'description': description})
+        latencies.append(time.perf_counter() - started)
+        for name, cache in caches.items():
+            outcomes[name].append(cache.stats['hits'] > before[name])
+
+    size = max(1, len(descriptions) // windows)
+    curve = []
+    for start in range(0, len(descriptions), size):
+        point = {'requests': min(start + size, len(descriptions))}
+        for name, hits in outcomes.items():
+            window = hits[start:start + size]
+            point[f"{name}_hit_rate"] = round(sum(window) / len(window), 3)
+        curve.append(point)
+
+    return {
+        **{f"{name}_hit_rate": round(sum(hits) / len(hits), 4) for name, hits in outcomes.items()},
+        'curve': curve,
+        **latency_summary(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--catalog-size', type=int, default=5000)
+    parser.add_argument('--distinct', type=int, default=1000, help='Distinct descriptions in the pool')
+    parser.add_argument('--zipf', type=float, default=1.0, help='Popularity exponent')
+    parser.add_argument('--requests', type=int, default=1000, help='Searches per stream')
+    parser.add_argument('--top', type=int, default=100, help='Logged searches replayed by the warm-up')
+    parser.add_argument('--log-descriptions', action='store_true', help='Log descriptions for the warm-up')
+    parser.add_argument('--windows', type=int, default=10, help='Points on the hit-rate curve')
+    parser.add_argument('--seed', type=int, default=50)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = list(dict.fromkeys(make_description(rng) for _ in range(args.distinct * 2)))[:args.distinct]
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(pool))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp), args)
+        client = app.test_client()
+
+        from app.routes import api
+        from app.services.cache_warmer import CacheWarmer
+        from app.services.query_log import get_query_log
+
+        caches = {'nlp': api.nlp_service.cache, 'result': api.gift_service.pipeline.cache}
+        for description in search_stream(pool, weights, args.requests, rng):
+            client.get('/api/find-gifts', query_string={'description': description})
+        query_log = get_query_log()
+        query_log.flush()
+        log_bytes = sum(path.stat().st_size for path in query_log.files())
+
+        replay = search_stream(pool, weights, args.requests, rng)
+        results = []
+        for mode in ('cold', 'warmed'):
+            for cache in caches.values():
+                cache.clear()
+
+            result = {'name': mode}
+            if mode == 'warmed':
+                with app.app_context():
+                    stats = CacheWarmer(api.gift_service, api.nlp_service, query_log).warm(args.top)
+                result.update(warmup_seconds=stats['seconds'], warmed=stats['queries'], thin=stats['thin'])
+            result.update(serve(client, replay, caches, args.windows))
+            results.append(result)
+        query_log.flush()  # Nothing left for the exit flush once the folder is gone
+
+    write_results('cache_warmup', results, args.output, catalog_size=args.catalog_size, distinct=len(pool),
+                  zipf=args.zipf, requests=args.requests, top=args.top, query_log_bytes=log_bytes,
+                  log_descriptions=args.log_descriptions,
+                  result_cache_size=Config.RESULT_CACHE_SIZE, nlp_cache_size=Config.NLP_CACHE_SIZE)
+
+if __name__ == '__main__':
+    main()
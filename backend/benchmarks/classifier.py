@@ -0,0 +1,140 @@
+"""
+Equivalence and throughput of the compiled keyword classifier.
+
+Builds a title corpus from the fixture pages plus --items synthetic titles mixing
+every rule keyword with filler words, glued and overlapping keywords ('sparty',
+'funnyfun'), odd case and prices either side of the luxury threshold. For each
+rule set the corpus is classified by:
+
+    legacy    the per-keyword loops the scrapers used before (kept here as the reference)
+    single    KeywordClassifier.classify, one title at a time
+    batch     KeywordClassifier.classify_batch, --batch-size titles per call
+
+and every result is compared with legacy. Exits non-zero on any mismatch.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.services.classifier import (DEFAULT_CATEGORIES, DEFAULT_TAGS, FIREBOX_CATEGORIES, FIREBOX_TAGS,
+                                     RULES, SOURCE_RULES)
+from app.services.scraper_service import SCRAPER_CLASSES
+from .common import PAGE_FIXTURES_DIR, write_results
+from .scraper_parse import NO_PRICE_LIMIT, make_scraper
+
+FILLER = ['Personalised', 'Mug', 'Socks', 'Voucher', 'Deluxe', 'Set', 'Mini', 'Giant', 'Kit', 'Print',
+          'for', 'with', 'and', '&', '-', 'Him', 'Her', 'Dad', 'Mum', 'Edition', 'Box', 'Luxury']
+
+def legacy_default(title: str, price: float):
+    """BaseScraper._determine_category and _generate_tags as they were"""
+    title_lower = title.lower()
+    category = 'luxury' if price >= 200 else 'experiences'
+    for name, keywords in DEFAULT_CATEGORIES.items():
+        if any(keyword in title_lower for keyword in keywords):
+            category = name
+            break
+    tags = {category}
+    for tag, keywords in DEFAULT_TAGS.items():
+        if any(keyword in title_lower for keyword in keywords):
+            tags.add(tag)
+    return category, ','.join(sorted(tags))
+
+def legacy_firebox(title: str, price: float):
+    """FireboxScraper._determine_firebox_category and _generate_firebox_tags as they were"""
+    title_lower = title.lower()
+    category = 'novelty'
+    for name, keywords in FIREBOX_CATEGORIES.items():
+        if any(keyword in title_lower for keyword in keywords):
+            category = name
+            break
+    tags = {category}
+    for tag, keywords in FIREBOX_TAGS.items():
+        if any(keyword in title_lower for keyword in keywords):
+            tags.add(tag)
+    return category, ', '.join(sorted(tags))
+
+LEGACY = {'default': legacy_default, 'firebox': legacy_firebox}
+
+def fixture_items(fixtures_version: str):
+    """(title, price) of every product on the fixture pages"""
+    items = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for source in sorted(SCRAPER_CLASSES):
+            scraper = make_scraper(source, Path(tmp))
+            for page in sorted((PAGE_FIXTURES_DIR / fixtures_version / source).glob('*.html')):
+                gifts = scraper._parse_page(page.read_text(encoding='utf-8'), NO_PRICE_LIMIT)
+                items.extend((gift.name, gift.price) for gift in gifts)
+    return items
+
+def synthetic_items(count: int, rng: random.Random):
+    keywords = sorted({keyword
+                       for rules in (DEFAULT_CATEGORIES, DEFAULT_TAGS, FIREBOX_CATEGORIES, FIREBOX_TAGS)
+                       for values in rules.values() for keyword in values})
+    items = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(1, 5))]
+        for _ in range(rng.choice([0, 1, 1, 2, 3])):
+            keyword = rng.choice(keywords)
+            roll = rng.random()
+            if roll < 0.2:
+                keyword = keyword + rng.choice(keywords)  # Glued or overlapping
+            elif roll < 0.3:
+                keyword = keyword.upper()
+            elif roll < 0.4:
+                keyword = rng.choice(FILLER).lower() + keyword
+            words.insert(rng.randrange(len(words) + 1), keyword)
+        price = rng.choice([rng.uniform(5, 400), 199.99, 200.0])
+        items.append((' '.join(words), round(price, 2)))
+    return items
+
+def bench(name: str, rules: str, fn, items, expected) -> dict:
+    started = time.perf_counter()
+    results = fn(items)
+    elapsed = time.perf_counter() - started
+    mismatches = [item for item, got, want in zip(items, results, expected) if got != want]
+    return {
+        'name': f"{rules}:{name}",
+        'items': len(items),
+        'seconds': round(elapsed, 4),
+        'items_per_sec': round(len(items) / elapsed, 1),
+        'mismatches': len(mismatches),
+        'examples': mismatches[:5]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100000, help='Synthetic titles on top of the fixture titles')
+    parser.add_argument('--batch-size', type=int, default=100, help='Titles per classify_batch call, like one page')
+    parser.add_argument('--fixtures-version', default='v1')
+    parser.add_argument('--seed', type=int, default=46)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    fixtures = fixture_items(args.fixtures_version)
+    items = fixtures + synthetic_items(args.items, random.Random(args.seed))
+
+    results = []
+    for rules in sorted(set(SOURCE_RULES.values())):
+        legacy, classifier = LEGACY[rules], RULES[rules]
+        expected = [legacy(title, price) for title, price in items]
+
+        def batched(items):
+            classified = []
+            for offset in range(0, len(items), args.batch_size):
+                classified.extend(classifier.classify_batch(items[offset:offset + args.batch_size]))
+            return classified
+
+        results.append(bench('legacy', rules, lambda items: [legacy(*item) for item in items], items, expected))
+        results.append(bench('single', rules, lambda items: [classifier.classify(*item) for item in items],
+                             items, expected))
+        results.append(bench('batch', rules, batched, items, expected))
+
+    write_results('classifier', results, args.output, items=len(items), fixture_items=len(fixtures),
+                  batch_size=args.batch_size, seed=args.seed)
+    if any(result['mismatches'] for result in results):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+import json
+import os
+import platform
+import subprocess
+import threading
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = BACKEND_DIR / 'fixtures'
+PAGE_FIXTURES_DIR = FIXTURES_DIR / 'pages'
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+@contextmanager
+def serve_directory(directory: Path, handler_class=_QuietHandler):
+    """Serve a folder over HTTP on a free local port, yielding the base URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler_class, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, pct in 0-100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds"""
+    return {
+        'count': len(seconds),
+        'p50_ms': round(percentile(seconds, 50) * 1000, 3),
+        'p95_ms': round(percentile(seconds, 95) * 1000, 3),
+        'p99_ms': round(percentile(seconds, 99) * 1000, 3),
+        'max_ms': round(max(seconds) * 1000, 3) if seconds else 0.0
+    }
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(benchmark: str, results: List[Dict], output: Optional[str] = None, **meta) -> Dict:
+    """Wrap results with run metadata and write them as JSON to output (or stdout)"""
+    report = {
+        'benchmark': benchmark,
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            **meta
+        },
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return report
@@ -0,0 +1,43 @@
+"""Compare two benchmark result files produced by write_results()"""
+import argparse
+import json
+
+def _index(report):
+    return {result['name']: result for result in report['results']}
+
+def compare(before, after):
+    rows = []
+    after_results = _index(after)
+    for name, old in _index(before).items():
+        new = after_results.get(name)
+        if not new:
+            continue
+        for metric, old_value in old.items():
+            new_value = new.get(metric)
+            if isinstance(old_value, bool) or not isinstance(old_value, (int, float)) \
+                    or not isinstance(new_value, (int, float)):
+                continue
+            change = (new_value - old_value) / old_value * 100 if old_value else None
+            rows.append((name, metric, old_value, new_value, change))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    if before['benchmark'] != after['benchmark']:
+        parser.error(f"Different benchmarks: {before['benchmark']} vs {after['benchmark']}")
+
+    for name, metric, old_value, new_value, change in compare(before, after):
+        change_text = f"{change:+.1f}%" if change is not None else 'n/a'
+        print(f"{name:50} {metric:28} {old_value:>14.4f} {new_value:>14.4f} {change_text:>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Pages fetched and result quality of CrawlController against fixed crawls.
+
+Writes synthetic paginated Firebox listings (--pages pages of --per-page products)
+as fixture files, one listing per query profile, with the products matching the
+query's interests placed differently:
+
+    no_terms      no interests, so any products will do
+    front_loaded  plenty of matches on the first page
+    spread        full matches (both interests) scattered over all pages
+    deep          a few matches, none on the first two pages
+    thin          fewer products than the top k on the first page
+
+Each profile is scraped offline four ways: the first page only (what scrapers
+did before), a fixed SCRAPE_MAX_PAGES crawl with early stopping disabled, the
+controller's defaults (request path) and a full walk like the background
+crawler's (full=True). Reported per run:
+
+    pages          listing pages fetched
+    est_seconds    pages x --page-seconds, a typical Chrome load and scroll
+    topk_score     score of the collected top k / score of the true top k over the whole listing
+    stop           why the crawl stopped
+"""
+import argparse
+import hashlib
+import random
+import tempfile
+from pathlib import Path
+from config import Config
+from app.services.crawl_controller import CrawlController
+from .common import write_results
+from .scraper_parse import make_scraper
+
+PROFILES = {
+    'no_terms': {'criteria': {}, 'matches': lambda rng, pages: []},
+    'front_loaded': {
+        'criteria': {'interests': ['whisky']},
+        'matches': lambda rng, pages: [(0, 'whisky')] * 14 + [(rng.randrange(pages), 'whisky') for _ in range(6)]
+    },
+    'spread': {
+        'criteria': {'interests': ['whisky', 'chocolate']},
+        'matches': lambda rng, pages: [(rng.randrange(pages), 'whisky chocolate') for _ in range(8)] +
+                                      [(rng.randrange(pages), rng.choice(['whisky', 'chocolate'])) for _ in range(20)]
+    },
+    'deep': {
+        'criteria': {'interests': ['falconry']},
+        'matches': lambda rng, pages: [(rng.randrange(2, 5), 'falconry') for _ in range(4)]
+    },
+    'thin': {
+        'criteria': {'interests': ['whisky']},
+        'matches': lambda rng, pages: [(rng.randrange(pages), 'whisky') for _ in range(3)],
+        'first_page': 4
+    }
+}
+
+NOUNS = ['Desk Lamp', 'Mug', 'Socks', 'Puzzle', 'Notebook', 'Tote Bag', 'Candle', 'Poster', 'Keyring',
+         'Plant Pot', 'Card Game', 'Apron', 'Cushion', 'Coaster Set', 'Bottle Opener', 'Phone Stand']
+ADJECTIVES = ['Classic', 'Giant', 'Mini', 'Retro', 'Glow', 'Pocket', 'Deluxe', 'Cosmic', 'Magnetic']
+
+ITEM_HTML = """<div class="product-item">
+  <a href="https://firebox.com/{slug}/p{id}"><picture><img src="https://firebox.com/images/{slug}.png"></picture></a>
+  <div class="item-name product-name-list">{title}</div>
+  <div class="price">£{price:.2f}</div>
+</div>"""
+
+def listing_pages(profile: dict, pages: int, per_page: int, rng: random.Random):
+    """Product titles per page, with the profile's matching products placed on their pages"""
+    sizes = [profile.get('first_page', per_page)] + [per_page] * (pages - 1)
+    titles = [[f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {page}-{i}" for i in range(size)]
+              for page, size in enumerate(sizes)]
+    for page, term in profile['matches'](rng, pages):
+        i = rng.randrange(len(titles[page]))
+        titles[page][i] = f"{term.title()} {titles[page][i]}"
+    return titles
+
+def write_fixtures(scraper, criteria: dict, titles, folder: Path):
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / 'index.html').write_text('<html><body></body></html>', encoding='utf-8')  # Past the last page
+    for url in scraper.get_search_urls(criteria):
+        for page, page_titles in enumerate(titles, 1):
+            items = '\n'.join(ITEM_HTML.format(slug=f"item-{page}-{i}", id=page * 1000 + i, title=title, price=20)
+                              for i, title in enumerate(page_titles))
+            name = hashlib.sha1(scraper.page_url(url, page).encode('utf-8')).hexdigest()[:16]
+            (folder / f"{name}.html").write_text(f'<html><body>{items}</body></html>', encoding='utf-8')
+
+def top_score(controller: CrawlController, gifts, k: int) -> int:
+    return sum(sorted((controller.score(gift) for gift in gifts), reverse=True)[:k])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=8, help='Listing pages per query')
+    parser.add_argument('--per-page', type=int, default=24, help='Products per listing page')
+    parser.add_argument('--page-seconds', type=float, default=8.0, help='Estimated seconds per live page')
+    parser.add_argument('--seed', type=int, default=48)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        for name, profile in PROFILES.items():
+            criteria = dict(profile['criteria'], max_price=1000)
+            scraper = make_scraper('firebox', work_dir / name)
+            scraper.fixture_dir = work_dir / name / 'fixtures'
+            scraper.max_items = args.pages * args.per_page  # Let the page budget decide, not the item cap
+            write_fixtures(scraper, criteria, listing_pages(profile, args.pages, args.per_page, rng),
+                           scraper.fixture_dir / scraper.source_key)
+
+            everything = CrawlController(scraper, criteria, max_pages=10 ** 9, full=True)
+            best = top_score(everything, everything.run(), Config.SCRAPE_TOP_K)
+
+            modes = {
+                'first_page': {'max_pages': 1},
+                'fixed': {'top_k': 10 ** 9},
+                'controller': {},
+                'crawler': {'full': True}
+            }
+            for mode, options in modes.items():
+                controller = CrawlController(scraper, criteria, **options)
+                gifts = controller.run()
+                results.append({
+                    'name': f"{name}:{mode}",
+                    'pages': controller.stats['pages'],
+                    'items': len(gifts),
+                    'est_seconds': round(controller.stats['pages'] * args.page_seconds, 1),
+                    'topk_score': round(top_score(controller, gifts, Config.SCRAPE_TOP_K) / best, 3) if best else 1.0,
+                    'stop': controller.stats['stop']
+                })
+
+    write_results('crawl_control', results, args.output, pages=args.pages, per_page=args.per_page,
+                  page_seconds=args.page_seconds, seed=args.seed, top_k=Config.SCRAPE_TOP_K,
+                  max_pages=Config.SCRAPE_MAX_PAGES)
+
+if __name__ == '__main__':
+    main()
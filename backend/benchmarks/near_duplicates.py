@@ -0,0 +1,176 @@
+"""
+Ingest throughput and clustering quality of the near-duplicate index.
+
+Generates --items scraped gifts for synthetic products, each listed by one to
+three shops under a slightly different title (case, punctuation, '&'/'and',
+marketing suffixes, word order, the odd typo), and ingests them in scrape-sized
+batches through IngestService into a throwaway SQLite database, once with
+NEAR_DUPLICATES_ENABLED off and once on. Reported per mode:
+
+    items_per_sec    ingest throughput
+    clusters         distinct clusters (on) against the true product count
+    precision        share of same-cluster pairs that are the same product
+    recall           share of same-product pairs that ended up in one cluster
+
+A third row times MinHash signatures and band keys alone, without the database.
+"""
+import argparse
+import random
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from config import Config
+from .common import write_results
+
+SOURCES = ['Firebox', 'BuyAGift', 'Prezzybox']
+ADJECTIVES = ['Luxury', 'Classic', 'Ultimate', 'Deluxe', 'Personalised', 'Vintage', 'Giant', 'Mini',
+              'Premium', 'Exclusive', 'Retro', 'Signature', 'Grand', 'Cosy', 'Wild', 'Secret']
+ACTIVITIES = ['Spa Day', 'Afternoon Tea', 'Supercar Thrill', 'Hot Air Balloon Flight', 'Gin Tasting',
+              'Whisky Masterclass', 'Pottery Class', 'Zip Wire Adventure', 'Cookery School',
+              'Falconry Day', 'Wine Tour', 'Helicopter Ride', 'Star Map Print', 'Beer Hamper',
+              'Chocolate Making', 'Axe Throwing', 'Escape Room', 'Glamping Break', 'Segway Tour',
+              'Sushi Workshop', 'Photo Shoot', 'Sailing Lesson', 'Alpaca Walk', 'Rum Tasting']
+QUALIFIERS = ['for Two', 'for One', 'with Prosecco', 'with Lunch', 'for the Family', 'at Sunset',
+              'with Dinner', 'Weekday', 'Weekend', 'with Overnight Stay', '', '']
+SYLLABLES = ['har', 'well', 'ash', 'combe', 'bram', 'ley', 'mor', 'ton', 'wick', 'stan', 'ford', 'glen',
+             'brook', 'cal', 'der', 'fen', 'ing', 'kel', 'lin', 'mar', 'nor', 'pen', 'ros', 'sel',
+             'thorn', 'vale', 'wyn', 'bury', 'den', 'holt']
+VENUES = ['Manor', 'Hotel', 'Lodge', 'Farm', 'Studio', 'Hall', 'Castle', 'Estate', 'Spa', 'Circuit']
+SUFFIXES = [' - Gift Experience', ' Voucher', ' Gift', ' Experience', ' (UK)']
+
+def make_venue(rng: random.Random) -> str:
+    name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{name.title()} {rng.choice(VENUES)}"
+
+def make_product_titles(count: int, rng: random.Random):
+    titles = set()
+    while len(titles) < count:
+        title = f"{rng.choice(ADJECTIVES)} {rng.choice(ACTIVITIES)} {rng.choice(QUALIFIERS)}".strip()
+        titles.add(f"{title} at {make_venue(rng)}")
+    return sorted(titles)
+
+def vary_title(title: str, rng: random.Random) -> str:
+    """How a different shop might list the same product"""
+    roll = rng.random()
+    if roll < 0.2:
+        title = title.upper() if rng.random() < 0.3 else title.lower()
+    elif roll < 0.4:
+        title = title.replace(' and ', ' & ').replace(' with ', ' w/ ')
+    elif roll < 0.6:
+        title = 'The ' + title
+    elif roll < 0.75:
+        head, venue = title.split(' at ', 1)
+        title = f"{venue}: {head}"
+    elif roll < 0.85:
+        i = rng.randrange(1, len(title) - 1)
+        title = title[:i] + title[i + 1:]  # Dropped character
+    if rng.random() < 0.5:
+        title += rng.choice(SUFFIXES)
+    return title
+
+def make_listings(items: int, rng: random.Random):
+    """(name, price, source, product) rows, near-duplicates shuffled across the stream"""
+    listings = []
+    products = make_product_titles(items, rng)
+    for product, title in enumerate(products):
+        price = round(rng.uniform(10, 400), 2)
+        for copy, source in enumerate(rng.sample(SOURCES, rng.choice([1, 1, 2, 3]))):
+            # Exact copies are already merged by name at ingest, so most copies are variations
+            name = title if copy == 0 or rng.random() < 0.2 else vary_title(title, rng)
+            listings.append((name, round(price * rng.uniform(0.9, 1.1), 2), source, product))
+            if len(listings) == items:
+                rng.shuffle(listings)
+                return listings
+    rng.shuffle(listings)
+    return listings
+
+def pair_count(sizes) -> int:
+    return sum(n * (n - 1) // 2 for n in sizes)
+
+def bench_ingest(listings, work_dir: Path, enabled: bool, batch_size: int) -> dict:
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{work_dir / ('on.db' if enabled else 'off.db')}"
+    Config.SQLALCHEMY_ENGINE_OPTIONS = {}
+    Config.NEAR_DUPLICATES_ENABLED = enabled
+
+    from app import create_app, db
+    from app.models.gift import Gift, ScrapedGift
+    from app.services.ingest_service import IngestService
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        ingest = IngestService()
+        product_by_link = {}
+        started = time.perf_counter()
+        for offset in range(0, len(listings), batch_size):
+            batch = []
+            for i, (name, price, source, product) in enumerate(listings[offset:offset + batch_size], offset):
+                link = f"https://{source.lower()}.example.com/p/{i}"
+                product_by_link[link] = product
+                batch.append(ScrapedGift(name=name, price=price, category='experiences', affiliate_link=link,
+                                         source=source, tags='experiences'))
+            ingest.ingest(batch)
+            db.session.remove()
+        elapsed = time.perf_counter() - started
+
+        result = {
+            'name': 'ingest:on' if enabled else 'ingest:off',
+            'items': len(listings),
+            'seconds': round(elapsed, 2),
+            'items_per_sec': round(len(listings) / elapsed, 1)
+        }
+        if enabled:
+            rows = db.session.query(Gift.affiliate_link, Gift.cluster_id).all()
+            by_cluster = Counter(cluster for _, cluster in rows)
+            by_product = Counter(product_by_link[link] for link, _ in rows)
+            by_both = Counter((cluster, product_by_link[link]) for link, cluster in rows)
+            true_pairs = pair_count(by_both.values())
+            result.update({
+                'products': len(by_product),
+                'clusters': len(by_cluster),
+                'precision': round(true_pairs / pair_count(by_cluster.values()), 4) if pair_count(by_cluster.values()) else 1.0,
+                'recall': round(true_pairs / pair_count(by_product.values()), 4) if pair_count(by_product.values()) else 1.0
+            })
+        db.session.remove()
+        db.engine.dispose()
+    return result
+
+def bench_signatures(listings) -> dict:
+    from app.services.near_duplicates import MinHasher, title_shingles
+
+    hasher = MinHasher(Config.MINHASH_PERMUTATIONS, Config.LSH_BANDS)
+    started = time.perf_counter()
+    for name, _, _, _ in listings:
+        signature = hasher.signature(title_shingles(name))
+        if signature:
+            hasher.band_keys(signature)
+    elapsed = time.perf_counter() - started
+    return {
+        'name': 'signatures',
+        'items': len(listings),
+        'seconds': round(elapsed, 2),
+        'items_per_sec': round(len(listings) / elapsed, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100000, help='Scraped listings to ingest')
+    parser.add_argument('--batch-size', type=int, default=50, help='Listings per ingest call, like one scrape')
+    parser.add_argument('--seed', type=int, default=45)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    listings = make_listings(args.items, random.Random(args.seed))
+    results = [bench_signatures(listings)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for enabled in (False, True):
+            results.append(bench_ingest(listings, Path(tmp), enabled, args.batch_size))
+
+    write_results('near_duplicates', results, args.output, items=args.items,
+                  batch_size=args.batch_size, seed=args.seed,
+                  threshold=Config.NEAR_DUPLICATE_THRESHOLD, permutations=Config.MINHASH_PERMUTATIONS,
+                  bands=Config.LSH_BANDS)
+
+if __name__ == '__main__':
+    main()
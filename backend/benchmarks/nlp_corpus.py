@@ -0,0 +1,148 @@
+"""
+Generator for the labelled NLP benchmark corpus.
+
+Each description is assembled from phrases whose meaning is known, so the
+expected criteria are ground truth rather than whatever the extractor
+currently returns. The committed corpus is fixtures/nlp/corpus_v1.jsonl;
+regenerate it (or a new version) with
+
+    python -m benchmarks.nlp_corpus --size 3000 --output fixtures/nlp/corpus_v1.jsonl
+"""
+import argparse
+import json
+import random
+from .common import FIXTURES_DIR
+
+CORPUS_PATH = FIXTURES_DIR / 'nlp' / 'corpus_v1.jsonl'
+
+# phrase -> (gender, relationship)
+RECIPIENTS = {
+    'my wife': ('female', 'romantic'),
+    'my husband': ('male', 'romantic'),
+    'my girlfriend': ('female', 'romantic'),
+    'my boyfriend': ('male', 'romantic'),
+    'my partner': (None, 'romantic'),
+    'my dad': ('male', 'family'),
+    'my father': ('male', 'family'),
+    'my mum': ('female', 'family'),
+    'my mother': ('female', 'family'),
+    'my brother': ('male', 'family'),
+    'my sister': ('female', 'family'),
+    'my uncle': ('male', 'family'),
+    'my aunt': ('female', 'family'),
+    'my grandfather': ('male', 'family'),
+    'my grandmother': ('female', 'family'),
+    'my best friend': (None, 'friend'),
+    'a friend': (None, 'friend'),
+    'a colleague': (None, 'colleague'),
+    'my boss': (None, 'colleague'),
+}
+
+# phrase -> interest category in NLPService.interest_keywords
+INTERESTS = {
+    'football': 'sports', 'golf': 'sports', 'tennis': 'sports', 'cycling': 'sports',
+    'gaming': 'technology', 'gadgets': 'technology', 'programming': 'technology',
+    'baking': 'cooking', 'cooking': 'cooking', 'bbq': 'cooking',
+    'craft beer': 'alcohol', 'whisky': 'alcohol', 'gin': 'alcohol', 'cider': 'alcohol',
+    'painting': 'art', 'pottery': 'art', 'knitting': 'art',
+    'guitar': 'music', 'piano': 'music', 'vinyl': 'music',
+    'novels': 'reading', 'poetry': 'reading', 'comics': 'reading',
+    'hiking': 'outdoor', 'camping': 'outdoor', 'fishing': 'outdoor',
+    'skincare': 'fashion', 'shoes': 'fashion',
+    'meditation': 'wellness', 'pilates': 'wellness',
+    'stamps': 'collecting', 'antiques': 'collecting',
+    'backpacking': 'travel', 'sightseeing': 'travel',
+    'dogs': 'animals', 'cats': 'animals',
+    'board games': 'entertaining', 'puzzles': 'entertaining',
+}
+
+# phrase -> occasion key in NLPService.occasion_keywords
+OCCASIONS = {
+    'birthday': 'birthday', 'christmas': 'christmas', 'xmas': 'christmas',
+    'anniversary': 'anniversary', 'wedding': 'wedding', 'graduation': 'graduation',
+    'housewarming': 'housewarming', "valentine's day": 'valentines', 'retirement': 'retirement',
+    'baby shower': 'baby_shower', 'easter': 'easter',
+}
+
+BUDGETS = [10, 15, 20, 25, 30, 40, 50, 60, 75, 80, 100, 120, 150, 200, 250, 400]
+
+def _budget_phrase(rng, budget):
+    return rng.choice([
+        f"My budget is £{budget}.",
+        f"I can spend up to £{budget}.",
+        f"Around £{budget} would be ideal.",
+        f"No more than {budget} pounds please.",
+        f"Budget: £{budget}",
+    ])
+
+def make_example(rng: random.Random) -> dict:
+    recipient = rng.choice(list(RECIPIENTS))
+    gender, relationship = RECIPIENTS[recipient]
+    interests = rng.sample(list(INTERESTS), rng.choice([0, 1, 1, 2, 2, 3]))
+    occasion = rng.choice([None, None] + list(OCCASIONS))
+    budget = rng.choice([None] + BUDGETS)
+    age = rng.choice([None, None, rng.randint(12, 85)])
+
+    parts = []
+    if occasion:
+        parts.append(rng.choice([
+            f"Looking for a {occasion} present for {recipient}.",
+            f"I need a {occasion} gift for {recipient}.",
+            f"What should I get {recipient} for {occasion}?",
+        ]))
+    else:
+        parts.append(rng.choice([
+            f"Looking for a gift for {recipient}.",
+            f"I need present ideas for {recipient}.",
+            f"Help me find something for {recipient}.",
+        ]))
+
+    if age:
+        parts.append(rng.choice([f"They are {age} years old.", f"Turning {age} years old soon."]))
+
+    if interests:
+        joined = interests[0] if len(interests) == 1 else ', '.join(interests[:-1]) + ' and ' + interests[-1]
+        parts.append(rng.choice([
+            f"They love {joined}.",
+            f"Big fan of {joined}.",
+            f"Really into {joined}.",
+            f"Hobbies include {joined}.",
+        ]))
+
+    if budget:
+        parts.append(_budget_phrase(rng, budget))
+
+    return {
+        'description': ' '.join(parts),
+        'expected': {
+            'age': age,
+            'gender': gender,
+            'max_price': float(budget) if budget else None,
+            'interests': sorted({INTERESTS[phrase] for phrase in interests}),
+            'occasion': OCCASIONS[occasion] if occasion else None,
+            'relationship': relationship
+        }
+    }
+
+def generate(size: int, seed: int = 33):
+    rng = random.Random(seed)
+    return [make_example(rng) for _ in range(size)]
+
+def load_corpus(path=CORPUS_PATH, limit=None):
+    with open(path) as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+    return examples[:limit] if limit else examples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=33)
+    parser.add_argument('--output', default=str(CORPUS_PATH))
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as f:
+        for example in generate(args.size, args.seed):
+            f.write(json.dumps(example, sort_keys=True) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+NLP extraction accuracy-vs-latency benchmark.
+
+Runs NLPService.extract_gift_criteria over the labelled corpus in each mode
+and reports per-field accuracy, throughput, per-call latency and memory.
+The openai mode talks to the local stub in benchmarks.openai_stub, which
+answers with the corpus labels after --stub-latency; its accuracy therefore
+reflects fallbacks on injected errors, not model quality. Extraction is
+hedged against spaCy with a --deadline, and the result reports how often
+each side won and whether the circuit breaker opened.
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+from config import Config
+from .common import latency_summary, write_results
+from .nlp_corpus import CORPUS_PATH, load_corpus
+from .openai_stub import StubState, serve_openai_stub
+
+SCALAR_FIELDS = ['age', 'gender', 'max_price', 'occasion', 'relationship']
+
+def score(examples, predictions) -> dict:
+    """Per-field accuracy; interests get exact-set accuracy plus micro precision/recall"""
+    correct = {field: 0 for field in SCALAR_FIELDS}
+    interests_exact = true_positives = predicted_total = expected_total = 0
+
+    for example, predicted in zip(examples, predictions):
+        expected = example['expected']
+        for field in SCALAR_FIELDS:
+            if predicted.get(field) == expected[field]:
+                correct[field] += 1
+
+        predicted_interests = set(predicted.get('interests') or [])
+        expected_interests = set(expected['interests'])
+        interests_exact += predicted_interests == expected_interests
+        true_positives += len(predicted_interests & expected_interests)
+        predicted_total += len(predicted_interests)
+        expected_total += len(expected_interests)
+
+    total = len(examples)
+    accuracy = {f"{field}_accuracy": round(correct[field] / total, 4) for field in SCALAR_FIELDS}
+    accuracy['interests_exact_accuracy'] = round(interests_exact / total, 4)
+    accuracy['interests_precision'] = round(true_positives / predicted_total, 4) if predicted_total else 0.0
+    accuracy['interests_recall'] = round(true_positives / expected_total, 4) if expected_total else 0.0
+    accuracy['all_fields_accuracy'] = round(sum(
+        all(predicted.get(field) == example['expected'][field] for field in SCALAR_FIELDS)
+        and set(predicted.get('interests') or []) == set(example['expected']['interests'])
+        for example, predicted in zip(examples, predictions)
+    ) / total, 4)
+    return accuracy
+
+def run_mode(name, service, examples, memory_sample) -> dict:
+    predictions = []
+    latencies = []
+    started = time.perf_counter()
+    for example in examples:
+        call_started = time.perf_counter()
+        predictions.append(service.extract_gift_criteria(example['description']) or {})
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    # Separate pass so tracemalloc overhead doesn't skew the timings
+    tracemalloc.start()
+    for example in examples[:memory_sample]:
+        service.extract_gift_criteria(example['description'])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'name': name,
+        'calls': len(examples),
+        'calls_per_sec': round(len(examples) / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies),
+        'tracemalloc_peak_kb': round(peak / 1024, 1),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        **score(examples, predictions)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=str(CORPUS_PATH))
+    parser.add_argument('--limit', type=int, help='Only use the first N examples')
+    parser.add_argument('--mode', action='append', choices=['spacy', 'openai'],
+                        help='Modes to run (default: both)')
+    parser.add_argument('--stub-latency', type=float, default=0.3, help='Seconds per stub completion')
+    parser.add_argument('--stub-jitter', type=float, default=0.1)
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--stub-slow-rate', type=float, default=0.0,
+                        help='Fraction of completions that take --stub-slow-latency')
+    parser.add_argument('--stub-slow-latency', type=float, default=10.0)
+    parser.add_argument('--deadline', type=float, default=Config.OPENAI_DEADLINE,
+                        help='Seconds the remote answer may take before spaCy wins')
+    parser.add_argument('--openai-limit', type=int, default=300,
+                        help='Examples for the openai mode, which is latency bound')
+    parser.add_argument('--memory-sample', type=int, default=200)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    from app.services.nlp_service import NLPService
+
+    # Every call should extract; repeated descriptions would otherwise come from the cache
+    Config.NLP_CACHE_SIZE = 0
+    examples = load_corpus(args.corpus, args.limit)
+    modes = args.mode or ['spacy', 'openai']
+    results = []
+
+    if 'spacy' in modes:
+        results.append(run_mode('spacy', NLPService(use_openai=False), examples, args.memory_sample))
+
+    if 'openai' in modes:
+        answers = {example['description']: example['expected'] for example in examples}
+        state = StubState(answers, args.stub_latency, args.stub_jitter, args.stub_error_rate, seed=33,
+                          slow_rate=args.stub_slow_rate, slow_latency=args.stub_slow_latency)
+        with serve_openai_stub(state) as base_url:
+            Config.OPENAI_API_KEY = 'stub-key'
+            Config.OPENAI_BASE_URL = base_url
+            Config.OPENAI_DEADLINE = args.deadline
+            service = NLPService(use_openai=True)
+            result = run_mode('openai', service, examples[:args.openai_limit],
+                              min(args.memory_sample, args.openai_limit))
+            result['stub_requests'] = state.requests
+            result['stub_errors'] = state.errors
+            result['hedge'] = dict(service.stats)
+            result['circuit_state'] = service.breaker.state
+            results.append(result)
+
+    write_results('nlp_extraction', results, args.output, corpus=args.corpus, examples=len(examples),
+                  stub_latency=args.stub_latency, stub_error_rate=args.stub_error_rate,
+                  stub_slow_rate=args.stub_slow_rate, deadline=args.deadline)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers POST /v1/chat/completions with a JSON criteria object, after an
+injected delay and with an optional error rate. A fraction of requests
+(--slow-rate) can take --slow-latency instead, to exercise deadlines. Answers come from a lookup
+of known descriptions (e.g. the NLP corpus labels); unknown descriptions
+get an empty criteria object. Run standalone with
+
+    python -m benchmarks.openai_stub --port 8089 --latency 0.5
+"""
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import json
+import random
+import threading
+import time
+
+class StubState:
+    def __init__(self, answers=None, latency=0.0, jitter=0.0, error_rate=0.0, seed=None,
+                 slow_rate=0.0, slow_latency=0.0):
+        self.answers = answers or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def delay(self):
+        with self.lock:
+            if self.rng.random() < self.slow_rate:
+                return self.slow_latency
+            return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self):
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+def _handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            with state.lock:
+                state.requests += 1
+
+            time.sleep(state.delay())
+            if state.should_fail():
+                with state.lock:
+                    state.errors += 1
+                self._send(500, {'error': {'message': 'Injected failure', 'type': 'server_error'}})
+                return
+
+            prompt = request.get('messages', [{}])[-1].get('content', '')
+            description = prompt.split('Description:', 1)[-1].strip()
+            criteria = state.answers.get(description, {})
+
+            self._send(200, {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request.get('model', 'stub'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': json.dumps(criteria)},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+            })
+
+    return Handler
+
+@contextmanager
+def serve_openai_stub(state: StubState, port: int = 0):
+    """Run the stub in a background thread, yielding its base URL (ending in /v1)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), _handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/v1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-latency', type=float, default=10.0)
+    parser.add_argument('--corpus', action='store_true', help='Answer with the NLP corpus labels')
+    args = parser.parse_args()
+
+    answers = {}
+    if args.corpus:
+        from .nlp_corpus import load_corpus
+        answers = {example['description']: example['expected'] for example in load_corpus()}
+
+    state = StubState(answers, args.latency, args.jitter, args.error_rate,
+                      slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    with serve_openai_stub(state, args.port) as base_url:
+        print(f"OpenAI stub listening on {base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == '__main__':
+    main()
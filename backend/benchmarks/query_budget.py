@@ -0,0 +1,84 @@
+"""
+SQL query budget for POST /api/find-gifts.
+
+Seeds a throwaway SQLite catalog and sends --requests generated searches plus one
+the catalog can't answer (which records crawl demand), each through
+assert_query_budget: a request fails if it runs more than --max-queries statements
+or repeats a statement shape (a likely N+1). Caches and request-path scraping are
+off so every request does the full search. Exits non-zero when any request fails,
+so it can gate CI.
+"""
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+from config import Config
+from .api_load import make_description, seed_catalog
+from .common import write_results
+
+THIN_DESCRIPTION = 'Something for my neighbour who collects antique barometers'
+
+def build_app(work_dir: Path, args):
+    # Services read Config directly, so the overrides go on the class itself
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{work_dir / 'budget.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'SCRAPE_ON_REQUEST': False,
+        'USE_OPENAI': False,
+        'NLP_CACHE_SIZE': 0,
+        'RESULT_CACHE_SIZE': 0,
+        'QUERY_LOG_ENABLED': False,
+        'CACHE_WARMUP_TOP_N': 0
+    }
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    from app import create_app, db
+    from app.models.gift import Gift
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, Gift, args.catalog_size, random.Random(args.seed))
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--catalog-size', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--max-queries', type=int, default=4, help='Statements allowed per request')
+    parser.add_argument('--seed', type=int, default=35)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    from app.query_accounting import assert_query_budget, track_queries
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp), args)
+        client = app.test_client()
+        rng = random.Random(args.seed)
+        descriptions = [make_description(rng) for _ in range(args.requests)] + [THIN_DESCRIPTION]
+
+        results = []
+        for description in descriptions:
+            result = {'description': description}
+            # The outer collector only reports the count; assert_query_budget enforces it
+            with track_queries() as stats:
+                try:
+                    response = assert_query_budget(client, args.max_queries, 'POST', '/api/find-gifts',
+                                                   json={'description': description})
+                    result.update(ok=response.status_code == 200, status=response.status_code)
+                except AssertionError as e:
+                    result.update(ok=False, error=str(e))
+            result['queries'] = stats.count
+            results.append(result)
+
+    failed = sum(1 for result in results if not result['ok'])
+    write_results('query_budget', results, args.output, catalog_size=args.catalog_size,
+                  max_queries=args.max_queries, failed=failed,
+                  max_observed=max(result['queries'] for result in results))
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
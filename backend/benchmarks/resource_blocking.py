@@ -0,0 +1,141 @@
+"""
+Page-load time and transferred bytes with and without scraper resource blocking.
+
+Loads every fixture page under fixtures/pages/<version>/<source>/ in headless
+Chrome through the scraper's own _get_driver(), once with block_resources off
+and once on. Chrome resolves every host to a local server (--host-resolver-rules)
+that serves the fixture pages and answers all other requests (images, fonts,
+stylesheets, scripts, trackers) with synthetic bodies of a typical size after
+--asset-latency, so the run is offline and repeatable. The product count parsed
+from each load is reported to show blocking doesn't change what is scraped.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+from app.services.scraper_service import SCRAPER_CLASSES
+from .common import PAGE_FIXTURES_DIR, _QuietHandler, serve_directory, write_results
+from .scraper_parse import NO_PRICE_LIMIT, make_scraper
+
+# Synthetic response sizes in bytes by file extension
+ASSET_SIZES = {
+    '.jpg': 60000, '.jpeg': 60000, '.png': 40000, '.webp': 30000, '.gif': 20000, '.svg': 4000, '.ico': 4000,
+    '.woff': 30000, '.woff2': 25000, '.ttf': 60000,
+    '.css': 40000, '.js': 80000,
+    '.mp4': 500000, '.webm': 400000
+}
+DEFAULT_ASSET_SIZE = 10000
+
+def make_handler(asset_latency: float):
+    class FixtureHandler(_QuietHandler):
+        """Fixture pages with absolute URLs downgraded to http, synthetic bodies for everything else"""
+
+        def do_GET(self):
+            path = Path(self.translate_path(self.path))
+            if path.suffix == '.html' and path.is_file():
+                body = path.read_text(encoding='utf-8').replace('https://', 'http://').encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+            else:
+                time.sleep(asset_latency)
+                extension = Path(urlparse(self.path).path).suffix.lower()
+                body = b'\0' * ASSET_SIZES.get(extension, DEFAULT_ASSET_SIZE)
+                content_type = 'application/octet-stream'
+
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FixtureHandler
+
+def network_totals(driver) -> dict:
+    """Requests, blocked requests and encoded bytes from the driver's performance log"""
+    requests = blocked = transferred = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.requestWillBeSent':
+            requests += 1
+        elif message['method'] == 'Network.loadingFinished':
+            transferred += message['params'].get('encodedDataLength', 0)
+        elif message['method'] == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+            blocked += 1
+    return {'requests': requests, 'blocked': blocked, 'bytes': int(transferred)}
+
+def bench_page(scraper, driver, url: str, repeat: int) -> dict:
+    load_times = []
+    totals = {'requests': 0, 'blocked': 0, 'bytes': 0}
+    items = 0
+    for _ in range(repeat):
+        driver.get_log('performance')
+        started = time.perf_counter()
+        driver.get(url)
+        load_times.append(time.perf_counter() - started)
+        for key, value in network_totals(driver).items():
+            totals[key] += value
+        items = len(scraper._parse_page(driver.page_source, NO_PRICE_LIMIT))
+
+    return {
+        'items': items,
+        'load_ms': round(sum(load_times) / repeat * 1000, 1),
+        **{key: value // repeat for key, value in totals.items()}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures-version', default='v1')
+    parser.add_argument('--source', action='append', choices=sorted(SCRAPER_CLASSES),
+                        help='Limit to these sources (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Loads per page and mode')
+    parser.add_argument('--asset-latency', type=float, default=0.05, help='Seconds per synthetic asset response')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    fixtures_root = PAGE_FIXTURES_DIR / args.fixtures_version
+    sources = args.source or sorted(SCRAPER_CLASSES)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            serve_directory(fixtures_root, make_handler(args.asset_latency)) as base_url:
+        work_dir = Path(tmp)
+        port = urlparse(base_url).port
+        for source in sources:
+            pages = sorted((fixtures_root / source).glob('*.html'))
+            for blocked in (False, True):
+                scraper = make_scraper(source, work_dir)
+                scraper.block_resources = blocked
+                scraper.chrome_options.add_argument(f"--host-resolver-rules=MAP * 127.0.0.1:{port}")
+                scraper.chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+                driver = scraper._get_driver()
+                try:
+                    for page in pages:
+                        results.append({
+                            'name': f"{source}/{page.name}:{'blocked' if blocked else 'unblocked'}",
+                            'source': source,
+                            'fixture': page.name,
+                            'blocked': blocked,
+                            **bench_page(scraper, driver, f"{base_url}/{source}/{page.name}", args.repeat)
+                        })
+                finally:
+                    driver.quit()
+
+    by_page = {}
+    for result in results:
+        by_page.setdefault(f"{result['source']}/{result['fixture']}", {})[result['blocked']] = result
+    for name, modes in sorted(by_page.items()):
+        unblocked, blocked = modes[False], modes[True]
+        results.append({
+            'name': f"{name}:saved",
+            'load_ms_saved': round(unblocked['load_ms'] - blocked['load_ms'], 1),
+            'bytes_saved': unblocked['bytes'] - blocked['bytes'],
+            'bytes_saved_pct': round(100 * (1 - blocked['bytes'] / unblocked['bytes']), 1) if unblocked['bytes'] else 0.0,
+            'same_items': unblocked['items'] == blocked['items']
+        })
+
+    write_results('resource_blocking', results, args.output, fixtures_version=args.fixtures_version,
+                  repeat=args.repeat, asset_latency=args.asset_latency)
+
+if __name__ == '__main__':
+    main()
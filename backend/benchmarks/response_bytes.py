@@ -0,0 +1,119 @@
+"""
+Bytes-on-the-wire benchmark for response compression and ETag revalidation.
+
+Seeds a throwaway SQLite catalog, then sends the same find-gifts searches with
+each Accept-Encoding and reports body bytes and latency per encoding, plus a
+revalidation pass that replays GET requests with the ETag from the first
+response (304s should carry no body). Scraping is disabled so every response
+comes from the catalog.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from config import Config
+from .api_load import make_description, seed_catalog
+from .common import latency_summary, write_results
+
+ENCODINGS = ['identity', 'gzip', 'br']
+
+def build_app(work_dir: Path, args):
+    # Services read Config directly, so the overrides go on the class itself
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{work_dir / 'bytes.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'SCRAPE_ON_REQUEST': False,
+        'USE_OPENAI': False,
+        # Measure uncached searches; benchmarks.cache_warmup covers the caches
+        'NLP_CACHE_SIZE': 0,
+        'RESULT_CACHE_SIZE': 0,
+        'QUERY_LOG_ENABLED': False,
+        'CACHE_WARMUP_TOP_N': 0
+    }
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    from app import create_app, db
+    from app.models.gift import Gift
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, Gift, args.catalog_size, random.Random(args.seed))
+    return app
+
+def bench_encoding(client, descriptions, encoding: str) -> dict:
+    sizes = []
+    latencies = []
+    for description in descriptions:
+        started = time.perf_counter()
+        response = client.get('/api/find-gifts', query_string={'description': description},
+                              headers={'Accept-Encoding': encoding})
+        latencies.append(time.perf_counter() - started)
+        sizes.append(len(response.data))
+
+    served = response.headers.get('Content-Encoding', 'identity')
+    return {
+        'name': f"encoding:{encoding}",
+        'content_encoding': served,
+        'total_bytes': sum(sizes),
+        'avg_bytes': round(sum(sizes) / len(sizes), 1),
+        **latency_summary(latencies)
+    }
+
+def bench_revalidation(client, descriptions) -> dict:
+    sizes = []
+    latencies = []
+    not_modified = 0
+    for description in descriptions:
+        first = client.get('/api/find-gifts', query_string={'description': description},
+                           headers={'Accept-Encoding': 'gzip'})
+        started = time.perf_counter()
+        response = client.get('/api/find-gifts', query_string={'description': description},
+                              headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+        latencies.append(time.perf_counter() - started)
+        sizes.append(len(response.data))
+        not_modified += response.status_code == 304
+
+    return {
+        'name': 'revalidate:gzip',
+        'not_modified_share': round(not_modified / len(descriptions), 3),
+        'total_bytes': sum(sizes),
+        'avg_bytes': round(sum(sizes) / len(sizes), 1),
+        **latency_summary(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--catalog-size', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=38)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    from app import http_caching
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp), args)
+        client = app.test_client()
+        rng = random.Random(args.seed)
+        descriptions = [make_description(rng) for _ in range(args.requests)]
+
+        results = []
+        for encoding in ENCODINGS:
+            if encoding == 'br' and http_caching.brotli is None:
+                continue
+            results.append(bench_encoding(client, descriptions, encoding))
+        results.append(bench_revalidation(client, descriptions))
+
+    identity = results[0]['total_bytes']
+    for result in results:
+        result['ratio_vs_identity'] = round(result['total_bytes'] / identity, 4) if identity else None
+
+    write_results('response_bytes', results, args.output, catalog_size=args.catalog_size,
+                  requests=args.requests, brotli=http_caching.brotli is not None,
+                  compress_min_size=Config.COMPRESS_MIN_SIZE)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Payload size and server time of find-gifts response shapes.
+
+Seeds a throwaway SQLite catalog and sends the same searches in each shape:
+
+    full      every field, the default response
+    grid      fields=id,name,price,image_path,description with description_max
+    compact   the grid fields with format=compact (value arrays, field names once)
+    minimal   fields=id,name,price in compact form
+
+Reported per shape: body bytes (identity encoding, and gzip), request latency and
+the db.search and serialize phases from the Server-Timing header. Scraping is
+disabled so every response comes from the catalog.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from config import Config
+from .api_load import make_description, seed_catalog
+from .common import latency_summary, write_results
+
+GRID_FIELDS = 'id,name,price,image_path,description'
+
+def shapes(description_max: int) -> dict:
+    return {
+        'full': {},
+        'grid': {'fields': GRID_FIELDS, 'description_max': description_max},
+        'compact': {'fields': GRID_FIELDS, 'description_max': description_max, 'format': 'compact'},
+        'minimal': {'fields': 'id,name,price', 'format': 'compact'}
+    }
+
+def build_app(work_dir: Path, args):
+    # Services read Config directly, so the overrides go on the class itself
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{work_dir / 'shapes.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'SCRAPE_ON_REQUEST': False,
+        'USE_OPENAI': False,
+        'TIMING_ENABLED': True,
+        # Measure uncached searches; benchmarks.cache_warmup covers the caches
+        'NLP_CACHE_SIZE': 0,
+        'RESULT_CACHE_SIZE': 0,
+        'QUERY_LOG_ENABLED': False,
+        'CACHE_WARMUP_TOP_N': 0
+    }
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    from app import create_app, db
+    from app.models.gift import Gift
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        seed_catalog(db, Gift, args.catalog_size, random.Random(args.seed))
+    return app
+
+def server_timings(header: str) -> dict:
+    timings = {}
+    for entry in header.split(','):
+        name, _, params = entry.strip().partition(';dur=')
+        if params:
+            timings[name] = float(params.split(';')[0]) / 1000
+    return timings
+
+def bench_shape(client, descriptions, name: str, params: dict) -> dict:
+    sizes = []
+    gzip_sizes = []
+    latencies = []
+    phases = {'db.search': [], 'serialize': []}
+    gifts = 0
+    for description in descriptions:
+        query = dict(params, description=description)
+        started = time.perf_counter()
+        response = client.get('/api/find-gifts', query_string=query, headers={'Accept-Encoding': 'identity'})
+        latencies.append(time.perf_counter() - started)
+        sizes.append(len(response.data))
+        gifts += len(response.get_json()['gifts'])
+
+        timings = server_timings(', '.join(response.headers.getlist('Server-Timing')))
+        for phase in phases:
+            phases[phase].append(timings.get(phase, 0.0))
+
+        response = client.get('/api/find-gifts', query_string=query, headers={'Accept-Encoding': 'gzip'})
+        gzip_sizes.append(len(response.data))
+
+    return {
+        'name': name,
+        'params': params,
+        'avg_gifts': round(gifts / len(descriptions), 1),
+        'avg_bytes': round(sum(sizes) / len(sizes), 1),
+        'avg_gzip_bytes': round(sum(gzip_sizes) / len(gzip_sizes), 1),
+        'db_ms': round(sum(phases['db.search']) / len(descriptions) * 1000, 3),
+        'serialize_ms': round(sum(phases['serialize']) / len(descriptions) * 1000, 3),
+        **latency_summary(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--catalog-size', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--description-max', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=49)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp), args)
+        client = app.test_client()
+        rng = random.Random(args.seed)
+        descriptions = [make_description(rng) for _ in range(args.requests)]
+
+        # Warm the NLP cache so every shape times the same work
+        for description in descriptions:
+            client.get('/api/find-gifts', query_string={'description': description})
+
+        results = [bench_shape(client, descriptions, name, params)
+                   for name, params in shapes(args.description_max).items()]
+
+    full = results[0]['avg_bytes']
+    for result in results:
+        result['ratio_vs_full'] = round(result['avg_bytes'] / full, 4) if full else None
+
+    write_results('response_shapes', results, args.output, catalog_size=args.catalog_size,
+                  requests=args.requests, description_max=args.description_max)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+CPU and memory of scraper output: ORM Gift objects against ScrapedGift records.
+
+Builds --items products from fields parsed off the fixture pages (repeated with
+a counter so names and links stay unique), the way scrapers used to (a Gift per
+product) and the way they do now (a ScrapedGift per product). Per mode:
+
+    build_us       microseconds to build one object
+    roundtrip_us   microseconds per object for to_record() and back, as
+                   ScraperService._scrape does for every scrape
+    bytes          memory held per object, measured with tracemalloc (the field
+                   strings are shared with the input, so this is object overhead)
+    pickle_bytes   size of one pickled object
+
+A last row ingests the records twice into a throwaway SQLite database, the
+second time as an unchanged re-scrape, where no Gift objects are built at all.
+"""
+import argparse
+import gc
+import pickle
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from config import Config
+from app.models.gift import Gift, ScrapedGift
+from app.services.scraper_service import SCRAPER_CLASSES
+from .common import PAGE_FIXTURES_DIR, write_results
+from .scraper_parse import NO_PRICE_LIMIT, make_scraper
+
+def fixture_fields(fixtures_version: str):
+    """Scraped field dicts of every product on the fixture pages"""
+    fields = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for source in sorted(SCRAPER_CLASSES):
+            scraper = make_scraper(source, Path(tmp))
+            for page in sorted((PAGE_FIXTURES_DIR / fixtures_version / source).glob('*.html')):
+                gifts = scraper._parse_page(page.read_text(encoding='utf-8'), NO_PRICE_LIMIT)
+                fields.extend(gift.to_record() for gift in gifts)
+    return fields
+
+def make_fields(count: int, fixtures):
+    fields = []
+    for i in range(count):
+        record = dict(fixtures[i % len(fixtures)])
+        record['name'] = f"{record['name']} #{i}"
+        record['affiliate_link'] = f"{record['affiliate_link']}?item={i}"
+        fields.append(record)
+    return fields
+
+def bench_objects(name: str, cls, fields) -> dict:
+    gc.collect()
+    started = time.perf_counter()
+    objects = [cls(**record) for record in fields]
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if cls is Gift:
+        copies = [Gift(**{field: getattr(gift, field) for field in ScrapedGift.RECORD_FIELDS}) for gift in objects]
+    else:
+        copies = [ScrapedGift.from_record(gift.to_record()) for gift in objects]
+    roundtrip = time.perf_counter() - started
+    del objects, copies
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(**record) for record in fields]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return {
+        'name': name,
+        'items': len(fields),
+        'build_us': round(build / len(fields) * 1e6, 2),
+        'roundtrip_us': round(roundtrip / len(fields) * 1e6, 2),
+        'bytes': round(held / len(fields)),
+        'pickle_bytes': len(pickle.dumps(objects[0]))
+    }
+
+def bench_ingest(fields, work_dir: Path, batch_size: int) -> dict:
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{work_dir / 'ingest.db'}"
+    Config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    from app import create_app, db
+    from app.services.ingest_service import IngestService
+
+    app = create_app(Config)
+    result = {'name': 'ingest', 'items': len(fields)}
+    with app.app_context():
+        db.create_all()
+        ingest = IngestService()
+        for label in ('insert', 'rescrape'):
+            records = [ScrapedGift(**record) for record in fields]
+            started = time.perf_counter()
+            for offset in range(0, len(records), batch_size):
+                ingest.ingest(records[offset:offset + batch_size])
+                db.session.remove()
+            elapsed = time.perf_counter() - started
+            result[f"{label}_items_per_sec"] = round(len(records) / elapsed, 1)
+        db.engine.dispose()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000, help='Products per mode')
+    parser.add_argument('--batch-size', type=int, default=50, help='Records per ingest call, like one scrape')
+    parser.add_argument('--fixtures-version', default='v1')
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    fields = make_fields(args.items, fixture_fields(args.fixtures_version))
+    results = [
+        bench_objects('orm', Gift, fields),
+        bench_objects('record', ScrapedGift, fields)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        results.append(bench_ingest(fields, Path(tmp), args.batch_size))
+
+    write_results('scrape_records', results, args.output, items=args.items, batch_size=args.batch_size,
+                  fixtures_version=args.fixtures_version)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Scraper parse-throughput benchmark.
+
+Parses every fixture page under fixtures/pages/<version>/<source>/ with its
+BaseScraper subclass. Static mode measures items/sec of the HTML parser alone;
+--browser also serves the fixtures from a local HTTP server into headless
+Chrome and measures end-to-end page time and WebDriver round trips per item.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from app.services.host_scheduler import HostScheduler
+from app.services.page_cache import PageCache
+from app.services.scraper_service import SCRAPER_CLASSES
+from .common import PAGE_FIXTURES_DIR, serve_directory, write_results
+
+# Large enough that no fixture item is filtered out by price
+NO_PRICE_LIMIT = 10 ** 9
+
+def make_scraper(source: str, work_dir: Path):
+    """Scraper with caching, image downloads and rate limiting disabled"""
+    scraper = SCRAPER_CLASSES[source](work_dir / 'images', work_dir / 'debug')
+    scraper.page_cache = PageCache(work_dir / 'page_cache', 0, 'off')
+    scraper.scheduler = HostScheduler(delay=0, concurrency=4, host_limits={})
+    scraper.download_images = False
+    return scraper
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command is counted"""
+    counter = {'commands': 0}
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter['commands'] += 1
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return counter
+
+def bench_static(scraper, html: str, repeat: int) -> dict:
+    items = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        items += len(scraper._parse_page(html, NO_PRICE_LIMIT))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'mode': 'static',
+        'items_per_page': items // repeat,
+        'seconds': round(elapsed, 6),
+        'items_per_sec': round(items / elapsed, 1) if elapsed else 0.0,
+        'page_ms': round(elapsed / repeat * 1000, 3),
+        'round_trips_per_item': 0.0
+    }
+
+def bench_browser(scraper, driver, counter, url: str, repeat: int) -> dict:
+    items = 0
+    page_times = []
+    counter['commands'] = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        html, _ = scraper._fetch_page(url, driver)
+        items += len(scraper._parse_page(html, NO_PRICE_LIMIT))
+        page_times.append(time.perf_counter() - started)
+
+    elapsed = sum(page_times)
+    return {
+        'mode': 'browser',
+        'items_per_page': items // repeat,
+        'seconds': round(elapsed, 6),
+        'items_per_sec': round(items / elapsed, 1) if elapsed else 0.0,
+        'page_ms': round(elapsed / repeat * 1000, 3),
+        'round_trips': counter['commands'],
+        'round_trips_per_item': round(counter['commands'] / items, 3) if items else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures-version', default='v1')
+    parser.add_argument('--source', action='append', choices=sorted(SCRAPER_CLASSES),
+                        help='Limit to these sources (default: all)')
+    parser.add_argument('--repeat', type=int, default=50, help='Static parses per page')
+    parser.add_argument('--browser', action='store_true', help='Also load the pages in headless Chrome')
+    parser.add_argument('--browser-repeat', type=int, default=2)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    fixtures_root = PAGE_FIXTURES_DIR / args.fixtures_version
+    sources = args.source or sorted(SCRAPER_CLASSES)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp, serve_directory(fixtures_root) as base_url:
+        work_dir = Path(tmp)
+        for source in sources:
+            scraper = make_scraper(source, work_dir)
+            driver = counter = None
+            if args.browser:
+                driver = scraper._get_driver()
+                counter = count_round_trips(driver)
+
+            try:
+                for page in sorted((fixtures_root / source).glob('*.html')):
+                    name = f"{source}/{page.name}"
+                    html = page.read_text(encoding='utf-8')
+                    results.append({'name': f"{name}:static", 'source': source, 'fixture': page.name,
+                                    **bench_static(scraper, html, args.repeat)})
+
+                    if driver:
+                        url = f"{base_url}/{source}/{page.name}"
+                        results.append({'name': f"{name}:browser", 'source': source, 'fixture': page.name,
+                                        **bench_browser(scraper, driver, counter, url, args.browser_repeat)})
+            finally:
+                if driver:
+                    driver.quit()
+
+    write_results('scraper_parse', results, args.output,
+                  fixtures_version=args.fixtures_version, repeat=args.repeat,
+                  browser=args.browser, browser_repeat=args.browser_repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Host scheduler behaviour against a server that throttles with 429s.
+
+Starts a local HTTP server that admits --server-rate requests per second (with a
+burst of --server-burst) and answers anything over that with 429 and a
+Retry-After of --retry-after seconds. Admitted requests get an image body sent
+in chunks over --body-seconds, so a client that releases its host slot before
+reading the body shows up as extra concurrent downloads at the server.
+
+--images downloads are made with BaseScraper.fetch_image from --threads threads,
+in two modes:
+
+    naive      no rate limit, no concurrency cap, no retries
+    scheduled  the HostScheduler with --delay / --concurrency and backoff
+
+With --chrome, --pages listing loads also go through the scraper's _load_page in
+headless Chrome (needs Chrome and chromedriver), so 429 document responses are
+seen through the DevTools performance log.
+
+Reported per mode: downloads (or page loads) that succeeded, 429s served,
+retries and failures as counted by the scheduler, wall time and the highest
+number of responses the server had in flight at once.
+"""
+import argparse
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+from app.services.base_scraper import PageLoadError
+from app.services.host_scheduler import HostScheduler
+from .common import _QuietHandler, serve_directory, write_results
+from .scraper_parse import make_scraper
+
+LISTING_HTML = '<html><body><div class="products">{items}</div></body></html>'
+
+class Admission:
+    """Server-side token bucket that rejects instead of queueing"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def admit(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+class ServerStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {'ok': 0, 'throttled': 0}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self, outcome: str):
+        with self.lock:
+            self.in_flight -= 1
+            self.counts[outcome] += 1
+
+    def reset(self):
+        with self.lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+            self.max_in_flight = 0
+
+def make_handler(admission: Admission, stats: ServerStats, args):
+    class ThrottlingHandler(_QuietHandler):
+        """429 over the admitted rate, otherwise a slowly streamed body"""
+
+        def do_GET(self):
+            stats.enter()
+            if not admission.admit():
+                self.send_response(429)
+                self.send_header('Retry-After', str(args.retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                stats.leave('throttled')
+                return
+
+            if self.path.startswith('/listing'):
+                body = LISTING_HTML.format(items='<div class="product">Gift</div>' * 24).encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+            else:
+                body = b'\0' * args.body_bytes
+                content_type = 'image/jpeg'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+
+            chunks = 10
+            size = -(-len(body) // chunks)
+            for start in range(0, len(body), size):
+                time.sleep(args.body_seconds / chunks)
+                self.wfile.write(body[start:start + size])
+                self.wfile.flush()
+            stats.leave('ok')
+
+    return ThrottlingHandler
+
+def scheduler_for(mode: str, args) -> HostScheduler:
+    if mode == 'naive':
+        return HostScheduler(delay=0, burst=1, concurrency=args.threads, host_limits={}, image_limits={},
+                             max_retries=0)
+    # No image limits, so images get --delay / --concurrency like page loads
+    return HostScheduler(delay=args.delay, burst=args.burst, concurrency=args.concurrency, host_limits={},
+                         image_limits={}, max_retries=args.max_retries, backoff_base=args.backoff_base, backoff_max=args.backoff_max)
+
+def scheduler_totals(scheduler: HostScheduler) -> dict:
+    totals = {'retries': 0, 'failures': 0, 'backoff_seconds': 0.0}
+    for stats in scheduler.stats().values():
+        totals['retries'] += stats['retries']
+        totals['failures'] += stats['failures']
+        totals['backoff_seconds'] += stats['backoff_total']
+    totals['backoff_seconds'] = round(totals['backoff_seconds'], 2)
+    return totals
+
+def bench_images(base_url: str, work_dir: Path, mode: str, stats: ServerStats, args) -> dict:
+    scraper = make_scraper('firebox', work_dir)
+    scraper.scheduler = scheduler_for(mode, args)
+    images = work_dir / 'images'
+    images.mkdir(exist_ok=True)
+
+    stats.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        fetched = list(pool.map(lambda i: scraper.fetch_image(f"{base_url}/img/{mode}_{i}.jpg", images / f"{i}.jpg"),
+                                range(args.images)))
+    return {
+        'name': f"images:{mode}",
+        'ok': sum(fetched),
+        'served_429': stats.counts['throttled'],
+        'max_in_flight': stats.max_in_flight,
+        'seconds': round(time.perf_counter() - started, 2),
+        **scheduler_totals(scraper.scheduler)
+    }
+
+def bench_pages(base_url: str, work_dir: Path, mode: str, stats: ServerStats, args) -> dict:
+    scraper = make_scraper('firebox', work_dir)
+    scraper.scheduler = scheduler_for(mode, args)
+    scraper.chrome_options.add_argument(f"--host-resolver-rules=MAP * 127.0.0.1:{urlparse(base_url).port}")
+    driver = scraper._get_driver()
+
+    stats.reset()
+    ok = errors = 0
+    started = time.perf_counter()
+    try:
+        for i in range(args.pages):
+            try:
+                scraper._load_page(driver, f"{base_url}/listing/{mode}_{i}")
+                ok += 1
+            except PageLoadError:
+                errors += 1
+    finally:
+        driver.quit()
+    return {
+        'name': f"pages:{mode}",
+        'ok': ok,
+        'page_errors': errors,
+        'served_429': stats.counts['throttled'],
+        'seconds': round(time.perf_counter() - started, 2),
+        **scheduler_totals(scraper.scheduler)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=60)
+    parser.add_argument('--threads', type=int, default=12, help='Concurrent image downloads')
+    parser.add_argument('--body-bytes', type=int, default=40000)
+    parser.add_argument('--body-seconds', type=float, default=0.2, help='Time to stream one body')
+    parser.add_argument('--server-rate', type=float, default=10, help='Requests per second the server admits')
+    parser.add_argument('--server-burst', type=float, default=5)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--delay', type=float, default=0.05, help='Scheduler seconds between requests (faster than the server admits)')
+    parser.add_argument('--burst', type=float, default=2)
+    parser.add_argument('--concurrency', type=int, default=4, help='Scheduler concurrent fetches per host')
+    parser.add_argument('--max-retries', type=int, default=4)
+    parser.add_argument('--backoff-base', type=float, default=0.25)
+    parser.add_argument('--backoff-max', type=float, default=5)
+    parser.add_argument('--chrome', action='store_true', help='Also load listing pages in headless Chrome')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--output', help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    stats = ServerStats()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, \
+            serve_directory(Path(tmp), make_handler(Admission(args.server_rate, args.server_burst), stats, args)) as base_url:
+        work_dir = Path(tmp)
+        for mode in ('naive', 'scheduled'):
+            # Let the server's bucket refill between modes
+            time.sleep(args.server_burst / args.server_rate)
+            results.append(bench_images(base_url, work_dir, mode, stats, args))
+        if args.chrome:
+            for mode in ('naive', 'scheduled'):
+                time.sleep(args.server_burst / args.server_rate)
+                results.append(bench_pages(base_url, work_dir, mode, stats, args))
+
+    write_results('throttling', results, args.output, images=args.images, threads=args.threads,
+                  server_rate=args.server_rate, server_burst=args.server_burst, retry_after=args.retry_after,
+                  delay=args.delay, concurrency=args.concurrency, max_retries=args.max_retries)
+
+if __name__ == '__main__':
+    main()
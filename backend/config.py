@@ -1,10 +1,13 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
 # Load environment variables from .env file
 load_dotenv()
 
+basedir = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     # Flask
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
@@ -28,22 +31,155 @@ class Config:
                 'verify_cert': False,
                 'ssl_disabled': True,
             }
-        }
+        },
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # Below MySQL's wait_timeout
+        'pool_pre_ping': True
     }
     
+    # Read replicas for search queries (comma separated URIs); empty means everything uses the primary
+    SQLALCHEMY_REPLICA_URIS = [uri for uri in os.environ.get('SQLALCHEMY_REPLICA_URIS', '').split(',') if uri]
+    REPLICA_ENGINE_OPTIONS = {
+        'connect_args': {
+            'ssl': {
+                'verify_cert': False,
+                'ssl_disabled': True,
+            }
+        },
+        'pool_size': int(os.environ.get('REPLICA_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('REPLICA_MAX_OVERFLOW', 10)),
+        'pool_recycle': int(os.environ.get('REPLICA_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
+    READ_YOUR_WRITES_WINDOW = float(os.environ.get('READ_YOUR_WRITES_WINDOW', 5))  # Seconds of primary reads after a write
+    READ_YOUR_WRITES_COOKIE = 'last_write'  # Tells later requests from the writing client to stay on the primary
+    
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # API Keys (for future use)
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL')  # None uses the public API
     
     # Scraping settings
-    SCRAPING_DELAY = 2  # Delay between requests in seconds
+    SCRAPING_DELAY = 2  # Delay between requests in seconds, per host
+    SCRAPING_BURST = 2  # Requests a host may receive back to back before the delay applies
+    SCRAPING_CONCURRENCY = 2  # Concurrent fetches per host
+    SCRAPING_HOST_LIMITS = {}  # Per-host overrides, e.g. {'www.example.com': {'delay': 5, 'concurrency': 1}}
+    SCRAPING_IMAGE_LIMITS = {'delay': 0.1, 'burst': 8, 'concurrency': 8}  # Image downloads, scheduled apart from page loads
+    SCRAPING_MAX_RETRIES = 4  # Retries on 429/5xx before giving up
+    SCRAPING_BACKOFF_BASE = 1  # Seconds, doubled per retry and jittered
+    SCRAPING_BACKOFF_MAX = 60
+    SCRAPING_TIMEOUT = 20  # Seconds for plain HTTP fetches such as images
+    SCRAPER_SOURCES = ['firebox']  # Scrapers used on the request path
+    # Set to false once the background crawler is running so requests only read the DB
+    SCRAPE_ON_REQUEST = os.environ.get('SCRAPE_ON_REQUEST', 'true').lower() == 'true'
+    # Chrome skips images, fonts, media, stylesheets and trackers unless a scraper allows them
+    SCRAPE_BLOCK_RESOURCES = os.environ.get('SCRAPE_BLOCK_RESOURCES', 'true').lower() == 'true'
+    # A scrape pages through listings until it has its top results, see CrawlController
+    SCRAPE_TOP_K = int(os.environ.get('SCRAPE_TOP_K', 10))  # Products collected before a scrape stops paging
+    SCRAPE_MAX_PAGES = int(os.environ.get('SCRAPE_MAX_PAGES', 5))  # Listing pages per scrape, across its search URLs
+    SCRAPE_TIME_BUDGET = int(os.environ.get('SCRAPE_TIME_BUDGET', 60))  # Seconds before no further page is fetched
+
+    # Rendered page cache: off, readwrite, record (always refetch and store) or replay (cache only)
+    PAGE_CACHE_MODE = os.environ.get('PAGE_CACHE_MODE', 'readwrite')
+    PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR') or os.path.join(basedir, 'page_cache')
+    PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 6 * 3600))  # Seconds
+    
+    # Identical concurrent scrapes share one browser session (see SingleFlight)
+    SINGLE_FLIGHT_DIR = os.environ.get('SINGLE_FLIGHT_DIR') or os.path.join(tempfile.gettempdir(), 'gift_ideas_scrapes')
+    SINGLE_FLIGHT_RESULT_TTL = 30  # Seconds a finished scrape is reused by workers that waited on it
+
+    # Where request-path scrapes run: inline (Chrome in the web worker) or workers (`flask scrape-workers` pool)
+    SCRAPE_BACKEND = os.environ.get('SCRAPE_BACKEND', 'inline')
+    SCRAPE_QUEUE_ADDRESS = (os.environ.get('SCRAPE_QUEUE_HOST', '127.0.0.1'), int(os.environ.get('SCRAPE_QUEUE_PORT', 50071)))
+    SCRAPE_QUEUE_AUTHKEY = os.environ.get('SCRAPE_QUEUE_AUTHKEY')  # Required with workers: the queue exchanges pickles
+    SCRAPE_WORKERS = int(os.environ.get('SCRAPE_WORKERS', 2))  # Worker processes, one Chrome session each
+    SCRAPE_WORKER_MAX_JOBS = int(os.environ.get('SCRAPE_WORKER_MAX_JOBS', 50))  # Jobs before a worker is replaced
+    SCRAPE_JOB_TIMEOUT = int(os.environ.get('SCRAPE_JOB_TIMEOUT', 120))  # Seconds a web worker waits; later jobs are dropped
+
+    # Background crawler
+    CRAWL_SOURCES = ['firebox', 'buyagift', 'prezzybox']
+    CRAWL_INTERVAL = int(os.environ.get('CRAWL_INTERVAL', 3600))  # Seconds between crawl runs
+    CRAWL_BUDGET_PAGES = int(os.environ.get('CRAWL_BUDGET_PAGES', 20))  # Targets scraped per run
+    CRAWL_BUDGET_SECONDS = int(os.environ.get('CRAWL_BUDGET_SECONDS', 900))  # Wall time per run
+    CRAWL_STALE_AFTER = 24 * 3600  # Seconds before a crawled target is considered stale
+    CRAWL_MAX_PAGES = int(os.environ.get('CRAWL_MAX_PAGES', 20))  # Listing pages per target; a crawl cut short expires nothing
+    CRAWL_TARGET_TIME_BUDGET = int(os.environ.get('CRAWL_TARGET_TIME_BUDGET', 300))  # Seconds per target
+    EXPIRE_AFTER_MISSED_CRAWLS = 3  # Soft-expire gifts missing from this many crawls of their page
+    CRAWL_DEMAND_FLUSH_SECONDS = 30  # Thin-search demand is counted in memory and written this often
+    
+    # Request phase timing: Server-Timing header and /metrics histograms
+    TIMING_ENABLED = os.environ.get('TIMING_ENABLED', 'true').lower() == 'true'
+    
+    # SQL query accounting: per-request counts, slow query log and N+1 warnings
+    QUERY_ACCOUNTING_ENABLED = os.environ.get('QUERY_ACCOUNTING_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+    QUERY_N_PLUS_ONE_THRESHOLD = 5  # Same statement shape this many times in one request
+    QUERY_TOP_SLOWEST = 5
+    
+    # Admin endpoints (profiles) are disabled unless a token is set
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    
+    # On-demand request profiling
+    PROFILE_ENDPOINTS = ['api.find_gifts']
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # Fraction of requests profiled unasked
+    PROFILE_INTERVAL = 0.005  # Seconds between stack samples
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(basedir, 'profiles')
+    PROFILE_MAX_FILES = 100  # Oldest profiles are deleted beyond this
+    
+    # Response compression (brotli when installed, otherwise gzip) and ETags
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller bodies go out as they are
+    COMPRESS_MIMETYPES = ['application/json', 'text/plain']
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    
+    # ASGI mode (app/asgi.py) executor sizes
+    ASGI_DB_WORKERS = int(os.environ.get('ASGI_DB_WORKERS', 10))  # Match the primary pool size
+    ASGI_SCRAPE_WORKERS = int(os.environ.get('ASGI_SCRAPE_WORKERS', 2))  # Concurrent Chrome sessions
+    ASGI_IO_WORKERS = int(os.environ.get('ASGI_IO_WORKERS', 16))  # Image downloads
+    ASGI_CPU_WORKERS = int(os.environ.get('ASGI_CPU_WORKERS', 2))  # spaCy
+    ASGI_WSGI_WORKERS = int(os.environ.get('ASGI_WSGI_WORKERS', 8))  # Other routes, served by Flask
+    
+    # Near-duplicate clustering of gift titles across sources (MinHash + LSH), maintained at ingest
+    NEAR_DUPLICATES_ENABLED = os.environ.get('NEAR_DUPLICATES_ENABLED', 'true').lower() == 'true'
+    NEAR_DUPLICATE_THRESHOLD = 0.7  # Jaccard similarity of title 4-grams
+    MINHASH_PERMUTATIONS = 80
+    LSH_BANDS = 16  # 5 rows per band: ~95% of pairs at 0.7 similarity become candidates, 15% at 0.4
+    NEAR_DUPLICATE_REPRESENTATIVE = os.environ.get('NEAR_DUPLICATE_REPRESENTATIVE', 'best')  # Or 'cheapest'
+    
+    # Search: fewer catalog matches than this triggers a scrape (when SCRAPE_ON_REQUEST) and crawl demand
+    SEARCH_MIN_RESULTS = 10
+    
+    # In-process caches: description -> criteria, and criteria -> serialized results (thin searches aren't cached)
+    NLP_CACHE_SIZE = int(os.environ.get('NLP_CACHE_SIZE', 4096))
+    NLP_CACHE_TTL = int(os.environ.get('NLP_CACHE_TTL', 3600))  # Seconds; also bounds how long a fallback answer sticks
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 300))  # Seconds before new crawls show up
+    CACHE_STATS_INTERVAL = 60  # Seconds per point of the hit-rate timeline (/api/admin/cache-stats)
+    
+    # Query log: canonical criteria of /api/find-gifts searches with their counts, replayed to warm caches.
+    # Retention is bounded by size, not age: at most QUERY_LOG_MAX_BYTES * (QUERY_LOG_BACKUPS + 1) on disk
+    QUERY_LOG_ENABLED = os.environ.get('QUERY_LOG_ENABLED', 'true').lower() == 'true'
+    # Also keep the normalised free-text descriptions, which can hold personal details; off by default
+    QUERY_LOG_DESCRIPTIONS = os.environ.get('QUERY_LOG_DESCRIPTIONS', 'false').lower() == 'true'
+    QUERY_LOG_PATH = os.environ.get('QUERY_LOG_PATH') or os.path.join(basedir, 'query_log', 'queries.log')
+    QUERY_LOG_MAX_BYTES = int(os.environ.get('QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))  # Rotated beyond this
+    QUERY_LOG_BACKUPS = 3  # Rotated files kept (queries.log.1 .. .3)
+    QUERY_LOG_FLUSH_SECONDS = 10  # Counts are buffered in memory for this long
+    # Cache warm-up on a worker's first request: replay this many of the most frequent searches (0 disables)
+    CACHE_WARMUP_TOP_N = int(os.environ.get('CACHE_WARMUP_TOP_N', 50))
+    CACHE_WARMUP_CRAWL = os.environ.get('CACHE_WARMUP_CRAWL', 'false').lower() == 'true'  # Also crawl thin ones in-process
     
     # Pagination
     GIFTS_PER_PAGE = 20
     
     # OpenAI
     USE_OPENAI = False
+    OPENAI_DEADLINE = float(os.environ.get('OPENAI_DEADLINE', 2.0))  # Seconds before the spaCy answer is used
+    OPENAI_MAX_CONCURRENCY = 16  # In-flight completions from the sync app
+    OPENAI_BREAKER_FAILURES = 5  # Consecutive failures or timeouts that open the circuit
+    OPENAI_BREAKER_RESET = 30  # Seconds the circuit stays open before a trial call
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -1,8 +1,9 @@
 from app import create_app, db
-from app.models.gift import Gift
+from app.models.gift import Gift, PriceHistory
+from app.models.crawl_target import CrawlTarget
 
 app = create_app()
 
 @app.shell_context_processor
 def make_shell_context():
-    return {'db': db, 'Gift': Gift} 
\ No newline at end of file
+    return {'db': db, 'Gift': Gift, 'PriceHistory': PriceHistory, 'CrawlTarget': CrawlTarget} 
\ No newline at end of file
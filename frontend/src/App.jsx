@@ -1,33 +1,65 @@
 import { useState } from 'react'
 import SearchBar from './components/SearchBar'
 import GiftGrid from './components/GiftGrid'
-import axios from 'axios'
 
 function App() {
   const [gifts, setGifts] = useState([])
   const [loading, setLoading] = useState(false)
+  const [searchingMore, setSearchingMore] = useState(false)
+
+  const handleEvent = (event) => {
+    if (event.type === 'gifts') {
+      // Show results as soon as the first batch arrives; later batches append
+      setGifts((current) => [...current, ...event.gifts])
+      setLoading(false)
+    } else if (event.type === 'error') {
+      console.error('Error:', event.error)
+    }
+  }
 
   const searchGifts = async (query) => {
+    setGifts([])
+    setLoading(true)
+    setSearchingMore(true)
+
     try {
-      setLoading(true)
-      const response = await axios.post('http://localhost:5000/api/find-gifts', {
-        description: query
-      }, {
+      const response = await fetch('http://localhost:5000/api/find-gifts/stream', {
+        method: 'POST',
         headers: {
           'Content-Type': 'application/json'
-        }
+        },
+        body: JSON.stringify({ description: query })
       })
-      
-      if (response.data.success) {
-        setGifts(response.data.gifts)
-      } else {
-        console.error('Error:', response.data.error)
-        // You might want to show this error to the user
+
+      if (!response.ok) {
+        const data = await response.json()
+        console.error('Error:', data.error)
+        return
+      }
+
+      // NDJSON: one event per line, parsed as each chunk arrives
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+
+        buffer += decoder.decode(value, { stream: true })
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+        lines.filter((line) => line.trim()).forEach((line) => handleEvent(JSON.parse(line)))
+      }
+
+      if (buffer.trim()) {
+        handleEvent(JSON.parse(buffer))
       }
     } catch (error) {
       console.error('Error fetching gifts:', error)
     } finally {
       setLoading(false)
+      setSearchingMore(false)
     }
   }
 
@@ -43,7 +75,15 @@ function App() {
             <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-gray-900 mx-auto"></div>
           </div>
         ) : (
-          <GiftGrid gifts={gifts} />
+          <>
+            <GiftGrid gifts={gifts} />
+            {searchingMore && (
+              <div className="flex items-center justify-center gap-2 mt-6 text-gray-600">
+                <div className="animate-spin rounded-full h-5 w-5 border-b-2 border-gray-600"></div>
+                Searching more shops...
+              </div>
+            )}
+          </>
         )}
       </div>
     </div>